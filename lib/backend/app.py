@@ -1,36 +1,66 @@
-import decimal
+import os
 import json # Make sure json is imported
-from flask import Flask, request, jsonify, send_file # <-- IMPORT send_file
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context # <-- IMPORT send_file
 from flask_cors import CORS
 import psycopg2
-from datetime import datetime
+from datetime import datetime, timedelta
 import traceback # Import traceback for detailed error logging
 import io # <-- ADD THIS IMPORT
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future
+
+from db_pool import ConnectionPool, PoolTimeout, add_query_observer
+from scoreboard import build_live_score_payload, build_fallback_live_score, is_finished_status, livescore_version, batting_and_bowling_teams, format_overs, format_match_score
+from scoreboard import LIVE_SCORE_COLUMNS, SUMMARY_FIELDS, parse_field_selection, columns_for_fields, select_fields
+import scoring
+import ball_events
+import pagination
+import migrations
+from score_cache import LiveScoreCache, LiveScoreSnapshot, MatchListCache, MatchListPage, ALL_STATUSES
+import http_cache
+from live_bus import LiveBus
+from change_feed import ChangeFeedListener
+from pdf_cache import ScorecardPdfCache
+from pdf_render import PdfRenderService, JOB_DONE, JOB_FAILED
+from scorecard_pdf import render_scorecard_pdf
+from zip_stream import ZipStream
+from json_provider import ApiJSONProvider
+from compression import ResponseCompressor
+from metrics import Metrics
+from profiling import RequestProfiler
+from slow_query import SlowQueryLog
 
-# --- ADD ALL REPORTLAB IMPORTS ---
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle # <-- Add ParagraphStyle
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-# --- END REPORTLAB IMPORTS ---
-
-
-# Helper to convert Decimal/Datetime to JSON serializable types
-class CustomEncoder(json.JSONEncoder):
-    def default(self, o):
-        if isinstance(o, decimal.Decimal):
-            # Convert Decimal to string to preserve precision, then float if needed client-side
-            return str(o) # Or float(o) if precision loss is acceptable
-        if isinstance(o, datetime):
-            return o.isoformat() # Convert datetime to ISO 8601 string format
-        return super(CustomEncoder, self).default(o)
 
 # -------------------- APP SETUP --------------------
 app = Flask(__name__)
-app.json_encoder = CustomEncoder # Use the custom encoder
+app.json = ApiJSONProvider(app) # Decimal -> str, datetime -> ISO 8601; orjson when installed
 CORS(app)
 
+# --- Metrics (Prometheus text format on /metrics) ---
+metrics = Metrics()
+metrics.init_app(app) # Before the compressor: after_request hooks run in reverse, so latency includes compression
+app.json.serialize_observer = metrics.observe_serialize
+add_query_observer(metrics.observe_db) # connect / execute / fetch timings from the pool
+
+# --- Per-request profiler (folded stacks for flame graphs) ---
+PROFILE_SECRET = os.environ.get("VPSPORTS_PROFILE_SECRET") # X-Profile header / ?profile= value; profiling on demand is off when unset
+PROFILE_SAMPLE_RATE = 0.0 # Fraction of all requests profiled at random
+PROFILE_INTERVAL_SECS = 0.005 # Stack sampling period
+PROFILE_MAX_SECS = 60.0 # Sampling stops after this long (long-lived SSE streams)
+PROFILE_MAX_FILES = 200 # Oldest profiles are deleted beyond this
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")
+request_profiler = RequestProfiler(PROFILE_DIR, PROFILE_SECRET, PROFILE_SAMPLE_RATE, PROFILE_INTERVAL_SECS, PROFILE_MAX_SECS, PROFILE_MAX_FILES)
+request_profiler.init_app(app)
+
+# --- Response compression (gzip, or brotli when installed) ---
+COMPRESSION_MIN_BYTES = 1024 # Smaller bodies aren't worth the CPU or the header overhead
+COMPRESSED_CACHE_MAX_BYTES = 16 * 1024 * 1024 # Compressed finished-match bodies, keyed by (ETag, encoding)
+response_compressor = ResponseCompressor(COMPRESSION_MIN_BYTES, COMPRESSED_CACHE_MAX_BYTES)
+response_compressor.init_app(app)
+
 # --- Your Database Credentials ---
 DB_NAME = "vpsports"
 DB_USER = "postgres"
@@ -38,173 +68,181 @@ DB_PASS = "post27"
 DB_HOST = "localhost"
 DB_PORT = "5432"  # Default PostgreSQL port
 
+# --- Connection pool settings ---
+DB_POOL_MIN_SIZE = 2 # Connections opened up front
+DB_POOL_MAX_SIZE = 20 # Hard cap on concurrent connections from this process
+DB_POOL_CHECKOUT_TIMEOUT = 5.0 # Seconds a request waits for a free connection
+DB_POOL_HEALTH_CHECK_IDLE_SECS = 30.0 # Run SELECT 1 on borrow if idle longer than this
+
+_db_pool = None
+_db_pool_lock = threading.Lock()
+
+def get_db_pool():
+    """ Lazily creates the process-wide connection pool. """
+    global _db_pool
+    if _db_pool is None:
+        with _db_pool_lock:
+            if _db_pool is None:
+                _db_pool = ConnectionPool(
+                    DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_CHECKOUT_TIMEOUT, DB_POOL_HEALTH_CHECK_IDLE_SECS,
+                    dbname=DB_NAME, user=DB_USER, password=DB_PASS, host=DB_HOST, port=DB_PORT
+                )
+    return _db_pool
+
+class DatabaseUnavailable(Exception):
+    """ Raised by loaders when get_db_connection() couldn't provide a connection. """
+
+
 def get_db_connection():
+    """ Borrows a pooled connection; conn.close() returns it to the pool. """
     try:
-        conn = psycopg2.connect( dbname=DB_NAME, user=DB_USER, password=DB_PASS, host=DB_HOST, port=DB_PORT )
-        return conn
+        return get_db_pool().getconn()
+    except PoolTimeout as e:
+        print(f"Error getting database connection from pool: {e}")
+        return None
     except psycopg2.OperationalError as e:
         print(f"Error connecting to database: {e}")
         return None
 
+# --- Slow query log ---
+SLOW_QUERY_THRESHOLD_MS = 100 # Statements slower than this are logged
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE = 0.1 # Fraction of slow SELECTs re-run as EXPLAIN (ANALYZE, BUFFERS)
+SLOW_QUERY_EXPLAIN_MIN_INTERVAL_SECS = 300.0 # At most one EXPLAIN per statement in this window
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = 5000 # statement_timeout for the EXPLAIN run
+SLOW_QUERY_LOG_SIZE = 200 # Recent slow statements kept for /api/admin/slow_queries
+slow_query_log = SlowQueryLog(get_db_connection, SLOW_QUERY_THRESHOLD_MS / 1000, SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+                              SLOW_QUERY_EXPLAIN_MIN_INTERVAL_SECS, SLOW_QUERY_EXPLAIN_TIMEOUT_MS, SLOW_QUERY_LOG_SIZE,
+                              context=metrics.current_route)
+add_query_observer(slow_query_log.observe)
+
+# --- Live score snapshot cache ---
+LIVE_SCORE_CACHE_MAX_ENTRIES = 256 # Finished matches are evicted first
+LIVE_SCORE_CACHE_MAX_AGE_SECS = 5.0 # Safety net for writes made by other worker processes
+live_score_cache = LiveScoreCache(LIVE_SCORE_CACHE_MAX_ENTRIES, LIVE_SCORE_CACHE_MAX_AGE_SECS)
+LIVE_SCORES_MAX_IDS = 50 # Upper bound for /api/get_live_scores?ids=
+
+# --- Match list (get_matches) cache ---
+MATCH_LIST_CACHE_MAX_ENTRIES = 128
+MATCH_LIST_CACHE_MAX_AGE_SECS = 5.0 # Safety net for writes made by other worker processes
+MATCH_LIST_CACHE_MAX_AGE_WITH_FEED_SECS = 120.0
+match_list_cache = MatchListCache(MATCH_LIST_CACHE_MAX_ENTRIES, MATCH_LIST_CACHE_MAX_AGE_SECS)
+
+# --- Rendered scorecard PDF cache ---
+PDF_CACHE_MAX_MEMORY_BYTES = 32 * 1024 * 1024
+PDF_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pdf_cache") # Finished matches only
+scorecard_pdf_cache = ScorecardPdfCache(PDF_CACHE_MAX_MEMORY_BYTES, PDF_CACHE_DIR)
+
+# --- Scorecard PDF render service (process pool) ---
+PDF_RENDER_WORKERS = 2 # ReportLab processes; rendering never runs on request threads
+PDF_RENDER_JOB_TTL_SECS = 300 # Completed jobs (and their PDFs) are kept this long for download
+PDF_RENDER_MAX_JOBS = 256
+PDF_RENDER_RETRY_AFTER_SECS = 1 # Poll interval suggested to clients while a job is pending
+pdf_render_service = PdfRenderService(scorecard_pdf_cache, PDF_RENDER_WORKERS, PDF_RENDER_JOB_TTL_SECS, PDF_RENDER_MAX_JOBS)
+
+# --- Bulk scorecard export settings ---
+SCORECARD_EXPORT_FETCH_SIZE = 25 # Rows per round trip on the export's server-side cursor
+SCORECARD_EXPORT_MAX_IN_FLIGHT = 2 * PDF_RENDER_WORKERS # Renders queued ahead of the ZIP writer; bounds memory per export
+
+# --- Ball event store settings ---
+BALL_SNAPSHOT_INTERVAL = 30 # Snapshot the folded scorecard every N events (bounds replay on undo/rebuild)
+
+# --- Conditional GET settings ---
+FINISHED_MATCH_MAX_AGE_SECS = 86400 # Cache-Control max-age for finished matches
+
+def _fetch_livescore_version(match_id):
+    """ Cheap single-row probe: (version, finished) for a match, or None if unknown/unavailable. """
+    conn = None; cur = None
+    try:
+        conn = get_db_connection()
+        if conn is None: return None
+        cur = conn.cursor()
+        cur.execute("SELECT last_updated, current_status FROM cricket_match_livescore WHERE match_id = %s", (match_id,))
+        row = cur.fetchone()
+        if not row: return None
+        return livescore_version(row[0]), is_finished_status(row[1])
+    except (Exception, psycopg2.Error) as e:
+        print(f"Error checking livescore version for match {match_id}: {e}")
+        return None # Callers fall through to a full response
+    finally:
+        if cur and not cur.closed: cur.close()
+        if conn and not conn.closed: conn.close()
+
+def _livescore_not_modified(kind, match_id, version_info=None):
+    """ Returns a 304 response when the client's If-None-Match is still current, otherwise None. """
+    if not request.if_none_match: return None
+    if version_info is None: version_info = _fetch_livescore_version(match_id)
+    if version_info is None: return None
+    version, finished = version_info
+    etag = http_cache.make_etag(kind, match_id, version)
+    if not http_cache.client_has_current(request, etag): return None
+    return http_cache.not_modified(etag, finished, FINISHED_MATCH_MAX_AGE_SECS)
+
+# --- Live score push (Server-Sent Events) settings ---
+SSE_HEARTBEAT_SECS = 15.0 # Comment line sent when nothing changed, keeps proxies from closing the stream
+SSE_RETRY_MS = 3000 # Client reconnect delay advertised in the stream
+SSE_MAX_STREAM_SECS = 1800 # Streams are recycled; clients resume via Last-Event-ID
+live_bus = LiveBus()
+
+# --- Cross-process change feed (LISTEN/NOTIFY) settings ---
+LIVESCORE_CHANGE_FEED_ENABLED = True
+LIVESCORE_CHANGE_CHANNEL = "cricket_livescore_changed" # Must match notify_livescore_change()
+LIVE_SCORE_CACHE_MAX_AGE_WITH_FEED_SECS = 300.0 # Notifications keep the cache fresh, so expire rarely
+_change_feed = None
+
+def _on_livescore_changed(match_id):
+    """ Called after any committed write to a match's livescore row. """
+    live_score_cache.invalidate(match_id)
+    match_list_cache.invalidate_match(match_id) # Lists showing it carry its score line
+    live_bus.publish(match_id)
+
+def _on_livescore_notification(payload):
+    """ Change feed handler - runs for writes made by any process, including this one. """
+    match_id = int(payload["match_id"])
+    version = payload.get("version")
+    live_score_cache.invalidate(match_id, version)
+    match_list_cache.invalidate_match(match_id)
+    # The match may have just joined the list for its new status (added, started, finished)
+    status = (payload.get("status") or "").lower()
+    if status in MATCH_LIST_STATUSES.values(): _invalidate_match_lists(status)
+    live_bus.publish(match_id, version)
+
+def _on_change_feed_reconnect():
+    # Anything could have changed while we weren't listening
+    live_score_cache.clear()
+    match_list_cache.clear()
+
+def start_change_feed():
+    """ Starts the background LISTEN thread that fans DB change notifications out to
+        this process's caches and live streams. """
+    global _change_feed
+    if not LIVESCORE_CHANGE_FEED_ENABLED or _change_feed is not None: return
+    _change_feed = ChangeFeedListener(
+        dict(dbname=DB_NAME, user=DB_USER, password=DB_PASS, host=DB_HOST, port=DB_PORT),
+        LIVESCORE_CHANGE_CHANNEL, _on_livescore_notification, on_reconnect=_on_change_feed_reconnect
+    )
+    _change_feed.start()
+    live_score_cache.live_max_age = LIVE_SCORE_CACHE_MAX_AGE_WITH_FEED_SECS
+    match_list_cache.max_age = MATCH_LIST_CACHE_MAX_AGE_WITH_FEED_SECS
+
 # --- Function to ensure DB schema ---
 def check_and_update_schema():
-    # Targets 'cricket_match_livescore'
+    """ Applies pending migrations (see migrations.py). When the schema is already
+        current this is a single SELECT on schema_version. """
     conn_check = get_db_connection()
     if not conn_check:
         print("Schema Check Failed: Could not connect to DB.")
         return
-    cur_check = conn_check.cursor()
-    target_table = 'cricket_match_livescore' # Define target table name
     try:
-        # Check if table exists, create if not
-        cur_check.execute(f"""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables
-                WHERE table_schema = 'public' AND table_name = '{target_table}'
-            );
-        """)
-        table_exists = cur_check.fetchone()[0]
-
-        if not table_exists:
-            print(f"Table '{target_table}' does not exist. Creating it...")
-            # Execute the CREATE TABLE query from the previous step
-            create_table_query = """
-                CREATE TABLE cricket_match_livescore (
-                    live_score_id SERIAL PRIMARY KEY,
-                    match_id INTEGER NOT NULL UNIQUE REFERENCES cricket_match(match_id) ON DELETE CASCADE,
-                    toss_winner TEXT,
-                    toss_decision TEXT CHECK (toss_decision IN ('Bat', 'Bowl')),
-                    current_status TEXT DEFAULT 'upcoming',
-                    live_result TEXT,
-                    break_status TEXT,
-                    team1_name TEXT,
-                    team2_name TEXT,
-                    team1_runs INTEGER DEFAULT 0 NOT NULL,
-                    team1_wickets INTEGER DEFAULT 0 NOT NULL,
-                    team1_balls INTEGER DEFAULT 0 NOT NULL,
-                    team2_runs INTEGER DEFAULT 0 NOT NULL,
-                    team2_wickets INTEGER DEFAULT 0 NOT NULL,
-                    team2_balls INTEGER DEFAULT 0 NOT NULL,
-                    team1_extras INTEGER DEFAULT 0 NOT NULL,
-                    team2_extras INTEGER DEFAULT 0 NOT NULL,
-                    summary_text TEXT,
-                    striker_id INTEGER,
-                    non_striker_id INTEGER,
-                    bowler_id INTEGER,
-                    is_first_innings BOOLEAN DEFAULT TRUE NOT NULL,
-                    target_score INTEGER,
-                    first_innings_balls INTEGER,
-                    team1_batting_stats JSONB DEFAULT '[]'::jsonb,
-                    team2_bowling_stats JSONB DEFAULT '[]'::jsonb,
-                    team2_batting_stats JSONB DEFAULT '[]'::jsonb,
-                    team1_bowling_stats JSONB DEFAULT '[]'::jsonb,
-                    team1_timeline TEXT[] DEFAULT ARRAY[]::TEXT[],
-                    team2_timeline TEXT[] DEFAULT ARRAY[]::TEXT[],
-                    last_updated TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-                );
-            """
-            cur_check.execute(create_table_query)
-            conn_check.commit()
-            print(f"Table '{target_table}' created successfully.")
+        applied = migrations.migrate(conn_check, {"livescore_channel": LIVESCORE_CHANGE_CHANNEL})
+        if applied:
+            print(f"Schema migrated to version {applied[-1]} (applied {', '.join(map(str, applied))}).")
         else:
-             print(f"Table '{target_table}' already exists. Checking columns...")
-             # If table exists, proceed with column checks/adds
-             alter_commands = [
-                 # Check/Add match_id column and constraints (only if table wasn't just created)
-                 f"""DO $$ BEGIN
-                   IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name='{target_table}' AND column_name='match_id') THEN
-                       ALTER TABLE {target_table} ADD COLUMN match_id INTEGER; RAISE NOTICE 'Column match_id added.';
-                   ELSE RAISE NOTICE 'Column match_id already exists.'; END IF;
-
-                   IF EXISTS (SELECT FROM information_schema.tables WHERE table_name = 'cricket_match') AND
-                      NOT EXISTS (SELECT 1 FROM information_schema.table_constraints WHERE table_name='{target_table}' AND constraint_name='{target_table}_match_id_fkey') THEN
-                       ALTER TABLE {target_table} ADD CONSTRAINT {target_table}_match_id_fkey FOREIGN KEY (match_id) REFERENCES cricket_match(match_id) ON DELETE CASCADE; RAISE NOTICE 'Foreign key {target_table}_match_id_fkey added.';
-                   END IF;
-
-                   IF NOT EXISTS (SELECT 1 FROM information_schema.table_constraints WHERE table_name='{target_table}' AND constraint_name='{target_table}_match_id_key') THEN
-                       ALTER TABLE {target_table} ADD CONSTRAINT {target_table}_match_id_key UNIQUE (match_id); RAISE NOTICE 'Unique constraint {target_table}_match_id_key added.';
-                   END IF;
-                END $$;""",
-                # Add other necessary columns if they don't exist
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS toss_winner TEXT",
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS toss_decision TEXT CHECK (toss_decision IN ('Bat', 'Bowl'))",
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS current_status TEXT DEFAULT 'upcoming'",
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS live_result TEXT",
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS break_status TEXT",
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS team1_name TEXT",
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS team2_name TEXT",
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS team1_runs INTEGER DEFAULT 0 NOT NULL",
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS team1_wickets INTEGER DEFAULT 0 NOT NULL",
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS team1_balls INTEGER DEFAULT 0 NOT NULL",
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS team2_runs INTEGER DEFAULT 0 NOT NULL",
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS team2_wickets INTEGER DEFAULT 0 NOT NULL",
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS team2_balls INTEGER DEFAULT 0 NOT NULL",
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS team1_extras INTEGER DEFAULT 0 NOT NULL",
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS team2_extras INTEGER DEFAULT 0 NOT NULL",
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS summary_text TEXT",
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS striker_id INTEGER",
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS non_striker_id INTEGER",
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS bowler_id INTEGER",
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS is_first_innings BOOLEAN DEFAULT TRUE NOT NULL",
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS target_score INTEGER",
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS first_innings_balls INTEGER",
-                # Add JSONB columns for player stats
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS team1_batting_stats JSONB DEFAULT '[]'::jsonb",
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS team2_bowling_stats JSONB DEFAULT '[]'::jsonb",
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS team2_batting_stats JSONB DEFAULT '[]'::jsonb",
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS team1_bowling_stats JSONB DEFAULT '[]'::jsonb",
-                # Add last_updated column
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS last_updated TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP",
-                # --- MODIFICATION: Add separate timelines ---
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS team1_timeline TEXT[] DEFAULT ARRAY[]::TEXT[]",
-                f"ALTER TABLE {target_table} ADD COLUMN IF NOT EXISTS team2_timeline TEXT[] DEFAULT ARRAY[]::TEXT[]"
-                # f"ALTER TABLE {target_table} DROP COLUMN IF EXISTS timeline" # Optional: to clean up
-                # --- END MODIFICATION ---
-            ]
-             for command in alter_commands:
-                 # print(f"Executing: {command}") # Optional: uncomment for verbose logging
-                 cur_check.execute(command)
-             conn_check.commit()
-             print(f"Checked/Added necessary columns to {target_table}.")
-
-        # Ensure the trigger function exists
-        cur_check.execute("""
-            CREATE OR REPLACE FUNCTION update_last_updated_column()
-            RETURNS TRIGGER AS $$
-            BEGIN
-               NEW.last_updated = NOW();
-               RETURN NEW;
-            END;
-            $$ language 'plpgsql';
-        """)
-
-        # Ensure the trigger exists on the target table
-        cur_check.execute(f"""
-            DO $$ BEGIN
-                IF NOT EXISTS (
-                    SELECT 1 FROM pg_trigger
-                    WHERE tgname = 'update_{target_table}_last_updated' AND tgrelid = '{target_table}'::regclass
-                ) THEN
-                    CREATE TRIGGER update_{target_table}_last_updated
-                    BEFORE UPDATE ON {target_table}
-                    FOR EACH ROW
-                    EXECUTE FUNCTION update_last_updated_column();
-                    RAISE NOTICE 'Trigger update_{target_table}_last_updated created.';
-                ELSE
-                    RAISE NOTICE 'Trigger update_{target_table}_last_updated already exists.';
-                END IF;
-            END $$;
-        """)
-        conn_check.commit()
-        print(f"Ensured last_updated trigger exists for {target_table}.")
-
+            print(f"Schema is current (version {migrations.LATEST_VERSION}).")
     except (Exception, psycopg2.Error) as e:
-        print(f"Error checking/creating/altering table {target_table}: {e}")
+        print(f"Error migrating schema: {e}")
         traceback.print_exc()
-        try: conn_check.rollback()
-        except Exception as rb_e: print(f"Rollback failed: {rb_e}")
+        conn_check.discard() # Ending the session also frees the migration advisory lock
     finally:
-        if cur_check and not cur_check.closed: cur_check.close()
         if conn_check and not conn_check.closed: conn_check.close()
 
 
@@ -238,8 +276,11 @@ def add_cricket_match():
         print(f"Successfully inserted into cricket_match, new match_id: {new_match_id}") # Log success
 
         # Insert initial livescore record
-        init_live_update_query = "INSERT INTO cricket_match_livescore (match_id, team1_name, team2_name, current_status, summary_text) VALUES (%s, %s, %s, %s, %s) ON CONFLICT (match_id) DO NOTHING"
+        init_live_update_query = "INSERT INTO cricket_match_livescore (match_id, team1_name, team2_name, current_status, summary_text, score_projection, score_summary) VALUES (%s, %s, %s, %s, %s, %s, %s) ON CONFLICT (match_id) DO NOTHING"
         init_live_update_data = (new_match_id, team_a_name, team_b_name, 'upcoming', 'Match hasn\'t started yet.')
+        init_live_update_data += _score_projection_values(new_match_id, {
+            "team1_name": team_a_name, "team2_name": team_b_name, "current_status": 'upcoming',
+            "summary_text": 'Match hasn\'t started yet.', "is_first_innings": True}) # Column defaults for the rest
         cur.execute(init_live_update_query, init_live_update_data)
         # --- Add Logging ---
         print(f"Executed initial INSERT/ON CONFLICT for cricket_match_livescore for match_id: {new_match_id}. Rowcount: {cur.rowcount}")
@@ -249,6 +290,7 @@ def add_cricket_match():
 
         conn.commit() # Commit both inserts together
         print(f"Committed transaction for match_id: {new_match_id}") # Log commit
+        _invalidate_match_lists('upcoming')
 
         return jsonify({"status": "success", "message": "Match added successfully", "match_id": new_match_id}), 201
     except (Exception, psycopg2.Error) as e:
@@ -264,89 +306,222 @@ def add_cricket_match():
 
 # ... rest of the code is unchanged ...
 
-@app.route('/api/get_matches/<sport_name>', methods=['GET'])
-def get_matches(sport_name):
-    status_param = request.args.get('status', 'upcoming') # Get requested status
-    matches = []
+# get_matches ?status= value -> cricket_match.match_status
+MATCH_LIST_STATUSES = {'upcoming': 'upcoming', 'live': 'live', 'recent': 'finished'}
+
+def _format_match_list_row(row):
+    return {
+        "id": row[0],
+        "teamA": row[1],
+        "teamB": row[2],
+        "venue": row[3],
+        "date": row[4].strftime('%b %d'),
+        "time": row[4].strftime('%I:%M %p'),
+        "status": row[5], # Actual status from cricket_match table
+        "scoreA": format_match_score(row[6], row[7], row[8]), # Formatted score A
+        "scoreB": format_match_score(row[9], row[10], row[11]), # Formatted score B
+        "summary": row[12], # Live summary or potentially pre-match text
+        "result": row[13] # Final result text (only relevant for 'finished')
+    }
+
+
+def _load_match_list_page(db_status, limit, after):
+    """ Reads one keyset page of a status list. Returns (MatchListPage, seconds until the
+        first listed match starts or None) - upcoming pages go stale at that moment. """
     conn = None
     cur = None
-
-    if sport_name.lower() != 'cricket':
-        return jsonify([])
-
     try:
         conn = get_db_connection()
-        if conn is None:
-            return jsonify({"status": "error", "message": "Database connection failed"}), 500
+        if conn is None: raise DatabaseUnavailable()
         cur = conn.cursor()
 
-        # Determine the target status for the DB query
-        if status_param == 'recent':
-            db_status = 'finished'
-        elif status_param == 'live':
-            db_status = 'live'
-        elif status_param == 'upcoming':
-            db_status = 'upcoming'
-        else:
-            return jsonify({"status": "error", "message": "Invalid status parameter"}), 400
-
-        # Build the query
+        # Build the query. Every variant walks idx_cricket_match_status_start in
+        # (start_time, match_id) order and stops after limit + 1 rows (limit None: whole list).
         base_query = """
             SELECT cm.match_id, cm.team_a_name, cm.team_b_name, cm.venue, cm.start_time, cm.match_status,
                    ls.team1_runs, ls.team1_wickets, ls.team1_balls,
-                   ls.team2_runs, ls.team2_wickets, ls.team2_balls, ls.summary_text, ls.live_result
+                   ls.team2_runs, ls.team2_wickets, ls.team2_balls, ls.summary_text, ls.live_result,
+                   EXTRACT(EPOCH FROM (cm.start_time - NOW()))::float8 AS starts_in_secs
             FROM cricket_match cm
             LEFT JOIN cricket_match_livescore ls ON cm.match_id = ls.match_id
             WHERE cm.match_status = %s
         """
-        order_by = ""
+        params = [db_status]
+        descending = db_status == 'finished' # Recent first
 
-        if db_status == 'live':
-            order_by = " ORDER BY cm.start_time ASC"
-        elif db_status == 'finished':
-            order_by = " ORDER BY cm.start_time DESC" # Recent first
-        elif db_status == 'upcoming':
+        if db_status == 'upcoming':
             base_query += " AND cm.start_time > NOW()" # Only future upcoming
-            order_by = " ORDER BY cm.start_time ASC"
-
-        query = base_query + order_by
-        cur.execute(query, (db_status,)) # Use the determined db_status
+        if after is not None:
+            base_query += " AND (cm.start_time, cm.match_id) < (%s, %s)" if descending else " AND (cm.start_time, cm.match_id) > (%s, %s)"
+            params.extend(after)
+        direction = "DESC" if descending else "ASC"
+        order_by = f" ORDER BY cm.start_time {direction}, cm.match_id {direction}"
+        if limit is not None:
+            order_by += " LIMIT %s"
+            params.append(limit + 1) # One extra row tells us whether there is a next page
+
+        cur.execute(base_query + order_by, params)
         match_rows = cur.fetchall()
+        has_more = limit is not None and len(match_rows) > limit
+        match_rows = match_rows[:limit]
+
+        next_cursor = pagination.encode_cursor(match_rows[-1][4], match_rows[-1][0]) if has_more else None
+        page = MatchListPage([_format_match_list_row(row) for row in match_rows],
+                             frozenset(row[0] for row in match_rows), next_cursor)
+        starts_in = match_rows[0][14] if db_status == 'upcoming' and match_rows else None
+        return page, starts_in
+    finally:
+        if cur and not cur.closed: cur.close()
+        if conn and not conn.closed: conn.close()
 
-        for row in match_rows:
-            # --- Helper to format score string ---
-            def format_score(runs, wickets, balls):
-                if runs is None or wickets is None or balls is None:
-                    return "0/0 (0.0)" # Default if no score data
-                overs = balls // 6
-                balls_rem = balls % 6
-                return f"{runs}/{wickets} ({overs}.{balls_rem})"
-
-            match_data = {
-                "id": row[0],
-                "teamA": row[1],
-                "teamB": row[2],
-                "venue": row[3],
-                "date": row[4].strftime('%b %d'),
-                "time": row[4].strftime('%I:%M %p'),
-                "status": row[5], # Actual status from cricket_match table
-                "scoreA": format_score(row[6], row[7], row[8]), # Formatted score A
-                "scoreB": format_score(row[9], row[10], row[11]), # Formatted score B
-                "summary": row[12], # Live summary or potentially pre-match text
-                "result": row[13] # Final result text (only relevant for 'finished')
-            }
-            matches.append(match_data)
-
-        return jsonify(matches)
+
+def _invalidate_match_lists(*statuses):
+    """ Call after a write that moves matches into or out of these get_matches lists. """
+    for status in statuses:
+        match_list_cache.invalidate('cricket', status)
+
+
+@app.route('/api/get_matches/<sport_name>', methods=['GET'])
+def get_matches(sport_name):
+    """ One page of matches for a status tab. The body stays a plain list; when more rows exist
+        the next page's cursor is in the X-Next-Cursor header (and a rel="next" Link).
+        Without ?limit= or ?cursor= the whole list is returned, as before pagination.
+        Pages are cached per (sport, status, limit, cursor) and invalidated by writes. """
+    status_param = request.args.get('status', 'upcoming') # Get requested status
+
+    if sport_name.lower() != 'cricket':
+        return jsonify([])
+
+    # Determine the target status for the DB query
+    db_status = MATCH_LIST_STATUSES.get(status_param)
+    if db_status is None:
+        return jsonify({"status": "error", "message": "Invalid status parameter"}), 400
+    try:
+        cursor_param = request.args.get('cursor')
+        limit_param = request.args.get('limit')
+        # Clients that predate paging send neither and expect the full list
+        limit = pagination.parse_limit(limit_param) if limit_param or cursor_param else None
+        after = pagination.decode_cursor(cursor_param) if cursor_param else None
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    try:
+        cache_key = ('cricket', db_status, limit, cursor_param)
+        page = match_list_cache.get(cache_key)
+        if page is None:
+            generation = match_list_cache.generation('cricket', db_status)
+            page, starts_in = _load_match_list_page(db_status, limit, after)
+            match_list_cache.put(cache_key, page, generation, max_age=starts_in)
+
+        response = jsonify(page.matches)
+        if page.next_cursor:
+            response.headers["X-Next-Cursor"] = page.next_cursor
+            response.headers["Link"] = f'<{request.path}?status={status_param}&limit={limit}&cursor={page.next_cursor}>; rel="next"'
+            response.headers["Access-Control-Expose-Headers"] = "X-Next-Cursor, Link" # Readable by web clients
+        return response
+    except DatabaseUnavailable:
+        return jsonify({"status": "error", "message": "Database connection failed"}), 500
     except (Exception, psycopg2.Error) as e:
         print(f"Error fetching matches ({status_param}): {e}") # Log the original param
         traceback.print_exc()
         return jsonify([]) # Return empty list on error
+
+
+# Scalar livescore columns behind the live section's summaries (no JSONB stats or timelines)
+FEED_SUMMARY_COLUMNS = columns_for_fields(SUMMARY_FIELDS)
+FEED_SECTION_DEFAULT_LIMIT = 10
+
+def _load_match_feed(limits):
+    """ All three get_matches lists in one UNION ALL query, each section limited separately.
+        Live rows also carry their view=summary live score. Returns (MatchListPage, starts_in). """
+    conn = None
+    cur = None
+    try:
+        conn = get_db_connection()
+        if conn is None: raise DatabaseUnavailable()
+        cur = conn.cursor()
+
+        section_sql = f"""
+            (SELECT %s AS section, cm.match_id, cm.team_a_name, cm.team_b_name, cm.venue, cm.start_time, cm.match_status,
+                    ls.team1_runs, ls.team1_wickets, ls.team1_balls,
+                    ls.team2_runs, ls.team2_wickets, ls.team2_balls, ls.summary_text, ls.live_result,
+                    EXTRACT(EPOCH FROM (cm.start_time - NOW()))::float8 AS starts_in_secs,
+                    {', '.join('ls.' + col for col in FEED_SUMMARY_COLUMNS)}
+             FROM cricket_match cm
+             LEFT JOIN cricket_match_livescore ls ON cm.match_id = ls.match_id
+             WHERE cm.match_status = %s {{extra}}
+             ORDER BY cm.start_time {{direction}}, cm.match_id {{direction}} LIMIT %s)
+        """
+        query = " UNION ALL ".join([
+            section_sql.format(extra="AND cm.start_time > NOW()", direction="ASC"),
+            section_sql.format(extra="", direction="ASC"),
+            section_sql.format(extra="", direction="DESC"),
+        ])
+        params = []
+        for section, db_status in (('upcoming', 'upcoming'), ('live', 'live'), ('recent', 'finished')):
+            params.extend([section, db_status, limits[section] + 1]) # One extra row per section for its cursor
+        cur.execute(query, params)
+
+        rows_by_section = {'upcoming': [], 'live': [], 'recent': []}
+        for row in cur.fetchall():
+            rows_by_section[row[0]].append(row[1:])
+
+        feed = {"next_cursors": {}}
+        match_ids = set()
+        starts_in = None
+        for section, rows in rows_by_section.items():
+            # UNION ALL doesn't promise to keep each branch's order
+            rows.sort(key=lambda r: (r[4], r[0]), reverse=(section == 'recent'))
+            if len(rows) > limits[section]:
+                rows = rows[:limits[section]]
+                feed["next_cursors"][section] = pagination.encode_cursor(rows[-1][4], rows[-1][0])
+            else:
+                feed["next_cursors"][section] = None
+            entries = []
+            for row in rows:
+                entry = _format_match_list_row(row)
+                if section == 'live':
+                    live_row = dict(zip(FEED_SUMMARY_COLUMNS, row[15:]))
+                    entry["live_score"] = select_fields(build_live_score_payload(row[0], live_row), SUMMARY_FIELDS)
+                entries.append(entry)
+                match_ids.add(row[0])
+            feed[section] = entries
+            if section == 'upcoming' and rows: starts_in = rows[0][14]
+        return MatchListPage(feed, frozenset(match_ids), None), starts_in
     finally:
         if cur and not cur.closed: cur.close()
         if conn and not conn.closed: conn.close()
 
 
+@app.route('/api/feed/<sport_name>', methods=['GET'])
+def get_match_feed(sport_name):
+    """ Home screen in one call: {"upcoming": [...], "live": [...], "recent": [...], "next_cursors": {...}}.
+        Entries match get_matches; live entries add a "live_score" summary. Per-section sizes via
+        ?upcoming_limit= / ?live_limit= / ?recent_limit=; next_cursors continue each list on get_matches. """
+    if sport_name.lower() != 'cricket':
+        return jsonify({"upcoming": [], "live": [], "recent": [], "next_cursors": {}})
+    try:
+        limits = {section: pagination.parse_limit(request.args.get(f'{section}_limit'), FEED_SECTION_DEFAULT_LIMIT, f'{section}_limit')
+                  for section in ('upcoming', 'live', 'recent')}
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    try:
+        cache_key = ('cricket', ALL_STATUSES, limits['upcoming'], limits['live'], limits['recent'])
+        page = match_list_cache.get(cache_key)
+        if page is None:
+            generation = match_list_cache.generation('cricket', ALL_STATUSES)
+            page, starts_in = _load_match_feed(limits)
+            match_list_cache.put(cache_key, page, generation, max_age=starts_in)
+        return jsonify(page.matches)
+    except DatabaseUnavailable:
+        return jsonify({"status": "error", "message": "Database connection failed"}), 500
+    except (Exception, psycopg2.Error) as e:
+        print(f"Error fetching match feed: {e}")
+        traceback.print_exc()
+        return jsonify({"status": "error", "message": f"An error occurred: {str(e)}"}), 500
+
+
 @app.route('/api/get_match_details/<int:match_id>', methods=['GET'])
 def get_match_details(match_id):
     conn = None
@@ -396,9 +571,17 @@ def start_match(match_id):
         cur.execute(query_match, (match_id,))
         # No need to check rowcount again, already validated status
 
-        query_live = "UPDATE cricket_match_livescore SET current_status = 'live' WHERE match_id = %s"
+        # Only match_status_text changes in the projections ('upcoming' and 'live' both show summary_text)
+        query_live = """
+            UPDATE cricket_match_livescore SET current_status = 'live',
+                score_projection = score_projection || '{"match_status_text": "live"}'::jsonb,
+                score_summary = score_summary || '{"match_status_text": "live"}'::jsonb
+            WHERE match_id = %s
+        """
         cur.execute(query_live, (match_id,))
         conn.commit()
+        _on_livescore_changed(match_id)
+        _invalidate_match_lists('upcoming', 'live')
         return jsonify({"status": "success", "message": "Match started successfully"}), 200
     except (Exception, psycopg2.Error) as e:
         print(f"Error starting match: {e}")
@@ -452,11 +635,19 @@ def update_live_score(match_id):
         values_dict["team2_batting_stats"] = json.dumps(data.get("team2_batting", []) or [])
         values_dict["team1_bowling_stats"] = json.dumps(data.get("team1_bowling", []) or [])
 
+        # get_live_score projections of the row being written
+        projection_row = {col: values_dict[col] for col in core_columns + ["team1_timeline", "team2_timeline"]}
+        for col, key in (("team1_batting_stats", "team1_batting"), ("team2_bowling_stats", "team2_bowling"),
+                         ("team2_batting_stats", "team2_batting"), ("team1_bowling_stats", "team1_bowling")):
+            projection_row[col] = data.get(key, []) or []
+        values_dict["score_projection"], values_dict["score_summary"] = _score_projection_values(match_id, projection_row)
+
         # Build the UPSERT query targeting the correct table
         all_columns = ["match_id"] + core_columns + [
             "team1_batting_stats", "team2_bowling_stats",
             "team2_batting_stats", "team1_bowling_stats",
-            "team1_timeline", "team2_timeline" # <-- ADDED THESE
+            "team1_timeline", "team2_timeline", # <-- ADDED THESE
+            "score_projection", "score_summary",
         ]
         placeholders = ", ".join(["%s"] * len(all_columns))
         update_assignments = ", ".join([f"{col} = EXCLUDED.{col}" for col in all_columns if col != "match_id"])
@@ -471,7 +662,17 @@ def update_live_score(match_id):
         values_tuple = tuple(values_dict[col] for col in all_columns)
 
         cur.execute(sql, values_tuple)
+        # A full-row write becomes a snapshot barrier for matches that are also scored ball by ball
+        cur.execute(f"""
+            INSERT INTO cricket_scorecard_snapshot (match_id, seq, state, is_barrier)
+            SELECT ls.match_id, ev.seq, {ball_events.snapshot_state_sql()}, TRUE
+            FROM cricket_match_livescore ls
+            JOIN (SELECT MAX(seq) AS seq FROM cricket_ball_event WHERE match_id = %s) ev ON ev.seq IS NOT NULL
+            WHERE ls.match_id = %s
+            ON CONFLICT (match_id, seq) DO UPDATE SET state = EXCLUDED.state, is_barrier = TRUE, created_at = NOW()
+        """, (match_id, match_id))
         conn.commit() # Commit livescore update first
+        _on_livescore_changed(match_id)
 
         # --- MODIFICATION: Update cricket_match status if finished ---
         if values_dict.get("current_status") == "Finished":
@@ -479,6 +680,7 @@ def update_live_score(match_id):
                 # Update the main cricket_match table status
                 cur.execute("UPDATE cricket_match SET match_status = 'finished' WHERE match_id = %s AND match_status != 'finished'", (match_id,)) # Add condition to avoid redundant updates
                 conn.commit() # Commit the status update
+                _invalidate_match_lists('live', 'finished')
                 print(f"Match {match_id} status updated to finished in cricket_match table.")
             except (Exception, psycopg2.Error) as update_err:
                 print(f"Error updating match_status in cricket_match for {match_id}: {update_err}")
@@ -503,10 +705,339 @@ def update_live_score(match_id):
         if conn and not conn.closed: conn.close()
 
 
+def _write_scorecard_snapshot(cur, match_id, seq):
+    """ Stores the row's current ball-driven state as the snapshot after event `seq`. """
+    cur.execute(f"""
+        INSERT INTO cricket_scorecard_snapshot (match_id, seq, state)
+        SELECT match_id, %s, {ball_events.snapshot_state_sql()} FROM cricket_match_livescore WHERE match_id = %s
+        ON CONFLICT (match_id, seq) DO UPDATE SET state = EXCLUDED.state, created_at = NOW()
+    """, (seq, match_id))
+
+
+_LIVESCORE_SCALAR_COLUMNS = [col for col in LIVE_SCORE_COLUMNS
+                             if col not in ball_events.JSONB_STATE_COLUMNS and not col.endswith("_timeline") and col != "last_updated"]
+_PROJECTION_EXTRA_COLUMNS = [col for col in LIVE_SCORE_COLUMNS if col not in ball_events.STATE_COLUMNS and col != "last_updated"]
+
+def _rebuild_from_snapshot(cur, match_id):
+    """ Folds the events after the latest snapshot and writes the result back to the
+        livescore row. Returns the number of replayed events, or None without a snapshot. """
+    cur.execute("SELECT seq, state FROM cricket_scorecard_snapshot WHERE match_id = %s ORDER BY seq DESC LIMIT 1", (match_id,))
+    snapshot = cur.fetchone()
+    if not snapshot: return None
+    snapshot_seq, snapshot_state = snapshot
+    cur.execute("SELECT payload FROM cricket_ball_event WHERE match_id = %s AND seq > %s ORDER BY seq", (match_id, snapshot_seq))
+    payloads = [r[0] for r in cur.fetchall()]
+    state = ball_events.materialize(snapshot_state, payloads)
+    # The projections also need the scalar columns events don't touch (names, toss, status, summary)
+    cur.execute(f"SELECT {', '.join(_PROJECTION_EXTRA_COLUMNS)} FROM cricket_match_livescore WHERE match_id = %s", (match_id,))
+    projection_row = dict(zip(_PROJECTION_EXTRA_COLUMNS, cur.fetchone()), **state)
+
+    assignments = []
+    values = []
+    for col in ball_events.STATE_COLUMNS:
+        if col in ball_events.JSONB_STATE_COLUMNS:
+            assignments.append(f"{col} = %s::jsonb"); values.append(json.dumps(state.get(col) or []))
+        elif col.endswith("_timeline"):
+            assignments.append(f"{col} = %s::text[]"); values.append(state.get(col) or [])
+        else:
+            assignments.append(f"{col} = %s"); values.append(state.get(col))
+    assignments += ["score_projection = %s::jsonb", "score_summary = %s::jsonb"]
+    values.extend(_score_projection_values(match_id, projection_row))
+    cur.execute(f"UPDATE cricket_match_livescore SET {', '.join(assignments)}, last_updated = NOW() WHERE match_id = %s",
+                values + [match_id])
+    return len(payloads)
+
+
+def _jsonb_player_updates(column, updates, params):
+    """ Builds a SQL expression that rewrites only the touched players of a JSONB stats
+        array: jsonb_set() at the player's index, or an append for players not listed yet. """
+    expr = column
+    for index, player in updates:
+        if index is None:
+            expr = f"(COALESCE({expr}, '[]'::jsonb) || jsonb_build_array(%s::jsonb))"
+            params.append(json.dumps(player))
+        else:
+            expr = f"jsonb_set({expr}, %s::text[], %s::jsonb)"
+            params.extend([[str(index)], json.dumps(player)])
+    return expr
+
+
+@app.route('/api/record_ball/<int:match_id>', methods=['POST'])
+def record_ball(match_id):
+    """ Applies a single delivery (runs, extras, wicket, batter, bowler) in one transaction.
+        Only the team counters, one timeline entry and the touched players' JSONB elements are
+        written, so the cost is the size of a ball, not the size of the match. """
+    data = request.get_json(silent=True)
+    if not data: return jsonify({"status": "error", "message": "No data received"}), 400
+    try:
+        ball = scoring.parse_ball(data)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    conn = None
+    cur = None
+    try:
+        conn = get_db_connection()
+        if conn is None: return jsonify({"status": "error", "message": "Database connection failed"}), 500
+        cur = conn.cursor()
+
+        # Lock the row so concurrent balls for the same match apply one after another.
+        # Only the scalar columns are read; stats and timelines are patched in place below
+        cur.execute(f"SELECT {', '.join(_LIVESCORE_SCALAR_COLUMNS)} FROM cricket_match_livescore WHERE match_id = %s FOR UPDATE", (match_id,))
+        row = cur.fetchone()
+        if not row: return jsonify({"status": "error", "message": "Match not found"}), 404
+        live_row = dict(zip(_LIVESCORE_SCALAR_COLUMNS, row))
+        t1_name, t2_name, is_first = live_row["team1_name"], live_row["team2_name"], live_row["is_first_innings"]
+        striker_id, non_striker_id, bowler_id = live_row["striker_id"], live_row["non_striker_id"], live_row["bowler_id"]
+        t1_balls, t2_balls, current_status = live_row["team1_balls"], live_row["team2_balls"], live_row["current_status"]
+        toss_winner, toss_decision = live_row["toss_winner"], live_row["toss_decision"]
+        if is_finished_status(current_status):
+            return jsonify({"status": "error", "message": "Match has already finished"}), 409
+        batting_team_name, _ = batting_and_bowling_teams(t1_name, t2_name, toss_winner, toss_decision, is_first)
+        if batting_team_name is None:
+            return jsonify({"status": "error", "message": "Toss hasn't been recorded yet"}), 409
+        bat = 1 if batting_team_name == t1_name else 2
+        bowl = 2 if bat == 1 else 1
+
+        if ball["batter_id"] is not None: striker_id = ball["batter_id"]
+        if ball["bowler_id"] is not None: bowler_id = ball["bowler_id"]
+        if striker_id is None or bowler_id is None:
+            return jsonify({"status": "error", "message": "Striker and bowler must be set"}), 400
+        out_id = scoring.out_player_id(ball, striker_id)
+        delta = scoring.compute_ball_delta(ball)
+        balls_after = (t1_balls if bat == 1 else t2_balls) + delta["team_balls"]
+        new_striker_id, new_non_striker_id = scoring.next_batters(striker_id, non_striker_id, ball, delta, balls_after)
+
+        # Fetch just the players this ball touches (and the non-striker, for the projections), with their array positions
+        batting_ids = [str(pid) for pid in {striker_id, non_striker_id, out_id, ball["next_batter_id"]} if pid is not None]
+        cur.execute(f"""
+            SELECT 'bat', e.i - 1, e.p FROM cricket_match_livescore ls,
+                   jsonb_array_elements(ls.team{bat}_batting_stats) WITH ORDINALITY AS e(p, i)
+            WHERE ls.match_id = %s AND e.p->>'id' = ANY(%s)
+            UNION ALL
+            SELECT 'bowl', e.i - 1, e.p FROM cricket_match_livescore ls,
+                   jsonb_array_elements(ls.team{bowl}_bowling_stats) WITH ORDINALITY AS e(p, i)
+            WHERE ls.match_id = %s AND e.p->>'id' = ANY(%s)
+        """, (match_id, batting_ids, match_id, [str(bowler_id)]))
+        found = {(kind, int(player["id"])): (index, player) for kind, index, player in cur.fetchall()}
+        updates = {'bat': [], 'bowl': []}
+        for kind, player_id, update in scoring.player_changes(ball, delta, striker_id, bowler_id):
+            index, player = found.get((kind, player_id), (None, scoring.new_player_stats(player_id)))
+            updates[kind].append((index, update(player)))
+
+        # Append the event; the first ball of a match also snapshots the pre-ball state as seq 0
+        innings, over_no, ball_no, event_payload = ball_events.build_event(
+            ball, bat, is_first, striker_id, non_striker_id, bowler_id, t1_balls if bat == 1 else t2_balls)
+        cur.execute("SELECT COALESCE(MAX(seq), 0) FROM cricket_ball_event WHERE match_id = %s", (match_id,))
+        seq = cur.fetchone()[0] + 1
+        if seq == 1: _write_scorecard_snapshot(cur, match_id, 0)
+        cur.execute(
+            "INSERT INTO cricket_ball_event (match_id, seq, innings, over_no, ball_no, payload) VALUES (%s, %s, %s, %s, %s, %s)",
+            (match_id, seq, innings, over_no, ball_no, json.dumps(event_payload))
+        )
+
+        params = [delta["team_runs"], delta["team_balls"], delta["team_wickets"], delta["team_extras"], delta["label"]]
+        batting_expr = _jsonb_player_updates(f"team{bat}_batting_stats", updates['bat'], params)
+        bowling_expr = _jsonb_player_updates(f"team{bowl}_bowling_stats", updates['bowl'], params)
+        params.extend([new_striker_id, new_non_striker_id, bowler_id])
+
+        # Projections: scalar payload keys from the scalars and the batters/bowler in play; the
+        # stats arrays and timeline copies inside score_projection get the same in-place patches
+        touched = {kind: {player_id: player for (k, player_id), (_, player) in found.items() if k == kind} for kind in ('bat', 'bowl')}
+        for kind in ('bat', 'bowl'):
+            for _, player in updates[kind]: touched[kind][player["id"]] = player
+        live_row.update({
+            f"team{bat}_runs": (live_row[f"team{bat}_runs"] or 0) + delta["team_runs"],
+            f"team{bat}_balls": balls_after,
+            f"team{bat}_wickets": min((live_row[f"team{bat}_wickets"] or 0) + delta["team_wickets"], scoring.MAX_WICKETS),
+            f"team{bat}_extras": (live_row[f"team{bat}_extras"] or 0) + delta["team_extras"],
+            "striker_id": new_striker_id, "non_striker_id": new_non_striker_id, "bowler_id": bowler_id,
+            f"team{bat}_batting_stats": list(touched['bat'].values()),
+            f"team{bowl}_bowling_stats": list(touched['bowl'].values()),
+        })
+        payload = build_live_score_payload(match_id, live_row)
+        params.append(json.dumps({key: value for key, value in payload.items() if key not in PROJECTION_ARRAY_KEYS}))
+        projection_batting = _jsonb_player_updates(f"(score_projection->'team{bat}_batting')", updates['bat'], params)
+        projection_bowling = _jsonb_player_updates(f"(score_projection->'team{bowl}_bowling')", updates['bowl'], params)
+        params.extend([delta["label"], json.dumps(select_fields(payload, SUMMARY_FIELDS)), match_id])
+        cur.execute(f"""
+            UPDATE cricket_match_livescore SET
+                team{bat}_runs = team{bat}_runs + %s,
+                team{bat}_balls = team{bat}_balls + %s,
+                team{bat}_wickets = LEAST(team{bat}_wickets + %s, {scoring.MAX_WICKETS}),
+                team{bat}_extras = team{bat}_extras + %s,
+                team{bat}_timeline = array_append(COALESCE(team{bat}_timeline, ARRAY[]::TEXT[]), %s),
+                team{bat}_batting_stats = {batting_expr},
+                team{bowl}_bowling_stats = {bowling_expr},
+                striker_id = %s, non_striker_id = %s, bowler_id = %s,
+                score_projection = CASE WHEN score_projection IS NULL THEN NULL ELSE -- Readers build it from the columns
+                    jsonb_set(jsonb_set(jsonb_set(score_projection || %s::jsonb,
+                        '{{team{bat}_batting}}', {projection_batting}),
+                        '{{team{bowl}_bowling}}', {projection_bowling}),
+                        '{{team{bat}_timeline}}', COALESCE(score_projection->'team{bat}_timeline', '[]'::jsonb) || to_jsonb(%s::text))
+                    END,
+                score_summary = %s::jsonb,
+                last_updated = NOW()
+            WHERE match_id = %s
+            RETURNING team{bat}_runs, team{bat}_wickets, team{bat}_balls, last_updated
+        """, params)
+        runs, wickets, balls, last_updated = cur.fetchone()
+        if seq % BALL_SNAPSHOT_INTERVAL == 0: _write_scorecard_snapshot(cur, match_id, seq)
+        conn.commit()
+        _on_livescore_changed(match_id)
+
+        return jsonify({
+            "status": "success", "message": "Ball recorded",
+            "seq": seq, "innings": innings, "over": over_no, "ball": ball_no,
+            "timeline_entry": delta["label"],
+            "batting_team_name": batting_team_name,
+            "score": f"{runs}/{wickets}", "overs": format_overs(balls),
+            "striker_id": new_striker_id, "non_striker_id": new_non_striker_id, "bowler_id": bowler_id,
+            "version": livescore_version(last_updated),
+        }), 200
+    except (Exception, psycopg2.Error) as e:
+        print(f"Error recording ball for match {match_id}: {e}")
+        traceback.print_exc()
+        try:
+            if conn: conn.rollback()
+        except Exception as rb_e: print(f"Rollback failed: {rb_e}")
+        return jsonify({"status": "error", "message": f"An error occurred: {str(e)}"}), 500
+    finally:
+        if cur and not cur.closed: cur.close()
+        if conn and not conn.closed: conn.close()
+
+
+@app.route('/api/undo_ball/<int:match_id>', methods=['POST'])
+def undo_ball(match_id):
+    """ Removes the last recorded ball: deletes the tail event and rebuilds the scorecard
+        from the latest earlier snapshot, so at most BALL_SNAPSHOT_INTERVAL events are replayed.
+        Refused (409) once update_live_score has written the row after that ball: its barrier
+        snapshot holds edits a rebuild from events can't reproduce. """
+    conn = None
+    cur = None
+    try:
+        conn = get_db_connection()
+        if conn is None: return jsonify({"status": "error", "message": "Database connection failed"}), 500
+        cur = conn.cursor()
+        cur.execute("SELECT current_status FROM cricket_match_livescore WHERE match_id = %s FOR UPDATE", (match_id,))
+        if not cur.fetchone(): return jsonify({"status": "error", "message": "Match not found"}), 404
+
+        cur.execute("""
+            DELETE FROM cricket_ball_event
+            WHERE match_id = %s AND seq = (SELECT MAX(seq) FROM cricket_ball_event WHERE match_id = %s)
+            RETURNING seq, payload
+        """, (match_id, match_id))
+        undone = cur.fetchone()
+        if not undone: return jsonify({"status": "error", "message": "No recorded balls to undo"}), 409
+        undone_seq, undone_payload = undone
+        cur.execute("SELECT 1 FROM cricket_scorecard_snapshot WHERE match_id = %s AND seq >= %s AND is_barrier",
+                    (match_id, undone_seq))
+        if cur.fetchone():
+            conn.rollback()
+            return jsonify({"status": "error",
+                            "message": "The scorecard was edited after the last ball; correct it on the full scorecard instead"}), 409
+        cur.execute("DELETE FROM cricket_scorecard_snapshot WHERE match_id = %s AND seq >= %s", (match_id, undone_seq))
+        replayed = _rebuild_from_snapshot(cur, match_id)
+        if replayed is None:
+            conn.rollback()
+            return jsonify({"status": "error", "message": "No scorecard snapshot to rebuild from"}), 409
+        conn.commit()
+        _on_livescore_changed(match_id)
+        return jsonify({
+            "status": "success", "message": "Last ball undone",
+            "undone_seq": undone_seq,
+            "timeline_entry": scoring.timeline_label(undone_payload["ball"]),
+            "replayed_events": replayed,
+        }), 200
+    except (Exception, psycopg2.Error) as e:
+        print(f"Error undoing last ball for match {match_id}: {e}")
+        traceback.print_exc()
+        try:
+            if conn: conn.rollback()
+        except Exception as rb_e: print(f"Rollback failed: {rb_e}")
+        return jsonify({"status": "error", "message": f"An error occurred: {str(e)}"}), 500
+    finally:
+        if cur and not cur.closed: cur.close()
+        if conn and not conn.closed: conn.close()
+
+
+@app.route('/api/rebuild_scorecard/<int:match_id>', methods=['POST'])
+def rebuild_scorecard(match_id):
+    """ Re-materialises the livescore columns from the latest snapshot plus the events after it. """
+    conn = None
+    cur = None
+    try:
+        conn = get_db_connection()
+        if conn is None: return jsonify({"status": "error", "message": "Database connection failed"}), 500
+        cur = conn.cursor()
+        cur.execute("SELECT 1 FROM cricket_match_livescore WHERE match_id = %s FOR UPDATE", (match_id,))
+        if not cur.fetchone(): return jsonify({"status": "error", "message": "Match not found"}), 404
+        replayed = _rebuild_from_snapshot(cur, match_id)
+        if replayed is None:
+            conn.rollback()
+            return jsonify({"status": "error", "message": "Match has no recorded balls"}), 409
+        conn.commit()
+        _on_livescore_changed(match_id)
+        return jsonify({"status": "success", "message": "Scorecard rebuilt", "replayed_events": replayed}), 200
+    except (Exception, psycopg2.Error) as e:
+        print(f"Error rebuilding scorecard for match {match_id}: {e}")
+        traceback.print_exc()
+        try:
+            if conn: conn.rollback()
+        except Exception as rb_e: print(f"Rollback failed: {rb_e}")
+        return jsonify({"status": "error", "message": f"An error occurred: {str(e)}"}), 500
+    finally:
+        if cur and not cur.closed: cur.close()
+        if conn and not conn.closed: conn.close()
+
+
+@app.route('/api/ball_events/<int:match_id>', methods=['GET'])
+def get_ball_events(match_id):
+    """ Ball-by-ball history, optionally limited to an innings and/or an over range
+        (over numbers restart each innings, so a range without ?innings= spans both). """
+    conn = None
+    cur = None
+    try:
+        innings = request.args.get('innings', type=int)
+        from_over = request.args.get('from_over', type=int)
+        to_over = request.args.get('to_over', type=int)
+        conn = get_db_connection()
+        if conn is None: return jsonify({"status": "error", "message": "Database connection failed"}), 500
+        cur = conn.cursor()
+        query = "SELECT seq, innings, over_no, ball_no, payload, created_at FROM cricket_ball_event WHERE match_id = %s"
+        params = [match_id]
+        if innings is not None:
+            query += " AND innings = %s"
+            params.append(innings)
+        if from_over is not None:
+            query += " AND over_no >= %s"
+            params.append(from_over)
+        if to_over is not None:
+            query += " AND over_no <= %s"
+            params.append(to_over)
+        query += " ORDER BY seq"
+        cur.execute(query, params)
+        events = [
+            {"seq": r[0], "innings": r[1], "over": r[2], "ball": r[3],
+             "timeline_entry": scoring.timeline_label(r[4]["ball"]), "event": r[4], "recorded_at": r[5]}
+            for r in cur.fetchall()
+        ]
+        return jsonify(events), 200
+    except (Exception, psycopg2.Error) as e:
+        print(f"Error fetching ball events for match {match_id}: {e}")
+        traceback.print_exc()
+        return jsonify({"status": "error", "message": str(e)}), 500
+    finally:
+        if cur and not cur.closed: cur.close()
+        if conn and not conn.closed: conn.close()
+
+
 @app.route('/api/get_live_updates/<int:match_id>', methods=['GET'])
 def get_live_updates(match_id):
     """ Fetches the latest full live update state for a specific match.
         Creates a default record if none exists. """
+    not_modified = _livescore_not_modified("lu", match_id)
+    if not_modified is not None: return not_modified
     conn = None
     cur = None
     try:
@@ -549,14 +1080,19 @@ def get_live_updates(match_id):
             # 2. Insert the default row
             try:
                 insert_default_query = """
-                    INSERT INTO cricket_match_livescore (match_id, team1_name, team2_name, current_status, summary_text)
-                    VALUES (%s, %s, %s, %s, %s)
+                    INSERT INTO cricket_match_livescore (match_id, team1_name, team2_name, current_status, summary_text,
+                                                         score_projection, score_summary)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
                     ON CONFLICT (match_id) DO NOTHING -- Safety net
                     RETURNING match_id, team1_name, team2_name, current_status, summary_text, is_first_innings, last_updated
                 """
-                cur.execute(insert_default_query, (match_id, team_a_name, team_b_name, initial_status, initial_summary))
+                projection = _score_projection_values(match_id, {
+                    "team1_name": team_a_name, "team2_name": team_b_name, "current_status": initial_status,
+                    "summary_text": initial_summary, "is_first_innings": True})
+                cur.execute(insert_default_query, (match_id, team_a_name, team_b_name, initial_status, initial_summary) + projection)
                 inserted_row_data = cur.fetchone()
                 conn.commit()
+                _on_livescore_changed(match_id)
 
                 if inserted_row_data:
                     print(f"Successfully created default livescore row for match_id {match_id}.")
@@ -604,7 +1140,9 @@ def get_live_updates(match_id):
         data["team2_batting"] = data.get("team2_batting_stats") or []
         data["team1_bowling"] = data.get("team1_bowling_stats") or []
 
-        return jsonify(data), 200
+        etag = http_cache.make_etag("lu", match_id, livescore_version(data.get("last_updated")))
+        response = jsonify(data)
+        return http_cache.add_validators(response, etag, is_finished_status(data.get("current_status")), FINISHED_MATCH_MAX_AGE_SECS), 200
         # --- End row processing ---
 
     except (Exception, psycopg2.Error) as e:
@@ -617,435 +1155,532 @@ def get_live_updates(match_id):
 
 
 # -------------------- Simplified live score endpoint (for User View Polling) --------------------
-@app.route('/api/get_live_score/<int:match_id>', methods=['GET'])
-def get_live_score(match_id):
-    """ Fetches simplified summary data plus detailed stats needed for the user view scorecard. """
+# Stored get_live_score projections, by field selection (others are built from the columns)
+SCORE_PROJECTION_COLUMNS = {None: "score_projection", SUMMARY_FIELDS: "score_summary"}
+
+# Payload keys copied from the JSONB stats / timeline columns; record_ball patches them in place
+PROJECTION_ARRAY_KEYS = frozenset(["team1_batting", "team2_bowling", "team2_batting", "team1_bowling", "team1_timeline", "team2_timeline"])
+
+def _score_projection_values(match_id, row):
+    """ (score_projection, score_summary) JSON for a livescore row dict (column -> value) as it
+        will be written. Writers store them in the same INSERT/UPDATE as the columns, so readers
+        never see a projection that disagrees with them and no extra row version is written. """
+    payload = build_live_score_payload(match_id, row)
+    return json.dumps(payload), json.dumps(select_fields(payload, SUMMARY_FIELDS))
+
+
+def _load_live_score_snapshots(match_ids, fields=None):
+    """ Reads several matches with one query (plus one for matches without a livescore row yet)
+        and returns their get_live_score payloads: {match_id: LiveScoreSnapshot | None}.
+        The full and summary views come from the stored projections; other `fields`
+        selections (see scoreboard.parse_field_selection) are built from just the columns they need. """
     conn = None; cur = None
     try:
-        conn = get_db_connection();
-        if conn is None: return jsonify({"status": "error", "message": "Database connection failed"}), 500
+        conn = get_db_connection()
+        if conn is None: raise DatabaseUnavailable()
         cur = conn.cursor()
-        # --- Fetch ALL necessary columns for the detailed view ---
-        query = """
-            SELECT
-                ls.team1_name, ls.team2_name, ls.team1_runs, ls.team1_wickets, ls.team1_balls,
-                ls.team2_runs, ls.team2_wickets, ls.team2_balls, ls.summary_text,
-                ls.striker_id, ls.non_striker_id, ls.bowler_id, ls.is_first_innings,
-                ls.toss_winner, ls.toss_decision, ls.current_status,
-                ls.team1_batting_stats, ls.team2_bowling_stats,
-                ls.team2_batting_stats, ls.team1_bowling_stats,
-                ls.live_result,
-                ls.team1_extras, ls.team2_extras, -- Fetch extras
-                -- ls.timeline -- <-- REMOVED
-                ls.team1_timeline, ls.team2_timeline -- <-- ADDED
-            FROM cricket_match_livescore ls
-            WHERE ls.match_id = %s
-            """
-        cur.execute(query, (match_id,))
-        live_data_row = cur.fetchone()
+        snapshots = dict.fromkeys(match_ids)
+        to_build = list(match_ids)
+        projection_column = SCORE_PROJECTION_COLUMNS.get(fields)
+        if projection_column:
+            # Precomputed at write time: no per-read Python beyond decoding the JSONB
+            cur.execute(f"SELECT match_id, {projection_column}, last_updated, current_status FROM cricket_match_livescore WHERE match_id = ANY(%s)", (to_build,))
+            for match_id, payload, last_updated, current_status in cur.fetchall():
+                if payload is None: continue # Not rewritten since the column was added - built below
+                snapshots[match_id] = LiveScoreSnapshot(match_id, livescore_version(last_updated), is_finished_status(current_status), payload)
+            to_build = [match_id for match_id, snapshot in snapshots.items() if snapshot is None]
+
+        if to_build:
+            # Only the columns the selected fields need; summary views skip the JSONB stats and timelines
+            columns = columns_for_fields(fields)
+            query = f"SELECT match_id, {', '.join(columns)} FROM cricket_match_livescore WHERE match_id = ANY(%s)"
+            cur.execute(query, (to_build,))
+            for live_data_row in cur.fetchall():
+                match_id = live_data_row[0]
+                row = dict(zip(columns, live_data_row[1:]))
+                payload = select_fields(build_live_score_payload(match_id, row), fields)
+                snapshots[match_id] = LiveScoreSnapshot(match_id, livescore_version(row["last_updated"]), is_finished_status(row["current_status"]), payload)
+
+        without_row = [match_id for match_id, snapshot in snapshots.items() if snapshot is None]
+        if without_row:
+            # No livescore row yet - answer from cricket_match, but don't cache it
+            cur.execute("SELECT match_id, team_a_name, team_b_name, match_status FROM cricket_match WHERE match_id = ANY(%s)", (without_row,))
+            for match_id, t1_name_fallback, t2_name_fallback, status_fallback in cur.fetchall():
+                payload = select_fields(build_fallback_live_score(match_id, t1_name_fallback, t2_name_fallback, status_fallback), fields)
+                snapshots[match_id] = LiveScoreSnapshot(match_id, None, status_fallback == 'finished', payload)
+        return snapshots
+    finally:
+        if cur and not cur.closed: cur.close()
+        if conn and not conn.closed: conn.close()
 
-        if not live_data_row:
-            # Fallback logic remains the same (returns minimal data)
-            cur.execute("SELECT team_a_name, team_b_name, match_status FROM cricket_match WHERE match_id = %s", (match_id,))
-            match_info = cur.fetchone()
-            if not match_info: return jsonify({"status": "error", "message": "Match not found"}), 404
-
-            t1_name_fallback, t2_name_fallback, status_fallback = match_info
-            summary_fallback = "Match hasn't started yet."
-            status_text_fallback = "Upcoming"
-            if status_fallback == 'live':
-                 summary_fallback = "Toss will happen soon."
-                 status_text_fallback = "Live"
-            elif status_fallback == 'finished':
-                live_result_fallback = "Match Finished"
-                try:
-                    cur.execute("SELECT live_result FROM cricket_match_livescore WHERE match_id = %s", (match_id,))
-                    result_row_fallback = cur.fetchone()
-                    if result_row_fallback and result_row_fallback[0]:
-                         live_result_fallback = result_row_fallback[0]
-                except: pass
-                summary_fallback = live_result_fallback
-                status_text_fallback = "Finished"
-
-            # --- Include default empty/zero values for detailed fields in fallback ---
-            initial_score_data = {
-                "match_id": match_id, "team_a_name": t1_name_fallback, "team_b_name": t2_name_fallback,
-                "team_a_score": "0/0", "team_a_overs": "(0.0)",
-                "team_b_score": "0/0", "team_b_overs": "(0.0)",
-                "match_status_text": status_text_fallback, "summary_text": summary_fallback,
-                "batting_team_name": None, "bowling_team_name": None,
-                "batsman_on_strike_name": "N/A", "batsman_on_strike_score": "-",
-                "batsman_off_strike_name": "N/A", "batsman_off_strike_score": "-",
-                "bowler_on_strike_name": "N/A", "bowler_on_strike_figures": "-",
-                "bowler_off_strike_name": "N/A", "bowler_off_strike_figures": "-",
-                "team1_batting": [], "team2_bowling": [], # Send empty lists
-                "team2_batting": [], "team1_bowling": [], # Send empty lists
-                "team1_extras": 0, "team2_extras": 0, # Send zero extras
-                "is_first_innings": True, # Assume first innings if upcoming/toss
-                # "timeline": [] # <-- REMOVED
-                "team1_timeline": [], "team2_timeline": [] # <-- ADDED
-            }
-            return jsonify(initial_score_data), 200
-
-        # --- Process detailed live_data_row (Column order matters!) ---
-        (t1_name, t2_name, t1_runs, t1_wickets, t1_balls, t2_runs, t2_wickets, t2_balls, summary,
-         striker_id, non_striker_id, bowler_id, is_first,
-         toss_winner_name, toss_decision_val, current_status,
-         t1_bat_stats_json, t2_bowl_stats_json, t2_bat_stats_json, t1_bowl_stats_json,
-         live_result, team1_extras, team2_extras,
-         # timeline) = live_data_row # <-- REMOVED
-         team1_timeline, team2_timeline) = live_data_row # <-- ADDED
-        # --- END Process detailed live_data_row ---
-
-
-        batting_team_name, bowling_team_name = None, None
-        striker_name, striker_score = "N/A", "-"
-        non_striker_name, non_striker_score = "N/A", "-"
-        bowler_name, bowler_figures = "N/A", "-"
-
-        # Determine batting/bowling teams
-        if is_first is not None and toss_winner_name and toss_decision_val:
-            team_a_bats_first = (toss_winner_name == t1_name and toss_decision_val.lower() == 'bat') or \
-                                (toss_winner_name == t2_name and toss_decision_val.lower() == 'bowl')
-            if is_first:
-                batting_team_name = t1_name if team_a_bats_first else t2_name
-                bowling_team_name = t2_name if team_a_bats_first else t1_name
-            else:
-                batting_team_name = t2_name if team_a_bats_first else t1_name
-                bowling_team_name = t1_name if team_a_bats_first else t2_name
-
-            # Function to find player stats from JSONB data (Remains the same)
-            def get_player_stats_from_json(player_id, is_batsman):
-                if player_id is None: return "N/A", "-"
-                stats_list = []
-                # Use correct JSON variable
-                if is_batsman: stats_list = t1_bat_stats_json if batting_team_name == t1_name else t2_bat_stats_json
-                else: stats_list = t1_bowl_stats_json if bowling_team_name == t1_name else t2_bowl_stats_json
-                if stats_list is None: stats_list = []
-                player_stat = next((p for p in stats_list if p.get('id') == player_id), None)
-                if player_stat is None: return f"P{player_id}", "-"
-                name = player_stat.get('name', f"P{player_id}")
-                if is_batsman:
-                    runs = player_stat.get('runs', 0); balls = player_stat.get('ballsFaced', 0)
-                    return name, f"{runs}({balls})"
-                else:
-                    wickets=player_stat.get('wicketsTaken',0); runs_conceded=player_stat.get('runsConceded',0); balls_bowled=player_stat.get('ballsBowled',0)
-                    overs = balls_bowled // 6; balls_in_over = balls_bowled % 6
-                    return name, f"{wickets}/{runs_conceded} ({overs}.{balls_in_over})"
-
-            striker_name, striker_score = get_player_stats_from_json(striker_id, True)
-            non_striker_name, non_striker_score = get_player_stats_from_json(non_striker_id, True)
-            bowler_name, bowler_figures = get_player_stats_from_json(bowler_id, False)
-
-        t1_score_str = f"{t1_runs or 0}/{t1_wickets or 0}"
-        t1_overs_str = f"({(t1_balls or 0) // 6}.{(t1_balls or 0) % 6})"
-        t2_score_str = f"{t2_runs or 0}/{t2_wickets or 0}"
-        t2_overs_str = f"({(t2_balls or 0) // 6}.{(t2_balls or 0) % 6})"
-
-        db_current_status = current_status or "upcoming"
-        display_summary = live_result if db_current_status.lower() == "finished" and live_result else summary
-
-        # --- Construct the full response dictionary ---
-        score_data = {
-            "match_id": match_id,
-            "team_a_name": t1_name, "team_b_name": t2_name,
-            "team_a_score": t1_score_str, "team_a_overs": t1_overs_str,
-            "team_b_score": t2_score_str, "team_b_overs": t2_overs_str,
-            "match_status_text": db_current_status,
-            "summary_text": display_summary or "Match in progress.",
-            "batting_team_name": batting_team_name,
-            "bowling_team_name": bowling_team_name,
-            "batsman_on_strike_name": striker_name or "N/A",
-            "batsman_on_strike_score": striker_score or "-",
-            "batsman_off_strike_name": non_striker_name or "N/A",
-            "batsman_off_strike_score": non_striker_score or "-",
-            "bowler_on_strike_name": bowler_name or "N/A",
-            "bowler_on_strike_figures": bowler_figures or "-",
-            "bowler_off_strike_name": "N/A", # Only current bowler needed for summary
-            "bowler_off_strike_figures": "-",
-            # Include the detailed stats lists
-            "team1_batting": t1_bat_stats_json or [],
-            "team2_bowling": t2_bowl_stats_json or [],
-            "team2_batting": t2_bat_stats_json or [],
-            "team1_bowling": t1_bowl_stats_json or [],
-            "team1_extras": team1_extras or 0,
-            "team2_extras": team2_extras or 0,
-            "is_first_innings": is_first, # Include innings flag
-            # "timeline": timeline or [] # <-- REMOVED
-            "team1_timeline": team1_timeline or [], # <-- ADDED
-            "team2_timeline": team2_timeline or []  # <-- ADDED
-        }
-        # --- END Construct the full response dictionary ---
-
-        return jsonify(score_data), 200
+
+def _load_live_score_snapshot(match_id, fields=None):
+    """ Single-match form of _load_live_score_snapshots; None if the match doesn't exist. """
+    return _load_live_score_snapshots([match_id], fields).get(match_id)
+
+
+def _requested_live_score_fields():
+    """ Field selection from ?view=summary|full and/or ?fields=a,b (ValueError if invalid). """
+    return parse_field_selection(request.args.get('view'), request.args.get('fields'))
+
+
+def _live_score_etag_kind(fields):
+    """ ETag prefix per representation, so a summary and a full payload never validate each other. """
+    if fields is None: return "ls"
+    if fields == SUMMARY_FIELDS: return "ls.summary"
+    return f"ls.{zlib.crc32(','.join(sorted(fields)).encode('utf-8')):08x}"
+
+
+@app.route('/api/get_live_score/<int:match_id>', methods=['GET'])
+def get_live_score(match_id):
+    """ Fetches simplified summary data plus detailed stats needed for the user view scorecard.
+        ?view=summary or ?fields=a,b return (and read) only part of the payload.
+        Served from the per-match snapshot cache; writes invalidate it. """
+    try:
+        fields = _requested_live_score_fields()
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    try:
+        snapshot = live_score_cache.get_or_load(match_id, lambda: _load_live_score_snapshot(match_id, fields), fields)
+        if snapshot is None: return jsonify({"status": "error", "message": "Match not found"}), 404
+        etag = http_cache.make_etag(_live_score_etag_kind(fields), match_id, snapshot.version)
+        if http_cache.client_has_current(request, etag):
+            return http_cache.not_modified(etag, snapshot.finished, FINISHED_MATCH_MAX_AGE_SECS)
+        response = jsonify(snapshot.payload)
+        return http_cache.add_validators(response, etag, snapshot.finished, FINISHED_MATCH_MAX_AGE_SECS), 200
+    except DatabaseUnavailable:
+        return jsonify({"status": "error", "message": "Database connection failed"}), 500
     except (Exception, psycopg2.Error) as e:
         print(f"Error fetching detailed live score {match_id}: {e}")
         traceback.print_exc()
         return jsonify({"status": "error", "message": f"An error occurred: {str(e)}"}), 500
-    finally:
-        if cur and not cur.closed: cur.close()
-        if conn and not conn.closed: conn.close()
 
 
-# -------------------- NEW PDF DOWNLOAD ENDPOINT --------------------
+@app.route('/api/get_live_scores', methods=['GET'])
+def get_live_scores():
+    """ get_live_score for several matches at once: ?ids=1,2,3 (same view/fields options).
+        Returns {match_id: payload}, with null for unknown matches. Cache misses are
+        read with one query, so the cost doesn't grow in round trips with the number of ids. """
+    try:
+        match_ids = list(dict.fromkeys(int(part) for part in request.args.get('ids', '').split(',') if part.strip()))
+    except ValueError:
+        return jsonify({"status": "error", "message": "'ids' must be a comma-separated list of match ids"}), 400
+    if not match_ids:
+        return jsonify({"status": "error", "message": "'ids' is required"}), 400
+    if len(match_ids) > LIVE_SCORES_MAX_IDS:
+        return jsonify({"status": "error", "message": f"At most {LIVE_SCORES_MAX_IDS} ids per request"}), 400
+    try:
+        fields = _requested_live_score_fields()
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    try:
+        snapshots = live_score_cache.get_many_or_load(match_ids, lambda ids: _load_live_score_snapshots(ids, fields), fields)
+        # One validator for the whole set, only when every match has a real version
+        etag = None
+        if all(s is not None and s.version is not None for s in snapshots.values()):
+            ids_key = zlib.crc32(','.join(map(str, match_ids)).encode('utf-8'))
+            versions_key = zlib.crc32(','.join(str(snapshots[m].version) for m in match_ids).encode('utf-8'))
+            etag = http_cache.make_etag(f"{_live_score_etag_kind(fields)}.batch", f"{ids_key:08x}", f"{versions_key:08x}")
+        finished = all(s is not None and s.finished for s in snapshots.values())
+        if http_cache.client_has_current(request, etag):
+            return http_cache.not_modified(etag, finished, FINISHED_MATCH_MAX_AGE_SECS)
+        response = jsonify({str(m): (snapshots[m].payload if snapshots[m] is not None else None) for m in match_ids})
+        return http_cache.add_validators(response, etag, finished, FINISHED_MATCH_MAX_AGE_SECS), 200
+    except DatabaseUnavailable:
+        return jsonify({"status": "error", "message": "Database connection failed"}), 500
+    except (Exception, psycopg2.Error) as e:
+        print(f"Error fetching live scores {match_ids}: {e}")
+        traceback.print_exc()
+        return jsonify({"status": "error", "message": f"An error occurred: {str(e)}"}), 500
 
-def _create_scorecard_pdf(data):
-    """ Helper function to generate the PDF from match data with improved table styling. """
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=0.5*inch, bottomMargin=0.5*inch, leftMargin=0.5*inch, rightMargin=0.5*inch)
-    story = []
-    styles = getSampleStyleSheet()
-    
-    # --- Custom Styles ---
-    # Header style for tables
-    header_style = ParagraphStyle(name='TableHeader', parent=styles['Normal'], fontName='Helvetica-Bold', alignment=1) # Center alignment=1
-    # Right-aligned style for numbers in tables
-    right_align_style = ParagraphStyle(name='RightAlign', parent=styles['Normal'], alignment=2) # Right alignment=2
-    # --- End Custom Styles ---
-
-    # --- Title & Result ---
-    story.append(Paragraph("Official Match Scorecard", styles['h1']))
-    story.append(Paragraph(f"{data.get('team1_name', 'Team A')} vs {data.get('team2_name', 'Team B')}", styles['h2']))
-    story.append(Paragraph(data.get('live_result') or "Match in Progress", styles['h3']))
-    
-    # --- Match Info ---
-    toss_winner = data.get('toss_winner')
-    toss_decision = data.get('toss_decision')
-    toss_text = f"Toss: {toss_winner} won the toss and chose to {toss_decision}." if toss_winner else "Toss not yet decided."
-    story.append(Paragraph(toss_text, styles['Normal']))
-    
-    # --- Determine who batted first ---
-    # ... (same logic as before to determine batting order) ...
-    team1_name = data.get('team1_name')
-    team2_name = data.get('team2_name')
-    team1_batted_first = True 
-    if toss_winner and toss_decision:
-        if (toss_winner == team1_name and toss_decision.lower() == 'bowl') or \
-           (toss_winner == team2_name and toss_decision.lower() == 'bat'):
-            team1_batted_first = False
-            
-    first_batting_team_name = team1_name if team1_batted_first else team2_name
-    second_batting_team_name = team2_name if team1_batted_first else team1_name
-    
-    first_batting_stats = data.get('team1_batting') if team1_batted_first else data.get('team2_batting')
-    first_bowling_stats = data.get('team2_bowling') if team1_batted_first else data.get('team1_bowling')
-    first_innings_runs = data.get('team1_runs') if team1_batted_first else data.get('team2_runs')
-    first_innings_wickets = data.get('team1_wickets') if team1_batted_first else data.get('team2_wickets')
-    first_innings_balls = data.get('team1_balls') if team1_batted_first else data.get('team2_balls')
-    first_innings_extras = data.get('team1_extras') if team1_batted_first else data.get('team2_extras')
-    first_innings_timeline = data.get('team1_timeline') if team1_batted_first else data.get('team2_timeline')
-    
-    second_batting_stats = data.get('team2_batting') if team1_batted_first else data.get('team1_batting')
-    second_bowling_stats = data.get('team1_bowling') if team1_batted_first else data.get('team2_bowling')
-    second_innings_runs = data.get('team2_runs') if team1_batted_first else data.get('team1_runs')
-    second_innings_wickets = data.get('team2_wickets') if team1_batted_first else data.get('team1_wickets')
-    second_innings_balls = data.get('team2_balls') if team1_batted_first else data.get('team1_balls')
-    second_innings_extras = data.get('team2_extras') if team1_batted_first else data.get('team1_extras')
-    second_innings_timeline = data.get('team2_timeline') if team1_batted_first else data.get('team1_timeline')
-    
-
-    # --- Define Table Styles ---
-    batting_table_style = TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.grey),
-        ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
-        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-        ('ALIGN', (0,1), (0,-1), 'LEFT'), # Left align Batsman name
-        ('ALIGN', (1,1), (1,-1), 'LEFT'), # Left align Status
-        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-        ('BOTTOMPADDING', (0,0), (-1,0), 10),
-        ('BACKGROUND', (0,1), (-1,-1), colors.beige),
-        ('GRID', (0,0), (-1,-1), 1, colors.black),
-        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-        ('LEFTPADDING', (0,0), (-1,-1), 5),
-        ('RIGHTPADDING', (0,0), (-1,-1), 5),
-    ])
-
-    bowling_table_style = TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.darkslategray), # Different header color
-        ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
-        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-        ('ALIGN', (0,1), (0,-1), 'LEFT'), # Left align Bowler name
-        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-        ('BOTTOMPADDING', (0,0), (-1,0), 10),
-        ('BACKGROUND', (0,1), (-1,-1), colors.lightgrey), # Different row color
-        ('GRID', (0,0), (-1,-1), 1, colors.black),
-        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-        ('LEFTPADDING', (0,0), (-1,-1), 5),
-        ('RIGHTPADDING', (0,0), (-1,-1), 5),
-    ])
-    # --- End Define Table Styles ---
-
-
-    # --- Innings 1 ---
-    story.append(Spacer(1, 0.2 * inch))
-    story.append(Paragraph(f"<b>Innings 1: {first_batting_team_name} Batting</b>", styles['h4'])) # Make bold
-    story.append(Spacer(1, 0.05 * inch)) # Less space before table
-
-    # Batting Table 1
-    # Wrap headers in Paragraphs for styling
-    batting_header = [Paragraph('Batsman', header_style), Paragraph('Status', header_style), Paragraph('R', header_style), Paragraph('B', header_style)]
-    batting_data = [batting_header]
-    for p in (first_batting_stats or []):
-        if p.get('ballsFaced', 0) > 0 or p.get('status') not in ['Yet to bat', 'Not Out']:
-            # Wrap numbers in Paragraphs for right alignment
-            batting_data.append([
-                Paragraph(p.get('name', ''), styles['Normal']), # Name left-aligned by default
-                Paragraph(p.get('status', ''), styles['Normal']), # Status left-aligned
-                Paragraph(str(p.get('runs', 0)), right_align_style), # Runs right-aligned
-                Paragraph(str(p.get('ballsFaced', 0)), right_align_style) # Balls right-aligned
-            ])
-    
-    batting_table_1 = Table(batting_data, colWidths=[2.5*inch, 2.5*inch, 0.5*inch, 0.5*inch])
-    batting_table_1.setStyle(batting_table_style)
-    story.append(batting_table_1)
-    
-    story.append(Spacer(1, 0.05 * inch))
-    story.append(Paragraph(f"Extras: {first_innings_extras}", styles['Normal']))
-    first_overs = f"{(first_innings_balls or 0) // 6}.{(first_innings_balls or 0) % 6}"
-    story.append(Paragraph(f"<b>Total: {first_innings_runs}/{first_innings_wickets} ({first_overs} Overs)</b>", styles['h4'])) # Make bold
-
-    # Bowling Table 1
-    story.append(Spacer(1, 0.1 * inch))
-    story.append(Paragraph(f"<b>{second_batting_team_name} Bowling</b>", styles['h4'])) # Make bold
-    story.append(Spacer(1, 0.05 * inch))
-    
-    bowling_header = [Paragraph('Bowler', header_style), Paragraph('O', header_style), Paragraph('R', header_style), Paragraph('W', header_style)]
-    bowling_data = [bowling_header]
-    for p in (first_bowling_stats or []):
-        if p.get('ballsBowled', 0) > 0:
-            overs = f"{(p.get('ballsBowled', 0) // 6)}.{(p.get('ballsBowled', 0) % 6)}"
-            bowling_data.append([
-                Paragraph(p.get('name', ''), styles['Normal']),
-                Paragraph(overs, right_align_style),
-                Paragraph(str(p.get('runsConceded', 0)), right_align_style),
-                Paragraph(str(p.get('wicketsTaken', 0)), right_align_style)
-            ])
-            
-    bowling_table_1 = Table(bowling_data, colWidths=[3.5*inch, 0.7*inch, 0.7*inch, 0.7*inch])
-    bowling_table_1.setStyle(bowling_table_style)
-    story.append(bowling_table_1)
-
-
-    # --- Innings 2 ---
-    story.append(Spacer(1, 0.2 * inch))
-    story.append(Paragraph(f"<b>Innings 2: {second_batting_team_name} Batting</b>", styles['h4'])) # Make bold
-    story.append(Spacer(1, 0.05 * inch))
-
-    # Batting Table 2 (Apply same style)
-    batting_data_2 = [batting_header] # Reuse header
-    for p in (second_batting_stats or []):
-        if p.get('ballsFaced', 0) > 0 or p.get('status') not in ['Yet to bat']:
-             batting_data_2.append([
-                Paragraph(p.get('name', ''), styles['Normal']),
-                Paragraph(p.get('status', ''), styles['Normal']),
-                Paragraph(str(p.get('runs', 0)), right_align_style),
-                Paragraph(str(p.get('ballsFaced', 0)), right_align_style)
-             ])
-             
-    batting_table_2 = Table(batting_data_2, colWidths=[2.5*inch, 2.5*inch, 0.5*inch, 0.5*inch])
-    batting_table_2.setStyle(batting_table_style) # Apply the style
-    story.append(batting_table_2)
-    
-    story.append(Spacer(1, 0.05 * inch))
-    story.append(Paragraph(f"Extras: {second_innings_extras}", styles['Normal']))
-    second_overs = f"{(second_innings_balls or 0) // 6}.{(second_innings_balls or 0) % 6}"
-    story.append(Paragraph(f"<b>Total: {second_innings_runs}/{second_innings_wickets} ({second_overs} Overs)</b>", styles['h4'])) # Make bold
-    
-    # Bowling Table 2 (Apply same style)
-    story.append(Spacer(1, 0.1 * inch))
-    story.append(Paragraph(f"<b>{first_batting_team_name} Bowling</b>", styles['h4'])) # Make bold
-    story.append(Spacer(1, 0.05 * inch))
-    
-    bowling_data_2 = [bowling_header] # Reuse header
-    for p in (second_bowling_stats or []):
-        if p.get('ballsBowled', 0) > 0:
-            overs = f"{(p.get('ballsBowled', 0) // 6)}.{(p.get('ballsBowled', 0) % 6)}"
-            bowling_data_2.append([
-                Paragraph(p.get('name', ''), styles['Normal']),
-                Paragraph(overs, right_align_style),
-                Paragraph(str(p.get('runsConceded', 0)), right_align_style),
-                Paragraph(str(p.get('wicketsTaken', 0)), right_align_style)
-            ])
-            
-    bowling_table_2 = Table(bowling_data_2, colWidths=[3.5*inch, 0.7*inch, 0.7*inch, 0.7*inch])
-    bowling_table_2.setStyle(bowling_table_style) # Apply the style
-    story.append(bowling_table_2)
-
-
-    # --- Timelines ---
-    story.append(Spacer(1, 0.2 * inch))
-    story.append(Paragraph("<b>Innings 1 Timeline</b>", styles['h4']))
-    story.append(Paragraph(", ".join(first_innings_timeline or []), styles['Normal']))
-    story.append(Spacer(1, 0.1 * inch))
-    story.append(Paragraph("<b>Innings 2 Timeline</b>", styles['h4']))
-    story.append(Paragraph(", ".join(second_innings_timeline or []), styles['Normal']))
-
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
-
-
-# ... (rest of the file, including the download_scorecard_pdf route, remains the same) ...
 
-@app.route('/api/download_scorecard_pdf/<int:match_id>', methods=['GET'])
-def download_scorecard_pdf(match_id):
-    """ Fetches all match data and generates a PDF scorecard. """
+def _sse_event(snapshot):
+    """ Formats a snapshot as an SSE 'score' event; the id is the row version. """
+    data = app.json.dumps(snapshot.payload)
+    return f"id: {snapshot.version or 0}\nevent: score\ndata: {data}\n\n"
+
+
+@app.route('/api/stream_live_score/<int:match_id>', methods=['GET'])
+def stream_live_score(match_id):
+    """ Pushes the get_live_score payload (same view/fields options) every time the match's livescore row changes.
+        Resumes from Last-Event-ID (skips the initial event if the client is current),
+        sends heartbeats while idle and closes once the match is finished. """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        fields = _requested_live_score_fields()
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    loader = lambda: _load_live_score_snapshot(match_id, fields)
+    try:
+        snapshot = live_score_cache.get_or_load(match_id, loader, fields)
+    except DatabaseUnavailable:
+        return jsonify({"status": "error", "message": "Database connection failed"}), 500
+    except (Exception, psycopg2.Error) as e:
+        print(f"Error opening live score stream {match_id}: {e}")
+        traceback.print_exc()
+        return jsonify({"status": "error", "message": f"An error occurred: {str(e)}"}), 500
+    if snapshot is None: return jsonify({"status": "error", "message": "Match not found"}), 404
+
+    # Subscribe before the first send so a write in between isn't missed
+    subscription = live_bus.subscribe(match_id)
+
+    def generate():
+        current = snapshot
+        last_sent = last_event_id
+        deadline = time.monotonic() + SSE_MAX_STREAM_SECS
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            while True:
+                if current is None: # Match was deleted
+                    yield "event: end\ndata: {}\n\n"
+                    return
+                if str(current.version or 0) != last_sent:
+                    yield _sse_event(current)
+                    last_sent = str(current.version or 0)
+                if current.finished:
+                    yield "event: end\ndata: {}\n\n"
+                    return
+                if time.monotonic() >= deadline:
+                    return
+                if subscription.get(timeout=SSE_HEARTBEAT_SECS) is None:
+                    yield ": heartbeat\n\n"
+                # Re-read through the shared cache on both pushes and heartbeats, which also
+                # picks up writes handled by other worker processes once the entry expires
+                try:
+                    current = live_score_cache.get_or_load(match_id, loader, fields)
+                except (Exception, psycopg2.Error) as e:
+                    print(f"Error refreshing live score stream {match_id}: {e}")
+        finally:
+            subscription.close()
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers=headers)
+
+
+# -------------------- NEW PDF DOWNLOAD ENDPOINT --------------------
+
+def _send_scorecard_pdf(match_id, pdf, version, finished):
+    """ Sends PDF bytes or a cached file path as the scorecard download. """
+    source = pdf if isinstance(pdf, str) else io.BytesIO(pdf)
+    response = send_file(
+        source,
+        as_attachment=True,
+        download_name=f'scorecard_match_{match_id}.pdf',
+        mimetype='application/pdf',
+        etag=False # We set our own version-based ETag below
+    )
+    etag = http_cache.make_etag("pdf", match_id, version)
+    return http_cache.add_validators(response, etag, finished, FINISHED_MATCH_MAX_AGE_SECS)
+
+
+# Full livescore row needed to render a scorecard (same columns get_live_updates reads)
+SCORECARD_PDF_COLUMNS = [
+    "match_id", "toss_winner", "toss_decision", "current_status", "live_result", "break_status",
+    "team1_name", "team2_name", "team1_runs", "team1_wickets", "team1_balls",
+    "team2_runs", "team2_wickets", "team2_balls", "team1_extras", "team2_extras",
+    "summary_text", "striker_id", "non_striker_id", "bowler_id",
+    "is_first_innings", "target_score", "first_innings_balls",
+    "team1_batting_stats", "team2_bowling_stats",
+    "team2_batting_stats", "team1_bowling_stats", "last_updated",
+    "team1_timeline", "team2_timeline"
+]
+
+def _scorecard_data_from_row(row):
+    """ SCORECARD_PDF_COLUMNS row -> the dict scorecard_pdf.render_scorecard_pdf expects. """
+    data = dict(zip(SCORECARD_PDF_COLUMNS, row))
+    # Rename JSONB columns for consistency
+    data["team1_batting"] = data.get("team1_batting_stats") or []
+    data["team2_bowling"] = data.get("team2_bowling_stats") or []
+    data["team2_batting"] = data.get("team2_batting_stats") or []
+    data["team1_bowling"] = data.get("team1_bowling_stats") or []
+    return data
+
+
+def _load_scorecard_data(match_id):
+    """ Scorecard data for one match, or None if the match has no livescore row. """
     conn = None
     cur = None
     try:
         conn = get_db_connection()
-        if conn is None: return jsonify({"status": "error", "message": "Database connection failed"}), 500
+        if conn is None: raise DatabaseUnavailable("Database connection failed")
         cur = conn.cursor()
-        
-        # Use the same comprehensive query from get_live_updates
-        all_columns = [
-            "match_id", "toss_winner", "toss_decision", "current_status", "live_result", "break_status",
-            "team1_name", "team2_name", "team1_runs", "team1_wickets", "team1_balls",
-            "team2_runs", "team2_wickets", "team2_balls", "team1_extras", "team2_extras",
-            "summary_text", "striker_id", "non_striker_id", "bowler_id",
-            "is_first_innings", "target_score", "first_innings_balls",
-            "team1_batting_stats", "team2_bowling_stats",
-            "team2_batting_stats", "team1_bowling_stats", "last_updated",
-            "team1_timeline", "team2_timeline"
-        ]
-        query = f"SELECT {', '.join(all_columns)} FROM cricket_match_livescore WHERE match_id = %s"
+        query = f"SELECT {', '.join(SCORECARD_PDF_COLUMNS)} FROM cricket_match_livescore WHERE match_id = %s"
         cur.execute(query, (match_id,))
         row = cur.fetchone()
-        
-        if not row:
-            return jsonify({"status": "error", "message": "Match data not found"}), 404
-        
-        # Convert row to dictionary
-        colnames = [desc[0] for desc in cur.description]
-        data = dict(zip(colnames, row))
-        
-        # Rename JSONB columns for consistency
-        data["team1_batting"] = data.get("team1_batting_stats") or []
-        data["team2_bowling"] = data.get("team2_bowling_stats") or []
-        data["team2_batting"] = data.get("team2_batting_stats") or []
-        data["team1_bowling"] = data.get("team1_bowling_stats") or []
+        return _scorecard_data_from_row(row) if row else None
+    finally:
+        if cur and not cur.closed: cur.close()
+        if conn and not conn.closed: conn.close()
 
-        # Generate the PDF
-        pdf_buffer = _create_scorecard_pdf(data) # Calls the updated function
-        
-        # Send the PDF file back to the client
-        return send_file(
-            pdf_buffer,
-            as_attachment=True,
-            download_name=f'scorecard_match_{match_id}.pdf',
-            mimetype='application/pdf'
-        )
 
+def _submit_scorecard_job(match_id, version_info):
+    """ Render job for the match's current version: an existing one if held, otherwise a new one.
+        Returns None when the match has no livescore row. """
+    if version_info is not None:
+        job = pdf_render_service.find(match_id, version_info[0])
+        if job is not None: return job
+    data = _load_scorecard_data(match_id)
+    if data is None: return None
+    version = livescore_version(data.get("last_updated"))
+    finished = is_finished_status(data.get("current_status"))
+    return pdf_render_service.submit(match_id, version, finished, data)
+
+
+def _scorecard_job_response(job):
+    """ 200 when the job is done, 202 (with Location/Retry-After) while it is pending, 500 if it failed. """
+    job_info = job.to_dict()
+    job_info["status_url"] = f"/api/scorecard_jobs/{job.job_id}"
+    job_info["download_url"] = f"/api/scorecard_jobs/{job.job_id}/download"
+    state = job_info["state"]
+    if state == JOB_FAILED:
+        return jsonify({"status": "error", "message": f"Scorecard rendering failed: {job.error}", "job": job_info}), 500
+    response = jsonify({"status": "success", "job": job_info})
+    if state == JOB_DONE: return response, 200
+    response.headers["Location"] = job_info["status_url"]
+    response.headers["Retry-After"] = str(PDF_RENDER_RETRY_AFTER_SECS)
+    return response, 202
+
+
+@app.route('/api/download_scorecard_pdf/<int:match_id>', methods=['GET'])
+def download_scorecard_pdf(match_id):
+    """ Sends the scorecard PDF when a rendered copy of the current version is cached.
+        Otherwise queues a render job and answers 202 with its status and download URLs. """
+    version_info = _fetch_livescore_version(match_id)
+    not_modified = _livescore_not_modified("pdf", match_id, version_info)
+    if not_modified is not None: return not_modified
+    if version_info is not None:
+        version, finished = version_info
+        cached = scorecard_pdf_cache.get(match_id, version)
+        if cached is not None:
+            return _send_scorecard_pdf(match_id, cached, version, finished)
+
+    try:
+        if request_profiler.explicit() and (version_info is None or pdf_render_service.find(match_id, version_info[0]) is None):
+            # Requested profiles render on this thread so the ReportLab build shows up in the profile.
+            # Sampled ones stay on the render pool: production traffic must not stall request workers
+            data = _load_scorecard_data(match_id)
+            if data is None:
+                return jsonify({"status": "error", "message": "Match data not found"}), 404
+            version = livescore_version(data.get("last_updated"))
+            finished = is_finished_status(data.get("current_status"))
+            pdf_bytes = render_scorecard_pdf(data)
+            scorecard_pdf_cache.put(match_id, version, pdf_bytes, finished)
+            return _send_scorecard_pdf(match_id, pdf_bytes, version, finished)
+
+        job = _submit_scorecard_job(match_id, version_info)
+        if job is None:
+            return jsonify({"status": "error", "message": "Match data not found"}), 404
+        if job.state == JOB_DONE and job.pdf_bytes is not None:
+            return _send_scorecard_pdf(match_id, job.pdf_bytes, job.version, job.finished)
+        return _scorecard_job_response(job)
+    except DatabaseUnavailable as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
     except (Exception, psycopg2.Error) as e:
         print(f"Error generating PDF for match {match_id}: {e}")
         traceback.print_exc()
         return jsonify({"status": "error", "message": str(e)}), 500
-    finally:
-        if cur and not cur.closed: cur.close()
-        if conn and not conn.closed: conn.close()
+
+
+@app.route('/api/scorecard_jobs/<int:match_id>', methods=['POST'])
+def create_scorecard_job(match_id):
+    """ Queues (or joins) a render of the match's current scorecard version. """
+    try:
+        job = _submit_scorecard_job(match_id, _fetch_livescore_version(match_id))
+        if job is None:
+            return jsonify({"status": "error", "message": "Match data not found"}), 404
+        return _scorecard_job_response(job)
+    except DatabaseUnavailable as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+    except (Exception, psycopg2.Error) as e:
+        print(f"Error queueing scorecard job for match {match_id}: {e}")
+        traceback.print_exc()
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@app.route('/api/scorecard_jobs/<job_id>', methods=['GET'])
+def get_scorecard_job(job_id):
+    job = pdf_render_service.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Unknown or expired scorecard job"}), 404
+    return _scorecard_job_response(job)
+
+
+@app.route('/api/scorecard_jobs/<job_id>/download', methods=['GET'])
+def download_scorecard_job(job_id):
+    job = pdf_render_service.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Unknown or expired scorecard job"}), 404
+    state = job.state
+    if state != JOB_DONE:
+        return _scorecard_job_response(job)
+    pdf = job.pdf_bytes if job.pdf_bytes is not None else scorecard_pdf_cache.get(job.match_id, job.version)
+    if pdf is None:
+        return jsonify({"status": "error", "message": "Scorecard job result has expired"}), 410
+    return _send_scorecard_pdf(job.match_id, pdf, job.version, job.finished)
+
+def _parse_export_date(value, name):
+    if not value: return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise ValueError(f"'{name}' must be a date in YYYY-MM-DD format")
+
+
+def _write_export_entry(zip_stream, entry, failed):
+    """ Waits for one queued scorecard (bytes, cached file path or render Future) and adds it to the ZIP. """
+    match_id, version, pdf = entry
+    try:
+        if isinstance(pdf, Future):
+            pdf_bytes = pdf.result()
+            scorecard_pdf_cache.put(match_id, version, pdf_bytes, True, keep_in_memory=False)
+        elif isinstance(pdf, str):
+            with open(pdf, "rb") as f: pdf_bytes = f.read()
+        else:
+            pdf_bytes = pdf
+    except Exception as e:
+        print(f"Error rendering scorecard for match {match_id} during export: {e}")
+        failed.append(f"match {match_id}: {e}")
+        return b""
+    return zip_stream.add(f"scorecard_match_{match_id}.pdf", pdf_bytes)
+
+
+@app.route('/api/export_scorecards', methods=['GET'])
+def export_scorecards():
+    """ Streams the scorecard PDFs of all finished matches as one ZIP.
+        Optional ?from=YYYY-MM-DD&to=YYYY-MM-DD (inclusive) filters on the match start time. """
+    try:
+        date_from = _parse_export_date(request.args.get('from'), 'from')
+        date_to = _parse_export_date(request.args.get('to'), 'to')
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    conditions = ["LOWER(ls.current_status) = 'finished'"]
+    params = []
+    if date_from is not None:
+        conditions.append("cm.start_time >= %s"); params.append(date_from)
+    if date_to is not None:
+        conditions.append("cm.start_time < %s"); params.append(date_to + timedelta(days=1))
+    query = f"""
+        SELECT {', '.join('ls.' + col for col in SCORECARD_PDF_COLUMNS)}
+        FROM cricket_match_livescore ls
+        JOIN cricket_match cm ON cm.match_id = ls.match_id
+        WHERE {' AND '.join(conditions)}
+        ORDER BY cm.start_time, ls.match_id
+    """
+
+    conn = get_db_connection()
+    if conn is None: return jsonify({"status": "error", "message": "Database connection failed"}), 500
+
+    def generate():
+        cur = None
+        zip_stream = ZipStream()
+        pending = deque() # (match_id, version, bytes | cached path | Future), in ZIP order
+        failed = []
+        try:
+            # Named cursor = server-side cursor: rows arrive SCORECARD_EXPORT_FETCH_SIZE at a time
+            cur = conn.cursor(name="scorecard_export")
+            cur.itersize = SCORECARD_EXPORT_FETCH_SIZE
+            cur.execute(query, params)
+            for row in cur:
+                data = _scorecard_data_from_row(row)
+                match_id = data["match_id"]
+                version = livescore_version(data.get("last_updated"))
+                pdf = scorecard_pdf_cache.get(match_id, version)
+                if pdf is None: pdf = pdf_render_service.render_async(data)
+                pending.append((match_id, version, pdf))
+                while len(pending) >= SCORECARD_EXPORT_MAX_IN_FLIGHT:
+                    chunk = _write_export_entry(zip_stream, pending.popleft(), failed)
+                    if chunk: yield chunk
+            while pending:
+                chunk = _write_export_entry(zip_stream, pending.popleft(), failed)
+                if chunk: yield chunk
+            if failed:
+                yield zip_stream.add("export_errors.txt", "\n".join(failed).encode("utf-8"))
+            yield zip_stream.close()
+        except (Exception, psycopg2.Error) as e:
+            # Headers are already sent; the client ends up with a truncated archive
+            print(f"Error streaming scorecard export: {e}")
+            traceback.print_exc()
+        finally:
+            for _, _, pdf in pending:
+                if isinstance(pdf, Future): pdf.cancel()
+            if cur and not cur.closed: cur.close()
+            if conn and not conn.closed: conn.close()
+
+    response = Response(stream_with_context(generate()), mimetype='application/zip')
+    response.headers["Content-Disposition"] = "attachment; filename=scorecards.zip"
+    response.call_on_close(conn.close) # Returns the connection even if the stream never starts
+    return response
+
+# -------------------- Diagnostics endpoints --------------------
+@app.route('/api/admin/db_pool_stats', methods=['GET'])
+def db_pool_stats():
+    """ Connection pool utilisation, checkout and wait-time counters. """
+    return jsonify(get_db_pool().stats()), 200
+
+@app.route('/api/admin/cache_stats', methods=['GET'])
+def cache_stats():
+    """ Hit/miss counters for the in-process caches. """
+    return jsonify({
+        "live_score": live_score_cache.stats(),
+        "match_list": match_list_cache.stats(),
+        "scorecard_pdf": scorecard_pdf_cache.stats(),
+        "pdf_render": pdf_render_service.stats(),
+        "compression": response_compressor.stats(),
+        "live_bus": live_bus.stats(),
+        "change_feed": _change_feed.stats() if _change_feed else None,
+    }), 200
+
+@app.route('/api/admin/slow_queries', methods=['GET', 'DELETE'])
+def slow_queries():
+    """ Recent slow statements and per-statement aggregates (with captured plans). DELETE resets them. """
+    if request.method == 'DELETE':
+        slow_query_log.clear()
+        return jsonify({"status": "success", "message": "Slow query log cleared"}), 200
+    return jsonify({
+        "status": "success",
+        "stats": slow_query_log.stats(),
+        "statements": slow_query_log.statements(),
+        "recent": slow_query_log.recent(),
+    }), 200
+
+@app.route('/api/admin/profiles', methods=['GET'])
+def list_profiles():
+    """ Recent request profiles, newest first. Needs the profiling secret (X-Profile). """
+    if not request_profiler.authorized():
+        return jsonify({"status": "error", "message": "Profiling secret required"}), 403
+    return jsonify({"status": "success", "profiles": request_profiler.recent(), "stats": request_profiler.stats()}), 200
+
+@app.route('/api/admin/profiles/<profile_id>', methods=['GET'])
+def download_profile(profile_id):
+    """ Folded stacks of one profile (flamegraph.pl / speedscope / inferno input). Needs the profiling secret. """
+    if not request_profiler.authorized():
+        return jsonify({"status": "error", "message": "Profiling secret required"}), 403
+    path = request_profiler.path_for(profile_id)
+    if path is None or not os.path.exists(path):
+        return jsonify({"status": "error", "message": "Unknown or expired profile"}), 404
+    return send_file(path, mimetype='text/plain', as_attachment=True, download_name=f"{profile_id}.folded")
+
+metrics.register_stats("db_pool", lambda: get_db_pool().stats())
+metrics.register_stats("live_score_cache", live_score_cache.stats)
+metrics.register_stats("match_list_cache", match_list_cache.stats)
+metrics.register_stats("scorecard_pdf_cache", scorecard_pdf_cache.stats)
+metrics.register_stats("pdf_render", pdf_render_service.stats)
+metrics.register_stats("compression", response_compressor.stats)
+metrics.register_stats("live_bus", live_bus.stats)
+metrics.register_stats("profiler", request_profiler.stats)
+metrics.register_stats("slow_queries", slow_query_log.stats)
+metrics.register_stats("change_feed", lambda: _change_feed.stats() if _change_feed else None)
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """ Per-route request counts and latency histograms, DB phase timings and component gauges for Prometheus. """
+    return metrics.response()
 
 # -------------------- RUN APP --------------------
 if __name__ == '__main__':
     check_and_update_schema() # Ensure schema is ready before running
+    start_change_feed()
     app.run(host='0.0.0.0', port=5000, debug=True)
 
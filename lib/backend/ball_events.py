@@ -0,0 +1,88 @@
+""" Append-only ball event log and the materialiser that folds it back into
+    the cricket_match_livescore columns.
+
+Every record_ball call stores one cricket_ball_event row whose payload holds the
+normalised ball plus the context it was applied in (batting side, striker,
+non-striker, bowler). cricket_scorecard_snapshot keeps the folded state every
+few events, so a rebuild or an undo only replays the events after the latest
+snapshot instead of the whole match.
+"""
+import copy
+
+import scoring
+
+# Livescore columns that ball events change - exactly what a snapshot stores
+STATE_COLUMNS = [
+    "team1_runs", "team1_wickets", "team1_balls", "team1_extras", "team1_timeline",
+    "team1_batting_stats", "team1_bowling_stats",
+    "team2_runs", "team2_wickets", "team2_balls", "team2_extras", "team2_timeline",
+    "team2_batting_stats", "team2_bowling_stats",
+    "striker_id", "non_striker_id", "bowler_id",
+]
+JSONB_STATE_COLUMNS = {"team1_batting_stats", "team1_bowling_stats", "team2_batting_stats", "team2_bowling_stats"}
+
+
+def snapshot_state_sql():
+    """ SQL expression that captures the current state columns of a livescore row as JSONB. """
+    pairs = ", ".join(f"'{col}', {col}" for col in STATE_COLUMNS)
+    return f"jsonb_build_object({pairs})"
+
+
+def build_event(ball, batting_side, is_first_innings, striker_id, non_striker_id, bowler_id, legal_balls_before):
+    """ Returns (innings, over_no, ball_no, payload) for one delivery. Over and ball
+        numbers are 1-based; extras that aren't legal deliveries share the next ball's number. """
+    payload = {
+        "ball": ball,
+        "batting_side": batting_side,
+        "striker_id": striker_id,
+        "non_striker_id": non_striker_id,
+        "bowler_id": bowler_id,
+    }
+    innings = 1 if is_first_innings else 2
+    return innings, legal_balls_before // 6 + 1, legal_balls_before % 6 + 1, payload
+
+
+def _update_player(players, player_id, update):
+    for i, player in enumerate(players):
+        if player.get("id") == player_id:
+            players[i] = update(player)
+            return
+    players.append(update(scoring.new_player_stats(player_id)))
+
+
+def apply_event(state, payload):
+    """ Applies one event payload to a state dict in place, using the same rules as record_ball. """
+    ball = payload["ball"]
+    bat = payload["batting_side"]
+    bowl = 2 if bat == 1 else 1
+    striker_id = payload["striker_id"]
+    bowler_id = payload["bowler_id"]
+    delta = scoring.compute_ball_delta(ball)
+
+    state[f"team{bat}_runs"] = (state.get(f"team{bat}_runs") or 0) + delta["team_runs"]
+    state[f"team{bat}_balls"] = (state.get(f"team{bat}_balls") or 0) + delta["team_balls"]
+    state[f"team{bat}_wickets"] = min((state.get(f"team{bat}_wickets") or 0) + delta["team_wickets"], scoring.MAX_WICKETS)
+    state[f"team{bat}_extras"] = (state.get(f"team{bat}_extras") or 0) + delta["team_extras"]
+    state[f"team{bat}_timeline"] = list(state.get(f"team{bat}_timeline") or []) + [delta["label"]]
+
+    lists = {
+        'bat': list(state.get(f"team{bat}_batting_stats") or []),
+        'bowl': list(state.get(f"team{bowl}_bowling_stats") or []),
+    }
+    for kind, player_id, update in scoring.player_changes(ball, delta, striker_id, bowler_id):
+        _update_player(lists[kind], player_id, update)
+    state[f"team{bat}_batting_stats"] = lists['bat']
+    state[f"team{bowl}_bowling_stats"] = lists['bowl']
+
+    state["striker_id"], state["non_striker_id"] = scoring.next_batters(
+        striker_id, payload["non_striker_id"], ball, delta, state[f"team{bat}_balls"])
+    state["bowler_id"] = bowler_id
+    return state
+
+
+def materialize(snapshot_state, payloads):
+    """ Folds event payloads (in seq order) on top of a snapshot state. """
+    state = copy.deepcopy(snapshot_state)
+    for payload in payloads:
+        apply_event(state, payload)
+    return state
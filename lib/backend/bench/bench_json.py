@@ -0,0 +1,96 @@
+""" Throughput of API JSON serialisation on full-match payloads.
+
+Compares the stdlib path (what CustomEncoder did) with json_provider.encode
+(orjson when installed) on get_live_score and get_live_updates shaped payloads
+for a completed 20-over match, and checks both produce the same JSON.
+
+    python bench/bench_json.py [--iterations 2000] [--players 11] [--overs 20]
+"""
+import argparse
+import decimal
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json_provider
+from scoreboard import build_live_score_payload
+
+
+def _batting(rng, first_id, players):
+    return [{"id": first_id + i, "name": f"Player {first_id + i}", "runs": rng.randint(0, 80),
+             "ballsFaced": rng.randint(0, 60), "status": rng.choice(["Not Out", "Bowled", "Caught", "Yet to bat"]),
+             "ballsBowled": 0, "runsConceded": 0, "wicketsTaken": 0} for i in range(players)]
+
+
+def _bowling(rng, first_id, players):
+    return [{"id": first_id + i, "name": f"Player {first_id + i}", "runs": 0, "ballsFaced": 0, "status": "Yet to bat",
+             "ballsBowled": rng.randint(0, 24), "runsConceded": rng.randint(0, 50), "wicketsTaken": rng.randint(0, 4)}
+            for i in range(players)]
+
+
+def _timeline(rng, overs):
+    return [rng.choice(["0", "1", "2", "4", "6", "W", "Wd", "1Lb", "5Nb"]) for _ in range(overs * 6)]
+
+
+def build_row(seed=7, players=11, overs=20):
+    """ A finished match's cricket_match_livescore row (column -> value). """
+    rng = random.Random(seed)
+    return {
+        "match_id": 1, "team1_name": "Team A", "team2_name": "Team B",
+        "team1_runs": 171, "team1_wickets": 6, "team1_balls": overs * 6,
+        "team2_runs": 165, "team2_wickets": 9, "team2_balls": overs * 6,
+        "team1_extras": 9, "team2_extras": 12, "summary_text": "Team B need 7 runs from 1 ball",
+        "striker_id": 103, "non_striker_id": 104, "bowler_id": 5, "is_first_innings": False,
+        "toss_winner": "Team A", "toss_decision": "Bat", "current_status": "finished",
+        "live_result": "Team A won by 6 runs", "break_status": None,
+        "target_score": 172, "first_innings_balls": overs * 6,
+        "team1_batting_stats": _batting(rng, 1, players), "team2_bowling_stats": _bowling(rng, 101, players),
+        "team2_batting_stats": _batting(rng, 101, players), "team1_bowling_stats": _bowling(rng, 1, players),
+        "team1_timeline": _timeline(rng, overs), "team2_timeline": _timeline(rng, overs),
+        "last_updated": datetime(2025, 3, 14, 18, 42, 7, 123456, tzinfo=timezone.utc),
+        "net_run_rate": decimal.Decimal("8.55"), # Decimal as NUMERIC columns come back from psycopg2
+    }
+
+
+def build_payloads(players, overs):
+    row = build_row(players=players, overs=overs)
+    return {
+        "get_live_score": build_live_score_payload(1, row),
+        "get_live_updates": dict(row, team1_batting=row["team1_batting_stats"], team2_bowling=row["team2_bowling_stats"],
+                                 team2_batting=row["team2_batting_stats"], team1_bowling=row["team1_bowling_stats"]),
+    }
+
+
+def run(fn, payload, iterations):
+    fn(payload) # Warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        size = len(fn(payload))
+    elapsed = time.perf_counter() - start
+    return iterations / elapsed, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--players", type=int, default=11)
+    parser.add_argument("--overs", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"Fast path backend: {json_provider.backend_name()}")
+    print(f"{'payload':<18} {'bytes':>7} {'stdlib ops/s':>13} {'fast ops/s':>11} {'speedup':>8}")
+    for name, payload in build_payloads(args.players, args.overs).items():
+        if json.loads(json_provider.encode(payload)) != json.loads(json_provider.encode_stdlib(payload)):
+            sys.exit(f"{name}: fast and stdlib output differ")
+        stdlib_ops, size = run(json_provider.encode_stdlib, payload, args.iterations)
+        fast_ops, _ = run(json_provider.encode, payload, args.iterations)
+        print(f"{name:<18} {size:>7} {stdlib_ops:>13.0f} {fast_ops:>11.0f} {fast_ops / stdlib_ops:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
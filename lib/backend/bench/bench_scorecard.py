@@ -0,0 +1,163 @@
+""" Micro-benchmarks for scorecard formatting and PDF rendering.
+
+Covers the pure-Python hot paths behind the viewer endpoints, on synthetic
+matches of increasing size (squad size x overs, simulated with
+tools/generate_matches.py so the stats and timelines look real):
+
+  match_list_scores   - format_match_score for a get_matches page
+  live_score_payload  - build_live_score_payload (get_live_score / projections)
+  player_lookup       - get_player_stats_from_json for striker, non-striker and bowler
+  scorecard_pdf       - scorecard_pdf.create_scorecard_pdf (ReportLab build)
+
+Reports ops/s and peak traced memory per case. Results can be saved and later
+runs compared against them; slower or hungrier cases beyond --tolerance are
+flagged and the exit status is 1.
+
+    python bench/bench_scorecard.py
+    python bench/bench_scorecard.py --save bench/results/scorecard.json
+    python bench/bench_scorecard.py --compare bench/results/scorecard.json [--filter pdf]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+
+from scoreboard import build_live_score_payload, format_match_score, get_player_stats_from_json, LIVE_SCORE_COLUMNS
+from generate_matches import simulate_match
+
+# (players per side, overs per innings) - a T20, an ODI and a stress case with long squads and timelines
+MATCH_SIZES = [(11, 20), (11, 50), (22, 50), (50, 100)]
+LIST_PAGE_SIZES = [50, 200]
+_ANCHOR = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def synthetic_match(players, overs, seed=7):
+    """ A finished match's livescore row (column -> value), deterministic for the arguments. """
+    for index in range(1000):
+        _, state = simulate_match(seed, index, _ANCHOR, overs, players, upcoming_share=0.0, live_share=0.0, days=365)
+        if state["current_status"] == "Finished": return state
+    raise RuntimeError("No finished match simulated")
+
+
+def _scorecard_data(row):
+    # Same renames as app._scorecard_data_from_row
+    return dict(row, match_id=1, team1_batting=row["team1_batting_stats"], team2_bowling=row["team2_bowling_stats"],
+                team2_batting=row["team2_batting_stats"], team1_bowling=row["team1_bowling_stats"])
+
+
+def build_cases():
+    """ [(name, fn)] - each fn performs one operation. """
+    cases = []
+    row = synthetic_match(11, 20)
+    for page_size in LIST_PAGE_SIZES:
+        scores = [(row["team1_runs"] + i, row["team1_wickets"], row["team1_balls"]) for i in range(page_size)] * 2
+        cases.append((f"match_list_scores/page={page_size}",
+                      lambda scores=scores: [format_match_score(r, w, b) for r, w, b in scores]))
+
+    from scorecard_pdf import create_scorecard_pdf
+    for players, overs in MATCH_SIZES:
+        row = synthetic_match(players, overs)
+        size = f"players={players},overs={overs}"
+        live_row = {col: row.get(col) for col in LIVE_SCORE_COLUMNS}
+        cases.append((f"live_score_payload/{size}", lambda live_row=live_row: build_live_score_payload(1, live_row)))
+
+        # Worst case for the linear scan: everyone asked for sits at the end of the list
+        batting, bowling = row["team1_batting_stats"], row["team2_bowling_stats"]
+        striker, non_striker, bowler = batting[-1]["id"], batting[-2]["id"], bowling[-1]["id"]
+        cases.append((f"player_lookup/{size}", lambda b=batting, w=bowling, s=striker, n=non_striker, o=bowler: (
+            get_player_stats_from_json(b, s, True), get_player_stats_from_json(b, n, True), get_player_stats_from_json(w, o, False))))
+
+        data = _scorecard_data(row)
+        cases.append((f"scorecard_pdf/{size}", lambda data=data: create_scorecard_pdf(data).getvalue()))
+    return cases
+
+
+def measure(fn, min_time, rounds=3, min_iterations=3):
+    """ (ops/s, peak KiB): best of `rounds` timed loops without tracing (least disturbed
+        by other load), then one traced call for memory. """
+    fn() # Warm up (imports, font metrics, caches)
+    best = 0.0
+    for _ in range(rounds):
+        iterations, elapsed = 0, 0.0
+        start = time.perf_counter()
+        while elapsed < min_time / rounds or iterations < min_iterations:
+            fn()
+            iterations += 1
+            elapsed = time.perf_counter() - start
+        best = max(best, iterations / elapsed)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak / 1024
+
+
+def compare(results, baseline, tolerance):
+    """ Lines for the comparison table and the list of regressions. """
+    lines, regressions = [], []
+    for name, cur in results.items():
+        base = baseline.get("cases", {}).get(name)
+        if base is None:
+            lines.append(f"{name:<44} (new)")
+            continue
+        speed = cur["ops_per_sec"] / base["ops_per_sec"] - 1 if base["ops_per_sec"] else 0.0
+        memory = cur["peak_kib"] / base["peak_kib"] - 1 if base["peak_kib"] else 0.0
+        flags = []
+        if speed < -tolerance: flags.append("SLOWER")
+        if memory > tolerance: flags.append("MORE MEMORY")
+        if flags: regressions.append(f"{name}: {', '.join(flags)}")
+        lines.append(f"{name:<44} ops/s {speed:+7.1%}  peak {memory:+7.1%}  {' '.join(flags)}")
+    return lines, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds per case")
+    parser.add_argument("--filter", help="only run cases whose name contains this")
+    parser.add_argument("--save", metavar="PATH", help="write results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="compare against saved results")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="relative change flagged as a regression")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'case':<44} {'ops/s':>12} {'peak KiB':>10}")
+    for name, fn in build_cases():
+        if args.filter and args.filter not in name: continue
+        ops, peak = measure(fn, args.min_time)
+        results[name] = {"ops_per_sec": round(ops, 2), "peak_kib": round(peak, 1)}
+        print(f"{name:<44} {ops:>12.1f} {peak:>10.1f}")
+
+    if args.save:
+        report = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "saved_at": datetime.now(timezone.utc).isoformat(),
+            "cases": results,
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Saved results to {args.save}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        lines, regressions = compare(results, baseline, args.tolerance)
+        print(f"\nAgainst {args.compare} (python {baseline.get('python')}, {baseline.get('saved_at')}):")
+        for line in lines: print(line)
+        if regressions:
+            print("\nREGRESSIONS:")
+            for r in regressions: print(f"  {r}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
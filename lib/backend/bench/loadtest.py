@@ -0,0 +1,427 @@
+""" Load test that replays the Flutter clients' traffic against a running backend.
+
+Simulated clients (each its own thread, stdlib only):
+  viewers  - like live_cricket_score_screen.dart: mobile viewers load
+             GET /api/get_live_score/<id> once, then hold an
+             /api/stream_live_score/<id> SSE stream, reconnecting with
+             Last-Event-ID after the advertised retry delay (and after simulated
+             network drops, --stream-drop-mean). A --web-share of viewers (all of
+             them with --poll) poll get_live_score every --poll-interval seconds
+             instead, as the web build does
+  admins   - POST /api/update_live_score/<id> every --admin-interval seconds
+             (admin_update_score_screen.dart's 800 ms debounce), one ball per post
+  browsers - page through GET /api/get_matches/cricket (following X-Next-Cursor)
+             and load /api/feed/cricket
+  PDF      - every --pdf-burst-interval seconds, --pdf-burst-size concurrent
+             scorecard downloads, polling the render job on 202
+
+Reports p50/p95/p99 latency, throughput and error rate per endpoint, and can
+save the report as a baseline or compare against one (exit status 1 when a
+regression is flagged). Admins overwrite the livescore rows of the matches
+they drive, so point this at a scratch database (see tools/generate_matches.py).
+
+    python bench/loadtest.py --duration 120 --viewers 500 --admins 4
+    python bench/loadtest.py --poll             # every viewer polls (the pre-SSE load)
+    python bench/loadtest.py --save-baseline bench/results/loadtest_baseline.json
+    python bench/loadtest.py --baseline bench/results/loadtest_baseline.json
+"""
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+
+REQUEST_TIMEOUT_SECS = 30
+SSE_READ_TIMEOUT_SECS = 45 # Three missed heartbeats (15 s apart) and the stream counts as broken
+SSE_DEFAULT_RETRY_SECS = 3.0 # The app's reconnect delay, until the stream advertises its own
+PDF_READY_TIMEOUT_SECS = 60
+TIMELINE_OUTCOMES = ["0", "0", "1", "1", "1", "2", "4", "6", "W", "Wd", "1Lb", "5Nb"]
+
+
+def percentile(sorted_values, pct):
+    """ Nearest-rank percentile of an ascending list. """
+    if not sorted_values: return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Recorder:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies = defaultdict(list) # endpoint -> seconds
+        self._errors = defaultdict(int)
+        self._statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, endpoint, status, seconds):
+        is_error = status is None or (status >= 400 and status != 404) # 404 = match gone; not a server fault
+        with self._lock:
+            self._latencies[endpoint].append(seconds)
+            self._statuses[endpoint][str(status)] += 1
+            if is_error: self._errors[endpoint] += 1
+
+    def report(self, elapsed):
+        with self._lock:
+            endpoints = {}
+            for endpoint, latencies in sorted(self._latencies.items()):
+                latencies = sorted(latencies)
+                count = len(latencies)
+                endpoints[endpoint] = {
+                    "requests": count,
+                    "errors": self._errors[endpoint],
+                    "error_rate": round(self._errors[endpoint] / count, 4) if count else 0.0,
+                    "throughput_rps": round(count / elapsed, 3) if elapsed else 0.0,
+                    "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+                    "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+                    "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+                    "max_ms": round(latencies[-1] * 1000, 2),
+                    "statuses": dict(self._statuses[endpoint]),
+                }
+            return endpoints
+
+
+def http_request(method, url, body=None, headers=None):
+    """ (status, headers, body bytes); status is None when the request never got a response. """
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method, headers=dict(headers or {}))
+    if data is not None: req.add_header("Content-Type", "application/json; charset=UTF-8")
+    try:
+        with urllib.request.urlopen(req, timeout=REQUEST_TIMEOUT_SECS) as resp:
+            return resp.status, resp.headers, resp.read()
+    except urllib.error.HTTPError as e: # 304 and 4xx/5xx end up here
+        return e.code, e.headers, e.read()
+    except (urllib.error.URLError, OSError):
+        return None, {}, b""
+
+
+def timed(recorder, endpoint, method, url, body=None, headers=None):
+    started = time.perf_counter()
+    status, resp_headers, resp_body = http_request(method, url, body, headers)
+    recorder.record(endpoint, status, time.perf_counter() - started)
+    return status, resp_headers, resp_body
+
+
+def sleep_until(stop, when):
+    """ Waits for `when` (monotonic) or the stop event; True if the run is still going. """
+    return not stop.wait(max(0.0, when - time.monotonic()))
+
+
+# --- Simulated clients ---
+
+def viewer(args, recorder, stop, rng, match_id):
+    """ Web client: polls get_live_score on a fixed schedule. """
+    url = f"{args.base_url}/api/get_live_score/{match_id}"
+    etag = None
+    next_poll = time.monotonic() + rng.uniform(0, args.poll_interval) # Viewers don't all open the screen at once
+    while sleep_until(stop, next_poll):
+        headers = {"If-None-Match": etag} if args.conditional and etag else None
+        status, resp_headers, _ = timed(recorder, "get_live_score", "GET", url, headers=headers)
+        if status == 200: etag = resp_headers.get("ETag")
+        next_poll += args.poll_interval # Timer.periodic: fixed schedule, not fixed gap
+
+
+def stream_viewer(args, recorder, stop, rng, match_id, posts):
+    """ Mobile client: one get_live_score, then a held SSE stream.
+
+    Recorded per connection as stream_connect (time to response headers), plus
+    stream_push for every score event after the first one of a connection: the
+    time since the latest update_live_score POST for the match was sent, i.e. the
+    write -> NOTIFY -> fan-out delay (only for matches driven by an admin here).
+    Streams that fail mid-way are recorded as stream_broken. """
+    if not sleep_until(stop, time.monotonic() + rng.uniform(0, args.poll_interval)): return # Staggered screen opens
+    timed(recorder, "get_live_score", "GET", f"{args.base_url}/api/get_live_score/{match_id}")
+    url = f"{args.base_url}/api/stream_live_score/{match_id}"
+    last_event_id, retry_secs = None, SSE_DEFAULT_RETRY_SECS
+    while not stop.is_set():
+        headers = {"Accept": "text/event-stream"}
+        if last_event_id: headers["Last-Event-ID"] = last_event_id
+        drop_at = time.monotonic() + rng.expovariate(1.0 / args.stream_drop_mean) if args.stream_drop_mean > 0 else None
+        started = time.perf_counter()
+        try:
+            resp = urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=SSE_READ_TIMEOUT_SECS)
+        except urllib.error.HTTPError as e:
+            recorder.record("stream_connect", e.code, time.perf_counter() - started)
+            e.close()
+            if e.code == 404: return
+            resp = None
+        except (urllib.error.URLError, OSError):
+            recorder.record("stream_connect", None, time.perf_counter() - started)
+            resp = None
+        if resp is not None:
+            recorder.record("stream_connect", resp.status, time.perf_counter() - started)
+            connected = time.perf_counter()
+            event_id, event_name, first_event = None, "message", True
+            try:
+                with resp:
+                    for raw in resp:
+                        if stop.is_set() or (drop_at is not None and time.monotonic() >= drop_at): break # Client went away
+                        line = raw.decode("utf-8").rstrip("\r\n")
+                        if not line: # Blank line dispatches the event
+                            if event_id is not None: last_event_id = event_id
+                            if event_name == "score":
+                                if not first_event and match_id in posts:
+                                    recorder.record("stream_push", 200, time.perf_counter() - posts[match_id])
+                                first_event = False
+                            elif event_name == "end":
+                                return # Match finished; the app stops reconnecting
+                            event_id, event_name = None, "message"
+                        elif line.startswith("retry:"):
+                            retry_secs = int(line[6:].strip()) / 1000.0
+                        elif line.startswith("id:"):
+                            event_id = line[3:].strip()
+                        elif line.startswith("event:"):
+                            event_name = line[6:].strip()
+            except (OSError, ValueError): # Read timeout, reset, or a torn chunk
+                recorder.record("stream_broken", None, time.perf_counter() - connected)
+        if not sleep_until(stop, time.monotonic() + retry_secs): return
+
+
+class _Innings:
+    """ Just enough scoring state to produce update_live_score payloads that grow like a real match. """
+
+    def __init__(self, rng, players, overs):
+        self.rng = rng
+        self.players = players
+        self.max_balls = overs * 6
+        self.innings = 1
+        self._reset()
+
+    def _reset(self):
+        self.runs = self.wickets = self.balls = self.extras = 0
+        self.timeline = []
+        self.batting = [{"id": i, "name": f"Batter {i}", "runs": 0, "ballsFaced": 0, "status": "Yet to bat",
+                         "ballsBowled": 0, "runsConceded": 0, "wicketsTaken": 0} for i in range(1, self.players + 1)]
+        self.bowling = [{"id": 100 + i, "name": f"Bowler {100 + i}", "runs": 0, "ballsFaced": 0, "status": "Yet to bat",
+                         "ballsBowled": 0, "runsConceded": 0, "wicketsTaken": 0} for i in range(1, self.players + 1)]
+        self.striker, self.non_striker, self.next_in = 0, 1, 2
+        for i in (0, 1): self.batting[i]["status"] = "Not Out"
+
+    def ball(self):
+        if self.balls >= self.max_balls or self.wickets >= self.players - 1:
+            self.innings = 2 if self.innings == 1 else 1
+            self._reset()
+        outcome = self.rng.choice(TIMELINE_OUTCOMES)
+        self.timeline.append(outcome)
+        bowler = self.bowling[(self.balls // 6) % 5]
+        batter = self.batting[self.striker]
+        if outcome in ("Wd", "5Nb", "1Lb"):
+            extra = {"Wd": 1, "5Nb": 5, "1Lb": 1}[outcome]
+            self.runs += extra; self.extras += extra; bowler["runsConceded"] += extra
+            if outcome != "1Lb": return
+            self.balls += 1; bowler["ballsBowled"] += 1; batter["ballsFaced"] += 1
+            return
+        self.balls += 1; bowler["ballsBowled"] += 1; batter["ballsFaced"] += 1
+        if outcome == "W":
+            self.wickets += 1; bowler["wicketsTaken"] += 1; batter["status"] = "Bowled"
+            if self.next_in < self.players:
+                self.striker = self.next_in; self.next_in += 1
+                self.batting[self.striker]["status"] = "Not Out"
+            return
+        runs = int(outcome)
+        self.runs += runs; batter["runs"] += runs; bowler["runsConceded"] += runs
+        if runs % 2: self.striker, self.non_striker = self.non_striker, self.striker
+        if self.balls % 6 == 0: self.striker, self.non_striker = self.non_striker, self.striker
+
+    def payload(self, team1, team2):
+        first = self.innings == 1
+        batting_side = {"runs": self.runs, "wickets": self.wickets, "balls": self.balls, "extras": self.extras}
+        idle_side = {"runs": 0, "wickets": 0, "balls": 0, "extras": 0}
+        t1, t2 = (batting_side, idle_side) if first else (idle_side, batting_side)
+        return {
+            "toss_winner": team1, "toss_decision": "Bat", "current_status": "Live",
+            "live_result": None, "break_status": None,
+            "team1_name": team1, "team2_name": team2,
+            "team1_runs": t1["runs"], "team1_wickets": t1["wickets"], "team1_balls": t1["balls"],
+            "team2_runs": t2["runs"], "team2_wickets": t2["wickets"], "team2_balls": t2["balls"],
+            "team1_extras": t1["extras"], "team2_extras": t2["extras"],
+            "summary_text": f"{team1 if first else team2} {self.runs}/{self.wickets}",
+            "striker_id": self.batting[self.striker]["id"], "non_striker_id": self.batting[self.non_striker]["id"],
+            "bowler_id": self.bowling[(self.balls // 6) % 5]["id"],
+            "is_first_innings": first, "target_score": None, "first_innings_balls": None,
+            "team1_timeline": self.timeline if first else [], "team2_timeline": [] if first else self.timeline,
+            "team1_batting": self.batting if first else [], "team2_bowling": self.bowling if first else [],
+            "team2_batting": [] if first else self.batting, "team1_bowling": [] if first else self.bowling,
+        }
+
+
+def admin(args, recorder, stop, rng, match_id, posts):
+    url = f"{args.base_url}/api/update_live_score/{match_id}"
+    innings = _Innings(rng, args.players, args.overs)
+    next_post = time.monotonic() + rng.uniform(0, args.admin_interval)
+    while sleep_until(stop, next_post):
+        innings.ball()
+        posts[match_id] = time.perf_counter() # Read by stream viewers for the push delay
+        timed(recorder, "update_live_score", "POST", url, body=innings.payload(f"Team {match_id}A", f"Team {match_id}B"))
+        next_post = max(next_post + args.admin_interval, time.monotonic()) # The app only sends after the previous save
+
+
+def browser(args, recorder, stop, rng):
+    next_visit = time.monotonic() + rng.uniform(0, args.browse_interval)
+    while sleep_until(stop, next_visit):
+        if rng.random() < args.feed_ratio:
+            timed(recorder, "feed", "GET", f"{args.base_url}/api/feed/cricket?upcoming_limit=50&live_limit=50&recent_limit=50")
+        else:
+            status_param = rng.choice(["upcoming", "live", "recent"])
+            url = f"{args.base_url}/api/get_matches/cricket?status={status_param}&limit={args.page_size}"
+            for _ in range(rng.randint(1, args.max_pages)):
+                status, headers, _ = timed(recorder, "get_matches", "GET", url)
+                cursor = headers.get("X-Next-Cursor") if status == 200 else None
+                if not cursor or stop.is_set(): break
+                url = f"{args.base_url}/api/get_matches/cricket?status={status_param}&limit={args.page_size}&cursor={cursor}"
+        next_visit += args.browse_interval
+
+
+def pdf_download(args, recorder, stop, match_id):
+    started = time.perf_counter()
+    status, headers, body = timed(recorder, "download_scorecard_pdf", "GET", f"{args.base_url}/api/download_scorecard_pdf/{match_id}")
+    deadline = time.monotonic() + PDF_READY_TIMEOUT_SECS
+    while status == 202 and not stop.is_set() and time.monotonic() < deadline:
+        stop.wait(float(headers.get("Retry-After") or 1))
+        status_url = json.loads(body)["job"]["status_url"]
+        status, headers, body = timed(recorder, "scorecard_job_status", "GET", f"{args.base_url}{status_url}")
+    if status == 200 and headers.get("Content-Type", "").startswith("application/json"):
+        status, _, _ = timed(recorder, "scorecard_job_download", "GET", f"{args.base_url}{json.loads(body)['job']['download_url']}")
+    recorder.record("scorecard_pdf_ready", status if status != 202 else None, time.perf_counter() - started)
+
+
+def pdf_bursts(args, recorder, stop, rng, match_ids):
+    next_burst = time.monotonic() + args.pdf_burst_interval
+    while sleep_until(stop, next_burst):
+        burst = [threading.Thread(target=pdf_download, args=(args, recorder, stop, rng.choice(match_ids)), daemon=True)
+                 for _ in range(args.pdf_burst_size)]
+        for t in burst: t.start()
+        for t in burst: t.join()
+        next_burst += args.pdf_burst_interval
+
+
+# --- Setup and reporting ---
+
+def discover_match_ids(base_url, status_param, limit=200):
+    status, _, body = http_request("GET", f"{base_url}/api/get_matches/cricket?status={status_param}&limit={limit}")
+    if status != 200: sys.exit(f"Could not list {status_param} matches from {base_url} (status {status})")
+    return [m["id"] for m in json.loads(body)]
+
+
+def compare(report, baseline, tolerance):
+    """ Per-endpoint deltas against a saved report. Returns (lines, regressions). """
+    lines, regressions = [], []
+    for endpoint, cur in report["endpoints"].items():
+        base = baseline["endpoints"].get(endpoint)
+        if base is None:
+            lines.append(f"{endpoint:<24} (not in baseline)")
+            continue
+        deltas = []
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            change = (cur[key] - base[key]) / base[key] if base[key] else 0.0
+            deltas.append(f"{key[:-3]} {change:+.0%}")
+            if key == "p95_ms" and change > tolerance: regressions.append(f"{endpoint}: p95 {base[key]} -> {cur[key]} ms")
+        if cur["error_rate"] > base["error_rate"] + 0.01:
+            regressions.append(f"{endpoint}: error rate {base['error_rate']:.2%} -> {cur['error_rate']:.2%}")
+        lines.append(f"{endpoint:<24} " + "  ".join(deltas))
+    return lines, regressions
+
+
+def print_report(report):
+    print(f"{'endpoint':<24} {'reqs':>7} {'err%':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for endpoint, r in report["endpoints"].items():
+        print(f"{endpoint:<24} {r['requests']:>7} {r['error_rate'] * 100:>5.1f}% {r['throughput_rps']:>8.2f} "
+              f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['max_ms']:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:5000")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--viewers", type=int, default=200)
+    parser.add_argument("--web-share", type=float, default=0.1, help="share of viewers that poll (web) instead of streaming")
+    parser.add_argument("--poll", action="store_true", help="all viewers poll, as before the SSE stream")
+    parser.add_argument("--poll-interval", type=float, default=15.0)
+    parser.add_argument("--conditional", action="store_true", help="polling viewers send If-None-Match (the app currently doesn't)")
+    parser.add_argument("--stream-drop-mean", type=float, default=300.0,
+                        help="mean seconds between simulated network drops per stream (0: never)")
+    parser.add_argument("--admins", type=int, default=2)
+    parser.add_argument("--admin-interval", type=float, default=0.8)
+    parser.add_argument("--players", type=int, default=11)
+    parser.add_argument("--overs", type=int, default=20)
+    parser.add_argument("--browsers", type=int, default=10)
+    parser.add_argument("--browse-interval", type=float, default=5.0)
+    parser.add_argument("--feed-ratio", type=float, default=0.5, help="share of browser visits that load /api/feed")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--max-pages", type=int, default=3)
+    parser.add_argument("--pdf-burst-interval", type=float, default=20.0)
+    parser.add_argument("--pdf-burst-size", type=int, default=10)
+    parser.add_argument("--match-ids", help="comma separated live match ids (default: discovered via get_matches)")
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a saved report")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="p95 increase flagged as a regression")
+    args = parser.parse_args()
+    args.base_url = args.base_url.rstrip("/")
+
+    live_ids = [int(x) for x in args.match_ids.split(",")] if args.match_ids else discover_match_ids(args.base_url, "live")
+    finished_ids = discover_match_ids(args.base_url, "recent")
+    if not live_ids: sys.exit("No live matches to poll; seed the database first")
+    pollers = args.viewers if args.poll else round(args.viewers * args.web_share)
+    print(f"{len(live_ids)} live / {len(finished_ids)} finished matches; "
+          f"{args.viewers} viewers ({pollers} polling), {args.admins} admins, {args.browsers} browsers for {args.duration:.0f}s")
+
+    recorder = Recorder()
+    stop = threading.Event()
+    rng = random.Random(args.seed)
+    posts = {} # match_id -> perf_counter() of the latest admin POST
+    threads = []
+    for i in range(args.viewers):
+        viewer_rng = random.Random(rng.random())
+        if i < pollers:
+            threads.append(threading.Thread(target=viewer, args=(args, recorder, stop, viewer_rng, live_ids[i % len(live_ids)])))
+        else:
+            threads.append(threading.Thread(target=stream_viewer, args=(args, recorder, stop, viewer_rng, live_ids[i % len(live_ids)], posts)))
+    for i in range(min(args.admins, len(live_ids))):
+        threads.append(threading.Thread(target=admin, args=(args, recorder, stop, random.Random(rng.random()), live_ids[i], posts)))
+    for _ in range(args.browsers):
+        threads.append(threading.Thread(target=browser, args=(args, recorder, stop, random.Random(rng.random()))))
+    if finished_ids and args.pdf_burst_size > 0:
+        threads.append(threading.Thread(target=pdf_bursts, args=(args, recorder, stop, random.Random(rng.random()), finished_ids)))
+
+    started = time.monotonic()
+    for t in threads:
+        t.daemon = True
+        t.start()
+    try:
+        stop.wait(args.duration)
+    except KeyboardInterrupt:
+        print("Interrupted; reporting what was collected")
+    stop.set()
+    for t in threads: t.join(REQUEST_TIMEOUT_SECS)
+    elapsed = time.monotonic() - started
+
+    report = {
+        "config": {k: v for k, v in vars(args).items() if k not in ("save_baseline", "baseline")},
+        "elapsed_secs": round(elapsed, 3),
+        "endpoints": recorder.report(elapsed),
+    }
+    print_report(report)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Saved baseline to {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        lines, regressions = compare(report, baseline, args.tolerance)
+        print(f"\nAgainst {args.baseline}:")
+        for line in lines: print(line)
+        if regressions:
+            print("\nREGRESSIONS:")
+            for r in regressions: print(f"  {r}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
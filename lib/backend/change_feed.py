@@ -0,0 +1,97 @@
+""" Background LISTEN/NOTIFY consumer for livescore change notifications.
+
+The notify_livescore_change() trigger (migration 3 in migrations.py) emits a
+JSON payload {"match_id", "version", "status"} on every insert/update of
+cricket_match_livescore. This thread turns those into handler calls, so every
+worker process or host sees every write without polling the table.
+"""
+import json
+import select
+import threading
+import time
+
+import psycopg2
+
+
+class ChangeFeedListener(threading.Thread):
+
+    def __init__(self, connect_kwargs, channel, handler, on_reconnect=None, poll_timeout=5.0, max_backoff=30.0):
+        super().__init__(name=f"change-feed-{channel}", daemon=True)
+        self._connect_kwargs = connect_kwargs
+        self.channel = channel
+        self._handler = handler
+        self._on_reconnect = on_reconnect
+        self._poll_timeout = poll_timeout
+        self._max_backoff = max_backoff
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._connected = False
+        self._received = 0
+        self._handler_errors = 0
+        self._reconnects = 0
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _listen(self):
+        conn = psycopg2.connect(**self._connect_kwargs)
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f"LISTEN {self.channel}")
+        return conn
+
+    def run(self):
+        backoff = 1.0
+        first_connect = True
+        while not self._stop_event.is_set():
+            conn = None
+            try:
+                conn = self._listen()
+                with self._lock: self._connected = True
+                print(f"Change feed listening on '{self.channel}'.")
+                backoff = 1.0
+                if not first_connect:
+                    # Notifications sent while we were disconnected are lost
+                    with self._lock: self._reconnects += 1
+                    if self._on_reconnect: self._on_reconnect()
+                first_connect = False
+                while not self._stop_event.is_set():
+                    readable, _, _ = select.select([conn], [], [], self._poll_timeout)
+                    if not readable:
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self._dispatch(conn.notifies.pop(0).payload)
+            except (Exception, psycopg2.Error) as e:
+                print(f"Change feed on '{self.channel}' lost its connection: {e}")
+            finally:
+                with self._lock: self._connected = False
+                if conn is not None and not conn.closed:
+                    try: conn.close()
+                    except Exception: pass
+            if self._stop_event.wait(backoff):
+                break
+            backoff = min(backoff * 2, self._max_backoff)
+
+    def _dispatch(self, raw_payload):
+        with self._lock: self._received += 1
+        try:
+            self._handler(json.loads(raw_payload))
+        except Exception as e:
+            with self._lock: self._handler_errors += 1
+            print(f"Error handling change feed payload {raw_payload!r}: {e}")
+
+    @property
+    def connected(self):
+        with self._lock:
+            return self._connected
+
+    def stats(self):
+        with self._lock:
+            return {
+                "channel": self.channel,
+                "connected": self._connected,
+                "notifications_received": self._received,
+                "handler_errors": self._handler_errors,
+                "reconnects": self._reconnects,
+            }
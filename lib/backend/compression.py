@@ -0,0 +1,124 @@
+""" Accept-Encoding negotiated response compression (brotli when installed, else gzip).
+
+Runs as an after_request hook on JSON/text bodies above a size threshold.
+Compressed responses carry an encoding-specific ETag ("<etag>+gzip"), so
+caches never mix representations; http_cache.client_has_current accepts
+either form. Bodies of publicly cacheable responses (finished matches) are
+compressed once at a higher level and kept in a byte-bounded LRU keyed by
+(etag, encoding).
+"""
+import gzip
+import threading
+from collections import OrderedDict
+
+from flask import request
+
+import http_cache
+
+try:
+    import brotli
+except ImportError: # Optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = ("application/json", "text/plain", "text/html", "text/csv")
+
+# (gzip level, brotli quality): per-request bodies favour speed, cached ones size
+_FAST_LEVELS = (6, 5)
+_CACHED_LEVELS = (9, 11)
+
+
+def compress(data, encoding, cached=False):
+    gzip_level, brotli_quality = _CACHED_LEVELS if cached else _FAST_LEVELS
+    if encoding == "br":
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=gzip_level)
+
+
+def negotiate(req):
+    """ Best content coding the client accepts, or None. """
+    accept = req.accept_encodings
+    if brotli is not None and accept.quality("br") > 0:
+        return "br"
+    if accept.quality("gzip") > 0:
+        return "gzip"
+    return None
+
+
+class ResponseCompressor:
+
+    def __init__(self, min_size, cache_max_bytes):
+        self.min_size = min_size
+        self.cache_max_bytes = cache_max_bytes
+        self._lock = threading.Lock()
+        self._cache = OrderedDict() # (etag, encoding) -> compressed body
+        self._cache_bytes = 0
+        self._compressed = 0
+        self._cache_hits = 0
+        self._bytes_in = 0
+        self._bytes_out = 0
+
+    def init_app(self, app):
+        app.after_request(self._after_request)
+
+    def _cached(self, key):
+        with self._lock:
+            body = self._cache.get(key)
+            if body is not None:
+                self._cache.move_to_end(key)
+                self._cache_hits += 1
+            return body
+
+    def _store(self, key, body):
+        with self._lock:
+            if len(body) > self.cache_max_bytes or key in self._cache: return
+            self._cache[key] = body
+            self._cache_bytes += len(body)
+            while self._cache_bytes > self.cache_max_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= len(evicted)
+
+    def _after_request(self, response):
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES: return response
+        if response.direct_passthrough or response.is_streamed: return response
+        if "Content-Encoding" in response.headers: return response
+        response.vary.add("Accept-Encoding")
+        encoding = negotiate(request)
+        if encoding is None: return response
+
+        etag, weak = response.get_etag()
+        if response.status_code == 304:
+            # Echo the encoded validator the client revalidated with
+            if etag and request.if_none_match.contains(http_cache.encoded_etag(etag, encoding)):
+                response.set_etag(http_cache.encoded_etag(etag, encoding))
+            return response
+        if response.status_code != 200: return response
+
+        body = response.get_data()
+        if len(body) < self.min_size: return response
+        cacheable = etag is not None and not weak and response.cache_control.public
+        compressed = self._cached((etag, encoding)) if cacheable else None
+        if compressed is None:
+            compressed = compress(body, encoding, cached=cacheable)
+            if cacheable: self._store((etag, encoding), compressed)
+        with self._lock:
+            self._compressed += 1
+            self._bytes_in += len(body)
+            self._bytes_out += len(compressed)
+
+        response.set_data(compressed) # Also updates Content-Length
+        response.headers["Content-Encoding"] = encoding
+        if etag: response.set_etag(http_cache.encoded_etag(etag, encoding))
+        return response
+
+    def stats(self):
+        with self._lock:
+            return {
+                "brotli_available": brotli is not None,
+                "responses_compressed": self._compressed,
+                "bytes_in": self._bytes_in,
+                "bytes_out": self._bytes_out,
+                "ratio": round(self._bytes_out / self._bytes_in, 4) if self._bytes_in else 0.0,
+                "cache_entries": len(self._cache),
+                "cache_bytes": self._cache_bytes,
+                "cache_hits": self._cache_hits,
+            }
@@ -0,0 +1,296 @@
+""" Thread-safe PostgreSQL connection pool used behind app.get_db_connection().
+
+Routes keep their existing pattern (get connection, cursor, commit/rollback,
+close in `finally`); close() on a pooled connection hands it back to the pool
+instead of tearing down the TCP + auth session.
+"""
+import threading
+import time
+
+import psycopg2
+from psycopg2 import extensions
+
+
+# Callables fn(phase, seconds, query, vars) told about every checkout ("connect"),
+# execute / executemany ("execute") and fetch ("fetch") - see add_query_observer()
+_query_observers = []
+
+
+def add_query_observer(fn):
+    """ Registers a timing hook for pooled connections. Observers run on the
+        request thread, so they must be cheap; exceptions they raise are logged
+        and swallowed. """
+    _query_observers.append(fn)
+
+
+def _notify_observers(phase, started, query=None, vars=None):
+    """ `started` is a time.perf_counter() reading. """
+    if not _query_observers: return
+    seconds = time.perf_counter() - started
+    for fn in _query_observers:
+        try:
+            fn(phase, seconds, query, vars)
+        except Exception as e:
+            print(f"Query observer {fn!r} failed: {e}")
+
+
+class PoolTimeout(Exception):
+    """ Raised when no connection could be checked out before the timeout. """
+
+
+class PoolConnection(extensions.connection):
+    """ psycopg2 connection that remembers when it hit an OperationalError. """
+    broken = False
+
+    def cursor(self, *args, **kwargs):
+        kwargs.setdefault('cursor_factory', PoolCursor)
+        return super().cursor(*args, **kwargs)
+
+
+class PoolCursor(extensions.cursor):
+    """ Cursor that flags its connection for recycling on OperationalError
+        and reports execute/fetch timings to the query observers. """
+
+    def execute(self, query, vars=None):
+        started = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        except psycopg2.OperationalError:
+            self.connection.broken = True
+            raise
+        finally:
+            _notify_observers("execute", started, query, vars)
+
+    def executemany(self, query, vars_list):
+        started = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        except psycopg2.OperationalError:
+            self.connection.broken = True
+            raise
+        finally:
+            _notify_observers("execute", started, query)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            _notify_observers("fetch", started)
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        try:
+            return super().fetchmany(self.arraysize if size is None else size)
+        finally:
+            _notify_observers("fetch", started)
+
+    def fetchall(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            _notify_observers("fetch", started)
+
+
+class PooledConnection:
+    """ Proxy handed out by the pool. Everything except close()/closed is
+        forwarded to the underlying psycopg2 connection. """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    @property
+    def raw(self):
+        return self._raw
+
+    @property
+    def closed(self):
+        return 1 if self._released else self._raw.closed
+
+    def discard(self):
+        """ Drop this connection instead of returning it to the pool. """
+        self._raw.broken = True
+        self.close()
+
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+        self._pool.release(self._raw)
+
+
+class ConnectionPool:
+    """ Bounded pool with checkout timeouts, liveness checks on borrow and
+        recycling of connections that went bad. """
+
+    def __init__(self, minconn, maxconn, checkout_timeout, health_check_idle_secs, **connect_kwargs):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError(f"Invalid pool size: min={minconn}, max={maxconn}")
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.checkout_timeout = checkout_timeout
+        self.health_check_idle_secs = health_check_idle_secs
+        self._connect_kwargs = connect_kwargs
+        self._cond = threading.Condition()
+        self._idle = []  # (raw_conn, returned_at) - used as a LIFO stack
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+        # --- Counters ---
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+        self._created = 0
+        self._discarded = 0
+        self._health_check_failures = 0
+
+        for _ in range(minconn):
+            try:
+                raw = self._connect()
+            except psycopg2.OperationalError as e:
+                print(f"Connection pool warm-up failed: {e}")
+                break
+            with self._cond:
+                self._size += 1
+                self._idle.append((raw, time.monotonic()))
+
+    def _connect(self):
+        raw = psycopg2.connect(connection_factory=PoolConnection, **self._connect_kwargs)
+        with self._cond:
+            self._created += 1
+        return raw
+
+    def _is_alive(self, raw, idle_since):
+        """ Cheap liveness probe, only run for connections idle long enough to be suspect. """
+        if raw.closed or raw.broken:
+            return False
+        if time.monotonic() - idle_since < self.health_check_idle_secs:
+            return True
+        try:
+            with raw.cursor() as cur:
+                cur.execute("SELECT 1")
+            raw.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def getconn(self, timeout=None):
+        """ Borrow a connection, waiting up to `timeout` seconds for one to free up. """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        checkout_started = time.perf_counter()
+        started = time.monotonic()
+        deadline = started + timeout
+        waited = False
+        while True:
+            raw = None
+            idle_since = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolTimeout("Connection pool is closed")
+                    if self._idle:
+                        raw, idle_since = self._idle.pop()
+                        break
+                    if self._size < self.maxconn:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(f"Timed out after {timeout:.1f}s waiting for a DB connection")
+                    waited = True
+                    self._cond.wait(remaining)
+                self._in_use += 1
+
+            if raw is None:
+                try:
+                    raw = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._in_use -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_alive(raw, idle_since):
+                with self._cond:
+                    self._health_check_failures += 1
+                self._drop(raw)
+                continue  # Try again with another (or a fresh) connection
+
+            wait_time = time.monotonic() - started
+            with self._cond:
+                self._checkouts += 1
+                self._wait_time_total += wait_time
+                if waited: self._waits += 1
+                if wait_time > self._wait_time_max: self._wait_time_max = wait_time
+            _notify_observers("connect", checkout_started)
+            return PooledConnection(self, raw)
+
+    def _drop(self, raw):
+        try:
+            if not raw.closed: raw.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._in_use -= 1
+            self._discarded += 1
+            self._cond.notify()
+
+    def release(self, raw):
+        """ Return a connection; broken ones are closed, dirty ones rolled back. """
+        broken = raw.closed or raw.broken
+        if not broken:
+            status = raw.get_transaction_status()
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                broken = True
+            elif status != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    raw.rollback()
+                except psycopg2.Error:
+                    broken = True
+        if broken or self._closed:
+            self._drop(raw)
+            return
+        with self._cond:
+            self._in_use -= 1
+            self._idle.append((raw, time.monotonic()))
+            self._cond.notify()
+
+    def closeall(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for raw, _ in idle:
+            try: raw.close()
+            except Exception: pass
+
+    def stats(self):
+        with self._cond:
+            return {
+                "min_size": self.minconn,
+                "max_size": self.maxconn,
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "checkouts": self._checkouts,
+                "checkouts_waited": self._waits,
+                "checkout_timeouts": self._timeouts,
+                "wait_time_total_ms": round(self._wait_time_total * 1000, 3),
+                "wait_time_max_ms": round(self._wait_time_max * 1000, 3),
+                "wait_time_avg_ms": round(self._wait_time_total * 1000 / self._checkouts, 3) if self._checkouts else 0.0,
+                "connections_created": self._created,
+                "connections_discarded": self._discarded,
+                "health_check_failures": self._health_check_failures,
+                "utilisation": round(self._in_use / self.maxconn, 4),
+            }
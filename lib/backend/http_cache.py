@@ -0,0 +1,44 @@
+""" Conditional GET helpers (ETag / If-None-Match / 304) for livescore-backed endpoints. """
+from flask import Response
+
+
+def make_etag(kind, match_id, version):
+    """ Strong validator for one representation (`kind`) of a match at a version. """
+    if version is None:
+        return None
+    return f"{kind}-{match_id}-{version}"
+
+
+def cache_control(finished, finished_max_age):
+    # Live data must be revalidated on every poll; finished matches never change again
+    return f"public, max-age={finished_max_age}" if finished else "no-cache"
+
+
+# Content codings compression.py may apply; each gets its own validator
+CONTENT_CODINGS = ("gzip", "br")
+
+
+def encoded_etag(etag, encoding):
+    """ Validator for the `encoding`-compressed form of a representation. """
+    return f"{etag}+{encoding}"
+
+
+def client_has_current(req, etag):
+    if etag is None: return False
+    if req.if_none_match.contains(etag): return True
+    return any(req.if_none_match.contains(encoded_etag(etag, coding)) for coding in CONTENT_CODINGS)
+
+
+def not_modified(etag, finished, finished_max_age):
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = cache_control(finished, finished_max_age)
+    return response
+
+
+def add_validators(response, etag, finished, finished_max_age):
+    """ Stamps ETag and Cache-Control on a full 200 response. """
+    if etag is not None:
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = cache_control(finished, finished_max_age)
+    return response
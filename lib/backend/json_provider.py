@@ -0,0 +1,74 @@
+""" JSON provider for all API responses (jsonify, app.json.dumps).
+
+Uses orjson when it is installed and falls back to the stdlib json module
+otherwise, with the same output rules either way:
+Decimal -> string (precision preserved), datetime/date -> ISO 8601 string,
+keys sorted. orjson writes UTF-8 bytes directly and handles nested lists and
+dicts in C, which is where the time goes for the JSONB stat lists.
+"""
+import decimal
+import json
+import time
+from datetime import date, datetime
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError: # Optional speed-up; stdlib json is used without it
+    orjson = None
+
+
+def _default(o):
+    if isinstance(o, decimal.Decimal):
+        # Convert Decimal to string to preserve precision, then float if needed client-side
+        return str(o)
+    if isinstance(o, (datetime, date)):
+        return o.isoformat() # Convert datetime to ISO 8601 string format
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    # Datetimes go through _default so both paths produce datetime.isoformat() exactly
+    _ORJSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def encode(obj, pretty=False):
+    """ Serialises obj to UTF-8 bytes with the API's rules. """
+    if orjson is not None:
+        option = _ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if pretty else 0)
+        try:
+            return orjson.dumps(obj, default=_default, option=option)
+        except TypeError:
+            pass # e.g. integers beyond 64 bits; the stdlib path handles (or reports) them
+    return encode_stdlib(obj, pretty)
+
+
+def encode_stdlib(obj, pretty=False):
+    layout = {"indent": 2} if pretty else {"separators": (",", ":")}
+    return json.dumps(obj, default=_default, sort_keys=True, **layout).encode("utf-8")
+
+
+def backend_name():
+    return "orjson" if orjson is not None else "json"
+
+
+class ApiJSONProvider(DefaultJSONProvider):
+    """ Installed as app.json; jsonify() ends up in response() below. """
+    serialize_observer = None # Optional fn(seconds), told how long each response body took to encode
+
+    def dumps(self, obj, **kwargs):
+        if not kwargs:
+            return encode(obj).decode("utf-8")
+        kwargs.setdefault("default", _default)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Same layout rules as Flask's provider: indented in debug unless compact is set
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        started = time.perf_counter()
+        body = encode(obj, pretty) + b"\n"
+        if self.serialize_observer is not None: self.serialize_observer(time.perf_counter() - started)
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,69 @@
+""" Minimal in-process pub/sub used to push live score changes to open streams. """
+import queue
+import threading
+
+
+class Subscription:
+    """ One subscriber's mailbox. Only "something changed" matters, so when the
+        mailbox is full the oldest message is dropped instead of blocking publishers. """
+
+    def __init__(self, bus, topic, maxsize):
+        self._bus = bus
+        self.topic = topic
+        self._queue = queue.Queue(maxsize)
+
+    def _offer(self, message):
+        while True:
+            try:
+                self._queue.put_nowait(message)
+                return
+            except queue.Full:
+                try: self._queue.get_nowait()
+                except queue.Empty: pass
+
+    def get(self, timeout):
+        """ Next message, or None if nothing arrived within `timeout` seconds. """
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self._bus._unsubscribe(self)
+
+
+class LiveBus:
+    def __init__(self, mailbox_size=16):
+        self._mailbox_size = mailbox_size
+        self._lock = threading.Lock()
+        self._subscribers = {}  # topic -> set of Subscription
+        self._published = 0
+
+    def subscribe(self, topic):
+        subscription = Subscription(self, topic, self._mailbox_size)
+        with self._lock:
+            self._subscribers.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        with self._lock:
+            subs = self._subscribers.get(subscription.topic)
+            if subs is None: return
+            subs.discard(subscription)
+            if not subs: del self._subscribers[subscription.topic]
+
+    def publish(self, topic, message=None):
+        with self._lock:
+            self._published += 1
+            subs = list(self._subscribers.get(topic, ()))
+        for subscription in subs:
+            subscription._offer(message)
+        return len(subs)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "topics": len(self._subscribers),
+                "subscribers": sum(len(s) for s in self._subscribers.values()),
+                "published": self._published,
+            }
@@ -0,0 +1,204 @@
+""" In-process request and database metrics, exposed in Prometheus text format.
+
+Per route (the URL rule, e.g. /api/get_live_score/<int:match_id>): request
+counts by method and status, error counts and a latency histogram. Database
+time is split into connect (pool checkout, including opening a new
+connection), execute and fetch, and JSON serialisation is timed on its own,
+all labelled with the route that was being served so a slow endpoint can be
+broken down. Component stats() dicts (pool, caches, ...) are exported as
+gauges at scrape time.
+
+Counters are per process; with several workers each one is scraped (or
+summed) separately.
+"""
+import threading
+import time
+from collections import defaultdict
+
+from flask import Response, g, request
+
+PREFIX = "vpsports"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds in seconds; +Inf is implicit
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+NO_ROUTE = "<none>" # Work done outside a request (change feed, background jobs)
+UNMATCHED_ROUTE = "<unmatched>" # 404s; keeps arbitrary paths out of the label set
+
+
+class Histogram:
+    """ Cumulative-bucket histogram; not thread-safe on its own (the registry holds the lock). """
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def samples(self):
+        """ (le, cumulative count) pairs including +Inf. """
+        running = 0
+        for bound, n in zip(self.buckets, self.counts):
+            running += n
+            yield _format_value(bound), running
+        yield "+Inf", self.count
+
+
+def _format_value(value):
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class Metrics:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._requests = defaultdict(int) # (route, method, status) -> count
+        self._errors = defaultdict(int) # route -> 5xx responses (including unhandled exceptions)
+        self._request_latency = {} # route -> Histogram
+        self._db_latency = {} # (route, phase) -> Histogram
+        self._serialize_latency = {} # route -> Histogram
+        self._gauges = {} # component -> stats() callable
+        self._started = time.time()
+
+    def init_app(self, app):
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    def register_stats(self, component, stats_fn):
+        """ Exports the numeric values of stats_fn() as <prefix>_<component>_<key> gauges. """
+        self._gauges[component] = stats_fn
+
+    # --- Request hooks ---
+
+    def _before_request(self):
+        g.metrics_started = time.perf_counter()
+        self._local.route = request.url_rule.rule if request.url_rule else UNMATCHED_ROUTE
+
+    def _after_request(self, response):
+        started = g.pop("metrics_started", None)
+        if started is not None:
+            self._observe_request(self.current_route(), request.method, response.status_code, time.perf_counter() - started)
+        return response
+
+    def _teardown_request(self, exc):
+        started = g.pop("metrics_started", None)
+        if started is not None: # after_request never ran - the request died with an unhandled exception
+            self._observe_request(self.current_route(), request.method, 500, time.perf_counter() - started)
+        self._local.route = None
+
+    def _observe_request(self, route, method, status, seconds):
+        with self._lock:
+            self._requests[(route, method, status)] += 1
+            if status >= 500: self._errors[route] += 1
+            histogram = self._request_latency.get(route)
+            if histogram is None:
+                histogram = self._request_latency[route] = Histogram(REQUEST_BUCKETS)
+            histogram.observe(seconds)
+
+    def current_route(self):
+        return getattr(self._local, "route", None) or NO_ROUTE
+
+    # --- Timings reported by db_pool / json_provider ---
+
+    def observe_db(self, phase, seconds, *_):
+        key = (self.current_route(), phase)
+        with self._lock:
+            histogram = self._db_latency.get(key)
+            if histogram is None:
+                histogram = self._db_latency[key] = Histogram(DB_BUCKETS)
+            histogram.observe(seconds)
+
+    def observe_serialize(self, seconds):
+        route = self.current_route()
+        with self._lock:
+            histogram = self._serialize_latency.get(route)
+            if histogram is None:
+                histogram = self._serialize_latency[route] = Histogram(DB_BUCKETS)
+            histogram.observe(seconds)
+
+    # --- Exposition ---
+
+    def render(self):
+        """ All metrics in Prometheus text exposition format. """
+        out = []
+        with self._lock:
+            requests = sorted(self._requests.items())
+            errors = sorted(self._errors.items())
+            request_latency = sorted((k, _copy(h)) for k, h in self._request_latency.items())
+            db_latency = sorted((k, _copy(h)) for k, h in self._db_latency.items())
+            serialize_latency = sorted((k, _copy(h)) for k, h in self._serialize_latency.items())
+
+        name = f"{PREFIX}_http_requests_total"
+        out += [f"# HELP {name} Requests served, by route, method and status.", f"# TYPE {name} counter"]
+        for (route, method, status), n in requests:
+            out.append(f"{name}{_labels(route=route, method=method, status=status)} {n}")
+
+        name = f"{PREFIX}_http_request_errors_total"
+        out += [f"# HELP {name} Requests that ended in a 5xx or an unhandled exception.", f"# TYPE {name} counter"]
+        for route, n in errors:
+            out.append(f"{name}{_labels(route=route)} {n}")
+
+        _render_histograms(out, f"{PREFIX}_http_request_duration_seconds", "Request latency by route.",
+                           [({"route": route}, h) for route, h in request_latency])
+        _render_histograms(out, f"{PREFIX}_db_duration_seconds", "Database time by route and phase (connect, execute, fetch).",
+                           [({"route": route, "phase": phase}, h) for (route, phase), h in db_latency])
+        _render_histograms(out, f"{PREFIX}_json_serialize_duration_seconds", "JSON response serialisation time by route.",
+                           [({"route": route}, h) for route, h in serialize_latency])
+
+        out += [f"# TYPE {PREFIX}_process_start_time_seconds gauge", f"{PREFIX}_process_start_time_seconds {self._started}"]
+        for component, stats_fn in sorted(self._gauges.items()):
+            try:
+                stats = stats_fn()
+            except Exception as e: # A broken component shouldn't take the scrape down
+                print(f"Error collecting {component} stats for metrics: {e}")
+                continue
+            for key, value in sorted((stats or {}).items()):
+                if not isinstance(value, (int, float)): continue
+                name = f"{PREFIX}_{component}_{key}"
+                out += [f"# TYPE {name} gauge", f"{name} {_format_value(value)}"]
+        return "\n".join(out) + "\n"
+
+    def response(self):
+        return Response(self.render(), mimetype="text/plain", content_type=CONTENT_TYPE)
+
+
+def _copy(histogram):
+    snapshot = Histogram(histogram.buckets)
+    snapshot.counts = list(histogram.counts)
+    snapshot.sum = histogram.sum
+    snapshot.count = histogram.count
+    return snapshot
+
+
+def _render_histograms(out, name, help_text, series):
+    out += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for labels, histogram in series:
+        for le, n in histogram.samples():
+            out.append(f"{name}_bucket{_labels(**labels, le=le)} {n}")
+        out.append(f"{name}_sum{_labels(**labels)} {histogram.sum!r}")
+        out.append(f"{name}_count{_labels(**labels)} {histogram.count}")
@@ -0,0 +1,284 @@
+""" Versioned schema migrations.
+
+Each migration runs once, in order, in its own transaction, and is recorded in
+schema_version. Steps stay idempotent (IF NOT EXISTS / CREATE OR REPLACE) so a
+database created by the old check-everything-on-boot code can be adopted as is.
+
+Startup cost when the schema is current is one SELECT on schema_version; only
+when something is pending does a worker take the advisory lock, so concurrent
+workers never migrate at the same time.
+"""
+from collections import namedtuple
+
+import psycopg2
+
+MIGRATION_LOCK_KEY = 0x6d69677261746531 # Arbitrary, shared by every worker ("migrate1")
+
+Migration = namedtuple("Migration", ["version", "description", "apply"])
+
+
+def _livescore_table(cur, settings):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS cricket_match_livescore (
+            live_score_id SERIAL PRIMARY KEY,
+            match_id INTEGER NOT NULL UNIQUE REFERENCES cricket_match(match_id) ON DELETE CASCADE,
+            toss_winner TEXT,
+            toss_decision TEXT CHECK (toss_decision IN ('Bat', 'Bowl')),
+            current_status TEXT DEFAULT 'upcoming',
+            live_result TEXT,
+            break_status TEXT,
+            team1_name TEXT,
+            team2_name TEXT,
+            team1_runs INTEGER DEFAULT 0 NOT NULL,
+            team1_wickets INTEGER DEFAULT 0 NOT NULL,
+            team1_balls INTEGER DEFAULT 0 NOT NULL,
+            team2_runs INTEGER DEFAULT 0 NOT NULL,
+            team2_wickets INTEGER DEFAULT 0 NOT NULL,
+            team2_balls INTEGER DEFAULT 0 NOT NULL,
+            team1_extras INTEGER DEFAULT 0 NOT NULL,
+            team2_extras INTEGER DEFAULT 0 NOT NULL,
+            summary_text TEXT,
+            striker_id INTEGER,
+            non_striker_id INTEGER,
+            bowler_id INTEGER,
+            is_first_innings BOOLEAN DEFAULT TRUE NOT NULL,
+            target_score INTEGER,
+            first_innings_balls INTEGER,
+            team1_batting_stats JSONB DEFAULT '[]'::jsonb,
+            team2_bowling_stats JSONB DEFAULT '[]'::jsonb,
+            team2_batting_stats JSONB DEFAULT '[]'::jsonb,
+            team1_bowling_stats JSONB DEFAULT '[]'::jsonb,
+            team1_timeline TEXT[] DEFAULT ARRAY[]::TEXT[],
+            team2_timeline TEXT[] DEFAULT ARRAY[]::TEXT[],
+            last_updated TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    # Tables created by older builds may predate some columns/constraints
+    cur.execute("""DO $$ BEGIN
+        IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name='cricket_match_livescore' AND column_name='match_id') THEN
+            ALTER TABLE cricket_match_livescore ADD COLUMN match_id INTEGER;
+        END IF;
+        IF NOT EXISTS (SELECT 1 FROM information_schema.table_constraints WHERE table_name='cricket_match_livescore' AND constraint_name='cricket_match_livescore_match_id_fkey') THEN
+            ALTER TABLE cricket_match_livescore ADD CONSTRAINT cricket_match_livescore_match_id_fkey FOREIGN KEY (match_id) REFERENCES cricket_match(match_id) ON DELETE CASCADE;
+        END IF;
+        IF NOT EXISTS (SELECT 1 FROM information_schema.table_constraints WHERE table_name='cricket_match_livescore' AND constraint_name='cricket_match_livescore_match_id_key') THEN
+            ALTER TABLE cricket_match_livescore ADD CONSTRAINT cricket_match_livescore_match_id_key UNIQUE (match_id);
+        END IF;
+    END $$;""")
+    cur.execute("""
+        ALTER TABLE cricket_match_livescore
+            ADD COLUMN IF NOT EXISTS toss_winner TEXT,
+            ADD COLUMN IF NOT EXISTS toss_decision TEXT CHECK (toss_decision IN ('Bat', 'Bowl')),
+            ADD COLUMN IF NOT EXISTS current_status TEXT DEFAULT 'upcoming',
+            ADD COLUMN IF NOT EXISTS live_result TEXT,
+            ADD COLUMN IF NOT EXISTS break_status TEXT,
+            ADD COLUMN IF NOT EXISTS team1_name TEXT,
+            ADD COLUMN IF NOT EXISTS team2_name TEXT,
+            ADD COLUMN IF NOT EXISTS team1_runs INTEGER DEFAULT 0 NOT NULL,
+            ADD COLUMN IF NOT EXISTS team1_wickets INTEGER DEFAULT 0 NOT NULL,
+            ADD COLUMN IF NOT EXISTS team1_balls INTEGER DEFAULT 0 NOT NULL,
+            ADD COLUMN IF NOT EXISTS team2_runs INTEGER DEFAULT 0 NOT NULL,
+            ADD COLUMN IF NOT EXISTS team2_wickets INTEGER DEFAULT 0 NOT NULL,
+            ADD COLUMN IF NOT EXISTS team2_balls INTEGER DEFAULT 0 NOT NULL,
+            ADD COLUMN IF NOT EXISTS team1_extras INTEGER DEFAULT 0 NOT NULL,
+            ADD COLUMN IF NOT EXISTS team2_extras INTEGER DEFAULT 0 NOT NULL,
+            ADD COLUMN IF NOT EXISTS summary_text TEXT,
+            ADD COLUMN IF NOT EXISTS striker_id INTEGER,
+            ADD COLUMN IF NOT EXISTS non_striker_id INTEGER,
+            ADD COLUMN IF NOT EXISTS bowler_id INTEGER,
+            ADD COLUMN IF NOT EXISTS is_first_innings BOOLEAN DEFAULT TRUE NOT NULL,
+            ADD COLUMN IF NOT EXISTS target_score INTEGER,
+            ADD COLUMN IF NOT EXISTS first_innings_balls INTEGER,
+            ADD COLUMN IF NOT EXISTS team1_batting_stats JSONB DEFAULT '[]'::jsonb,
+            ADD COLUMN IF NOT EXISTS team2_bowling_stats JSONB DEFAULT '[]'::jsonb,
+            ADD COLUMN IF NOT EXISTS team2_batting_stats JSONB DEFAULT '[]'::jsonb,
+            ADD COLUMN IF NOT EXISTS team1_bowling_stats JSONB DEFAULT '[]'::jsonb,
+            ADD COLUMN IF NOT EXISTS last_updated TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+            ADD COLUMN IF NOT EXISTS team1_timeline TEXT[] DEFAULT ARRAY[]::TEXT[],
+            ADD COLUMN IF NOT EXISTS team2_timeline TEXT[] DEFAULT ARRAY[]::TEXT[]
+    """)
+
+
+def _last_updated_trigger(cur, settings):
+    cur.execute("""
+        CREATE OR REPLACE FUNCTION update_last_updated_column()
+        RETURNS TRIGGER AS $$
+        BEGIN
+           NEW.last_updated = NOW();
+           RETURN NEW;
+        END;
+        $$ language 'plpgsql';
+    """)
+    cur.execute("DROP TRIGGER IF EXISTS update_cricket_match_livescore_last_updated ON cricket_match_livescore")
+    cur.execute("""
+        CREATE TRIGGER update_cricket_match_livescore_last_updated
+        BEFORE UPDATE ON cricket_match_livescore
+        FOR EACH ROW
+        EXECUTE FUNCTION update_last_updated_column()
+    """)
+
+
+def _change_notify_trigger(cur, settings):
+    # match_id + new version (same value the API uses for ETags / event ids)
+    cur.execute(f"""
+        CREATE OR REPLACE FUNCTION notify_livescore_change()
+        RETURNS TRIGGER AS $$
+        BEGIN
+           PERFORM pg_notify('{settings["livescore_channel"]}', json_build_object(
+               'match_id', NEW.match_id,
+               'version', (EXTRACT(EPOCH FROM NEW.last_updated) * 1000000)::bigint,
+               'status', NEW.current_status
+           )::text);
+           RETURN NEW;
+        END;
+        $$ language 'plpgsql';
+    """)
+    cur.execute("DROP TRIGGER IF EXISTS notify_cricket_match_livescore_change ON cricket_match_livescore")
+    cur.execute("""
+        CREATE TRIGGER notify_cricket_match_livescore_change
+        AFTER INSERT OR UPDATE ON cricket_match_livescore
+        FOR EACH ROW
+        EXECUTE FUNCTION notify_livescore_change()
+    """)
+
+
+def _ball_event_tables(cur, settings):
+    # Append-only ball event log + periodic scorecard snapshots
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS cricket_ball_event (
+            event_id BIGSERIAL PRIMARY KEY,
+            match_id INTEGER NOT NULL REFERENCES cricket_match(match_id) ON DELETE CASCADE,
+            seq INTEGER NOT NULL,
+            innings SMALLINT NOT NULL,
+            over_no SMALLINT NOT NULL,
+            ball_no SMALLINT NOT NULL,
+            payload JSONB NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+            CONSTRAINT cricket_ball_event_match_seq_key UNIQUE (match_id, seq)
+        )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_cricket_ball_event_position ON cricket_ball_event (match_id, innings, over_no, ball_no)")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS cricket_scorecard_snapshot (
+            match_id INTEGER NOT NULL REFERENCES cricket_match(match_id) ON DELETE CASCADE,
+            seq INTEGER NOT NULL,
+            state JSONB NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (match_id, seq)
+        )
+    """)
+
+
+def _match_list_index(cur, settings):
+    # Covering index for get_matches: the status filter, keyset order and listed
+    # cricket_match columns all come from the index (INCLUDE needs PostgreSQL 11+)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_cricket_match_status_start
+        ON cricket_match (match_status, start_time, match_id)
+        INCLUDE (team_a_name, team_b_name, venue)
+    """)
+
+
+def _score_projection_columns(cur, settings):
+    # get_live_score payloads (full and view=summary) computed at write time; NULL
+    # until the row's next write, readers build from the columns meanwhile
+    cur.execute("""
+        ALTER TABLE cricket_match_livescore
+        ADD COLUMN IF NOT EXISTS score_projection JSONB,
+        ADD COLUMN IF NOT EXISTS score_summary JSONB
+    """)
+
+
+def _snapshot_barrier_flag(cur, settings):
+    # Marks snapshots written by full-row update_live_score writes; undo_ball must not
+    # drop them, as they hold edits that no ball event can replay
+    cur.execute("""
+        ALTER TABLE cricket_scorecard_snapshot
+        ADD COLUMN IF NOT EXISTS is_barrier BOOLEAN NOT NULL DEFAULT FALSE
+    """)
+
+
+def _last_updated_clock_timestamp(cur, settings):
+    # NOW() is the transaction start time: a writer that waited on the row lock could stamp
+    # (and NOTIFY) an older version than the write it queued behind. The BEFORE UPDATE trigger
+    # runs with the row lock held, so clock_timestamp() there follows commit order per row.
+    cur.execute("""
+        CREATE OR REPLACE FUNCTION update_last_updated_column()
+        RETURNS TRIGGER AS $$
+        BEGIN
+           NEW.last_updated = clock_timestamp();
+           RETURN NEW;
+        END;
+        $$ language 'plpgsql';
+    """)
+
+
+# Append new steps at the end with the next version number; never edit or reorder applied ones.
+MIGRATIONS = [
+    Migration(1, "cricket_match_livescore table and columns", _livescore_table),
+    Migration(2, "last_updated trigger", _last_updated_trigger),
+    Migration(3, "livescore change NOTIFY trigger", _change_notify_trigger),
+    Migration(4, "ball event log and scorecard snapshots", _ball_event_tables),
+    Migration(5, "match list covering index", _match_list_index),
+    Migration(6, "livescore score projection columns", _score_projection_columns),
+    Migration(7, "scorecard snapshot barrier flag", _snapshot_barrier_flag),
+    Migration(8, "last_updated from clock_timestamp()", _last_updated_clock_timestamp),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def current_version(conn):
+    """ Highest applied version (0 for a database that has never been migrated). """
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT MAX(version) FROM schema_version")
+        version = cur.fetchone()[0] or 0
+        conn.rollback() # Don't leave the connection idle in transaction
+        return version
+    except psycopg2.errors.UndefinedTable:
+        conn.rollback()
+        return 0
+    finally:
+        cur.close()
+
+
+def migrate(conn, settings):
+    """ Applies pending migrations. Returns the list of versions applied by this call. """
+    if current_version(conn) >= LATEST_VERSION:
+        return []
+
+    cur = conn.cursor()
+    applied = []
+    try:
+        # Session-level lock: other workers block here until we're done, then find nothing to do
+        cur.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_KEY,))
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.commit()
+        done = current_version(conn)
+        for migration in MIGRATIONS:
+            if migration.version <= done: continue
+            print(f"Applying migration {migration.version}: {migration.description}")
+            try:
+                migration.apply(cur, settings)
+                cur.execute("INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                            (migration.version, migration.description))
+                conn.commit()
+            except (Exception, psycopg2.Error):
+                conn.rollback()
+                raise
+            applied.append(migration.version)
+        return applied
+    finally:
+        try:
+            cur.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_KEY,))
+            conn.commit()
+        except psycopg2.Error as e:
+            print(f"Could not release migration lock: {e}")
+        cur.close()
@@ -0,0 +1,42 @@
+""" Keyset pagination helpers for match lists ordered by (start_time, match_id).
+
+The cursor is opaque to clients: urlsafe base64 of the last row's start_time
+and match_id. The next page continues strictly after that key, so page cost
+doesn't grow with how deep into the archive the client has scrolled.
+"""
+import base64
+import json
+from datetime import datetime
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE, name="limit"):
+    """ ?limit= value -> page size. Raises ValueError for bad input. """
+    if value is None or value == "":
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an integer")
+    if limit < 1:
+        raise ValueError(f"'{name}' must be at least 1")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def encode_cursor(start_time, match_id):
+    raw = json.dumps([start_time.isoformat(), match_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """ Cursor string -> (start_time, match_id). Raises ValueError for anything malformed. """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        start_time, match_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if isinstance(match_id, bool) or not isinstance(match_id, int):
+            raise ValueError
+        return datetime.fromisoformat(start_time), match_id
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError("Invalid 'cursor' parameter")
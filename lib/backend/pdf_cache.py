@@ -0,0 +1,101 @@
+""" Two-tier cache of rendered scorecard PDFs keyed by (match_id, version).
+
+Memory tier: bounded by total bytes, LRU, holds any version.
+Disk tier: only finished matches (they never change again), survives restarts
+and is shared by every worker process on the host.
+"""
+import glob
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+class ScorecardPdfCache:
+
+    def __init__(self, max_memory_bytes, disk_dir):
+        self.max_memory_bytes = max_memory_bytes
+        self.disk_dir = disk_dir
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # (match_id, version) -> bytes
+        self._memory_bytes = 0
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._disk_writes = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _disk_path(self, match_id, version):
+        return os.path.join(self.disk_dir, f"scorecard_{match_id}_{version}.pdf")
+
+    def get(self, match_id, version):
+        """ Returns PDF bytes (memory hit), a file path (disk hit) or None. """
+        key = (match_id, version)
+        with self._lock:
+            pdf_bytes = self._memory.get(key)
+            if pdf_bytes is not None:
+                self._memory.move_to_end(key)
+                self._memory_hits += 1
+                return pdf_bytes
+        if self.disk_dir:
+            path = self._disk_path(match_id, version)
+            if os.path.isfile(path):
+                with self._lock: self._disk_hits += 1
+                return path
+        with self._lock: self._misses += 1
+        return None
+
+    def put(self, match_id, version, pdf_bytes, finished, keep_in_memory=True):
+        """ keep_in_memory=False only writes the disk tier (bulk exports shouldn't flush the LRU). """
+        with self._lock:
+            # Older versions of this match can never be served again
+            for key in [k for k in self._memory if k[0] == match_id and k[1] != version]:
+                self._memory_bytes -= len(self._memory.pop(key))
+            if keep_in_memory and len(pdf_bytes) <= self.max_memory_bytes:
+                previous = self._memory.pop((match_id, version), None)
+                if previous is not None: self._memory_bytes -= len(previous)
+                self._memory[(match_id, version)] = pdf_bytes
+                self._memory_bytes += len(pdf_bytes)
+                while self._memory_bytes > self.max_memory_bytes:
+                    _, evicted = self._memory.popitem(last=False)
+                    self._memory_bytes -= len(evicted)
+        if finished and self.disk_dir:
+            self._write_disk(match_id, version, pdf_bytes)
+
+    def _write_disk(self, match_id, version, pdf_bytes):
+        path = self._disk_path(match_id, version)
+        if os.path.isfile(path): return
+        tmp_path = None
+        try:
+            # Write to a temp file and rename so readers never see a partial PDF
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(pdf_bytes)
+            os.replace(tmp_path, path)
+            tmp_path = None
+            with self._lock: self._disk_writes += 1
+            for stale in glob.glob(os.path.join(self.disk_dir, f"scorecard_{match_id}_*.pdf")):
+                if stale != path:
+                    try: os.remove(stale)
+                    except OSError: pass
+        except OSError as e:
+            print(f"Could not write scorecard PDF cache file for match {match_id}: {e}")
+        finally:
+            if tmp_path is not None: # Failed after mkstemp (e.g. disk full); don't leave the temp file behind
+                try: os.remove(tmp_path)
+                except OSError: pass
+
+    def stats(self):
+        with self._lock:
+            lookups = self._memory_hits + self._disk_hits + self._misses
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+                "memory_hits": self._memory_hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_ratio": round((self._memory_hits + self._disk_hits) / lookups, 4) if lookups else 0.0,
+                "disk_writes": self._disk_writes,
+            }
@@ -0,0 +1,189 @@
+""" Off-request scorecard PDF rendering.
+
+ReportLab work is CPU-bound and holds the GIL, so it runs in a small process
+pool instead of on request threads. Jobs are keyed by (match_id, version):
+while a render for a version is queued, running or its result is still held,
+every request for that version gets the same job back.
+"""
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from scorecard_pdf import render_scorecard_pdf
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+class RenderJob:
+
+    def __init__(self, match_id, version, finished):
+        self.job_id = uuid.uuid4().hex
+        self.match_id = match_id
+        self.version = version
+        self.finished = finished
+        self.created_at = time.time()
+        self.completed_at = None
+        self.error = None
+        self.pdf_bytes = None
+        self._future = None
+        self._done = threading.Event()
+
+    @property
+    def state(self):
+        if self._done.is_set():
+            return JOB_FAILED if self.error is not None else JOB_DONE
+        if self._future is not None and self._future.running():
+            return JOB_RUNNING
+        return JOB_QUEUED
+
+    def wait(self, timeout):
+        """ True once the job has completed (successfully or not). """
+        return self._done.wait(timeout)
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "match_id": self.match_id,
+            "version": self.version,
+            "state": self.state,
+            "error": self.error,
+            "created_at": self.created_at,
+            "completed_at": self.completed_at,
+        }
+
+
+class PdfRenderService:
+
+    def __init__(self, cache, max_workers, job_ttl_secs, max_jobs):
+        self._cache = cache
+        self.max_workers = max_workers
+        self.job_ttl_secs = job_ttl_secs
+        self.max_jobs = max_jobs
+        self._lock = threading.Lock()
+        self._executor = None
+        self._jobs = {}  # job_id -> RenderJob, in submission order
+        self._by_version = {}  # (match_id, version) -> RenderJob
+        self._submitted = 0
+        self._deduplicated = 0
+        self._completed = 0
+        self._failed = 0
+        self._render_secs_total = 0.0
+
+    def _get_executor(self):
+        # Called with self._lock held. Workers are spawned rather than forked:
+        # forking a threaded server copies held locks and pooled DB sockets.
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def get(self, job_id):
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def find(self, match_id, version):
+        """ The live (not failed) job for this match version, if any. """
+        with self._lock:
+            self._prune()
+            job = self._by_version.get((match_id, version))
+            if job is None or job.state == JOB_FAILED: return None
+            self._deduplicated += 1
+            return job
+
+    def submit(self, match_id, version, finished, data):
+        """ Queues a render of `data` (a livescore row dict) unless one is already held for this version. """
+        with self._lock:
+            self._prune()
+            job = self._by_version.get((match_id, version))
+            if job is not None and job.state != JOB_FAILED:
+                self._deduplicated += 1
+                return job
+            job = RenderJob(match_id, version, finished)
+            self._jobs[job.job_id] = job
+            self._by_version[(match_id, version)] = job
+            self._submitted += 1
+            try:
+                job._future = self._get_executor().submit(render_scorecard_pdf, data)
+            except (BrokenProcessPool, RuntimeError) as e:
+                self._executor = None # Recreated on the next submit
+                job._future = None
+                submit_error = e
+            else:
+                submit_error = None
+        if submit_error is not None:
+            self._complete(job, None, submit_error)
+        else:
+            job._future.add_done_callback(lambda future: self._on_future_done(job, future))
+        return job
+
+    def render_async(self, data):
+        """ Bare render on the shared pool, outside the job registry (bulk exports).
+            Returns a Future resolving to the PDF bytes. """
+        with self._lock:
+            try:
+                return self._get_executor().submit(render_scorecard_pdf, data)
+            except BrokenProcessPool:
+                self._executor = None
+                return self._get_executor().submit(render_scorecard_pdf, data)
+
+    def _on_future_done(self, job, future):
+        try:
+            self._complete(job, future.result(), None)
+        except BrokenProcessPool as e:
+            with self._lock:
+                if self._executor is not None:
+                    self._executor = None
+            self._complete(job, None, e)
+        except Exception as e:
+            self._complete(job, None, e)
+
+    def _complete(self, job, pdf_bytes, error):
+        if error is None:
+            self._cache.put(job.match_id, job.version, pdf_bytes, job.finished)
+        else:
+            print(f"Error rendering scorecard PDF for match {job.match_id}: {error}")
+        with self._lock:
+            job.pdf_bytes = pdf_bytes
+            job.error = str(error) if error is not None else None
+            job.completed_at = time.time()
+            if error is None:
+                self._completed += 1
+                self._render_secs_total += job.completed_at - job.created_at
+            else:
+                self._failed += 1
+        job._done.set()
+
+    def _prune(self):
+        # Called with self._lock held. Drops completed jobs past their TTL, then
+        # the oldest completed ones while over max_jobs; pending jobs are kept.
+        now = time.time()
+        expired = [j for j in self._jobs.values()
+                   if j.completed_at is not None and now - j.completed_at > self.job_ttl_secs]
+        overflow = len(self._jobs) - len(expired) - self.max_jobs
+        if overflow > 0:
+            completed = [j for j in self._jobs.values() if j.completed_at is not None and j not in expired]
+            expired.extend(completed[:overflow])
+        for job in expired:
+            self._jobs.pop(job.job_id, None)
+            if self._by_version.get((job.match_id, job.version)) is job:
+                del self._by_version[(job.match_id, job.version)]
+
+    def stats(self):
+        with self._lock:
+            pending = sum(1 for j in self._jobs.values() if j.completed_at is None)
+            return {
+                "workers": self.max_workers,
+                "jobs_held": len(self._jobs),
+                "jobs_pending": pending,
+                "submitted": self._submitted,
+                "deduplicated": self._deduplicated,
+                "completed": self._completed,
+                "failed": self._failed,
+                "avg_job_secs": round(self._render_secs_total / self._completed, 3) if self._completed else 0.0,
+            }
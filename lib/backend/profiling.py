@@ -0,0 +1,182 @@
+""" Opt-in sampling profiler for single requests.
+
+A request is profiled when it carries the configured secret (X-Profile header
+or ?profile= query parameter) or is picked by random sampling. While it runs,
+a helper thread reads the request thread's stack every `interval` seconds via
+sys._current_frames(), so everything on that thread is covered - DB calls,
+JSON encoding, PDF builds - without instrumenting any code. Stacks are written
+on teardown in folded format ("frame;frame;frame count" per line), which
+flamegraph.pl, speedscope and inferno read directly.
+"""
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+
+from flask import g, request
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_ID_HEADER = "X-Profile-Id" # Set on profiled responses so the caller can fetch the result
+FOLDED_SUFFIX = ".folded"
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class _Sampler(threading.Thread):
+    """ Samples one thread's Python stack until stopped or max_secs elapse. """
+
+    def __init__(self, thread_id, interval, max_secs):
+        super().__init__(name=f"profiler-{thread_id}", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_secs = max_secs
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        deadline = time.monotonic() + self.max_secs
+        while not self._stop_event.wait(self.interval) and time.monotonic() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None: break # Thread is gone
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class RequestProfiler:
+
+    def __init__(self, profile_dir, secret=None, sample_rate=0.0, interval=0.005, max_secs=60.0, max_profiles=200):
+        self.profile_dir = profile_dir
+        self.secret = secret
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.max_secs = max_secs
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=max_profiles) # Newest last; dicts as returned by list()
+        self._written = 0
+        self._write_errors = 0
+
+    def init_app(self, app):
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    def authorized(self):
+        """ True when the current request carries the profiling secret. """
+        token = request.headers.get(PROFILE_HEADER) or request.args.get(PROFILE_QUERY_PARAM)
+        return bool(token and self.secret and hmac.compare_digest(token.encode("utf-8"), self.secret.encode("utf-8")))
+
+    def _requested(self):
+        if self.authorized():
+            return "requested"
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    def _before_request(self):
+        reason = self._requested()
+        if reason is None: return
+        sampler = _Sampler(threading.get_ident(), self.interval, self.max_secs)
+        g.profile = {
+            "profile_id": f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{os.getpid()}-{threading.get_ident() % 100000:05d}-{random.randrange(16 ** 4):04x}",
+            "endpoint": request.endpoint or "<unmatched>",
+            "path": request.path,
+            "method": request.method,
+            "reason": reason,
+            "started": time.perf_counter(),
+            "sampler": sampler,
+        }
+        sampler.start()
+
+    def active(self):
+        """ True while the current request is being profiled. """
+        return g.get("profile") is not None
+
+    def explicit(self):
+        """ True while the current request is profiled because it asked to be (not by sampling). """
+        profile = g.get("profile")
+        return profile is not None and profile["reason"] == "requested"
+
+    def _after_request(self, response):
+        profile = g.get("profile")
+        if profile is not None:
+            response.headers[PROFILE_ID_HEADER] = profile["profile_id"]
+            profile["status"] = response.status_code
+        return response
+
+    def _teardown_request(self, exc):
+        profile = g.pop("profile", None)
+        if profile is None: return
+        sampler = profile.pop("sampler")
+        sampler.stop()
+        entry = {
+            "profile_id": profile["profile_id"],
+            "endpoint": profile["endpoint"],
+            "path": profile["path"],
+            "method": profile["method"],
+            "reason": profile["reason"],
+            "status": profile.get("status", 500),
+            "duration_ms": round((time.perf_counter() - profile["started"]) * 1000, 3),
+            "samples": sampler.samples,
+            "interval_ms": self.interval * 1000,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            path = os.path.join(self.profile_dir, entry["profile_id"] + FOLDED_SUFFIX)
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, count in sampler.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+        except OSError as e:
+            print(f"Could not write profile {entry['profile_id']}: {e}")
+            with self._lock: self._write_errors += 1
+            return
+        with self._lock:
+            if len(self._recent) == self._recent.maxlen:
+                self._remove_file(self._recent[0]["profile_id"])
+            self._recent.append(entry)
+            self._written += 1
+
+    def _remove_file(self, profile_id):
+        try:
+            os.remove(os.path.join(self.profile_dir, profile_id + FOLDED_SUFFIX))
+        except OSError:
+            pass
+
+    def path_for(self, profile_id):
+        """ Folded-stack file of a recent profile, or None if it isn't one of ours. """
+        with self._lock:
+            known = any(p["profile_id"] == profile_id for p in self._recent)
+        return os.path.join(self.profile_dir, profile_id + FOLDED_SUFFIX) if known else None
+
+    def recent(self):
+        """ Recent profiles, newest first. """
+        with self._lock:
+            return list(reversed(self._recent))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled_by_secret": bool(self.secret),
+                "sample_rate": self.sample_rate,
+                "profiles_held": len(self._recent),
+                "profiles_written": self._written,
+                "write_errors": self._write_errors,
+            }
@@ -0,0 +1,237 @@
+""" In-process caches for read-heavy scoreboard endpoints. """
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# version is scoreboard.livescore_version(last_updated); None means "don't cache" (e.g. fallback payloads)
+LiveScoreSnapshot = namedtuple("LiveScoreSnapshot", ["match_id", "version", "finished", "payload"])
+
+
+class LiveScoreCache:
+    """ Per-match get_live_score snapshots with write-through invalidation.
+
+        Concurrent misses for the same match share one loader call, and
+        when the cache is full finished matches are evicted before live
+        ones. Live entries also expire after `live_max_age` seconds as a
+        safety net for writes made by other worker processes.
+
+        A match can have several cached `variant`s (e.g. field selections);
+        invalidating the match drops all of them. """
+
+    def __init__(self, max_entries, live_max_age):
+        self.max_entries = max_entries
+        self.live_max_age = live_max_age
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (match_id, variant) -> (snapshot, loaded_at)
+        self._generations = {}  # match_id -> invalidation counter
+        self._inflight = {}  # (match_id, variant) -> threading.Event
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._evictions = 0
+
+    def _fresh(self, entry):
+        snapshot, loaded_at = entry
+        return snapshot.finished or (time.monotonic() - loaded_at) < self.live_max_age
+
+    def get_or_load(self, match_id, loader, variant=None):
+        """ Returns the cached snapshot or calls loader() -> LiveScoreSnapshot | None. """
+        key = (match_id, variant)
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and self._fresh(entry):
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return entry[0]
+                event = self._inflight.get(key)
+                if event is None:
+                    event = self._inflight[key] = threading.Event()
+                    generation = self._generations.get(match_id, 0)
+                    self._misses += 1
+                    break
+            # Someone else is already loading this match - wait for them, then re-check
+            if not event.wait(timeout=10):
+                return loader()  # Leader looks stuck - don't queue up behind it
+
+        try:
+            snapshot = loader()
+            if snapshot is not None and snapshot.version is not None:
+                with self._lock:
+                    # Skip the store if a write invalidated the match while we were loading
+                    if self._generations.get(match_id, 0) == generation:
+                        self._entries[key] = (snapshot, time.monotonic())
+                        self._entries.move_to_end(key)
+                        self._evict_locked()
+            return snapshot
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is event:
+                    del self._inflight[key]
+            event.set()
+
+    def get_many_or_load(self, match_ids, loader, variant=None):
+        """ Snapshots for several matches: {match_id: LiveScoreSnapshot | None}.
+            All misses are loaded together with loader(missing_ids) -> dict. """
+        found = {}
+        missing = []
+        generations = {}
+        with self._lock:
+            for match_id in match_ids:
+                entry = self._entries.get((match_id, variant))
+                if entry is not None and self._fresh(entry):
+                    self._entries.move_to_end((match_id, variant))
+                    self._hits += 1
+                    found[match_id] = entry[0]
+                else:
+                    missing.append(match_id)
+                    generations[match_id] = self._generations.get(match_id, 0)
+                    self._misses += 1
+        if missing:
+            loaded = loader(missing)
+            with self._lock:
+                for match_id, snapshot in loaded.items():
+                    if snapshot is None or snapshot.version is None: continue
+                    if self._generations.get(match_id, 0) != generations.get(match_id): continue
+                    self._entries[(match_id, variant)] = (snapshot, time.monotonic())
+                    self._entries.move_to_end((match_id, variant))
+                self._evict_locked()
+            for match_id in missing:
+                found[match_id] = loaded.get(match_id)
+        return found
+
+    def _evict_locked(self):
+        while len(self._entries) > self.max_entries:
+            victim = next((key for key, (snap, _) in self._entries.items() if snap.finished), None)
+            if victim is None:
+                self._entries.popitem(last=False)
+            else:
+                del self._entries[victim]
+            self._evictions += 1
+
+    def invalidate(self, match_id, version=None):
+        """ Drops the match's snapshot. With a `version`, snapshots already at or
+            past that version are kept (e.g. a change notification for our own write).
+            Relies on versions following commit order per row (clock_timestamp() in the
+            last_updated trigger, migration 8). """
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == match_id]
+            if version is not None and keys and not any(key[0] == match_id for key in self._inflight) \
+                    and all(self._entries[key][0].version is not None and self._entries[key][0].version >= version
+                            for key in keys):
+                return
+            self._generations[match_id] = self._generations.get(match_id, 0) + 1
+            for key in keys:
+                del self._entries[key]
+                self._invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            for match_id, _ in list(self._entries) + list(self._inflight):
+                self._generations[match_id] = self._generations.get(match_id, 0) + 1
+            self._invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self._invalidations,
+                "evictions": self._evictions,
+            }
+
+
+# One cached get_matches page; match_ids lets a write to any listed match drop it
+# (a feed spanning all statuses is cached under status ALL_STATUSES)
+ALL_STATUSES = "*"
+MatchListPage = namedtuple("MatchListPage", ["matches", "match_ids", "next_cursor"])
+
+
+class MatchListCache:
+    """ get_matches pages keyed by (sport, status, limit, cursor).
+
+        Writes invalidate whole (sport, status) lists or every page that lists
+        a given match. Entries also expire after `max_age` seconds (or earlier,
+        see put) as a safety net for writes made by other worker processes. """
+
+    def __init__(self, max_entries, max_age):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (MatchListPage, expires_at)
+        self._generations = {}  # (sport, status) -> invalidation counter
+        self._match_epoch = 0  # Bumped by invalidate_match; a page being loaded may show that match
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def generation(self, sport, status):
+        """ Read before loading a page and pass to put(), so a concurrent invalidation wins. """
+        with self._lock:
+            return self._match_epoch, self._generations.get((sport, status), 0)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() < entry[1]:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self._misses += 1
+            return None
+
+    def put(self, key, page, generation, max_age=None):
+        """ max_age (seconds) can shorten the default expiry, e.g. until the first
+            upcoming match starts and drops out of the list. """
+        ttl = self.max_age if max_age is None else max(0.0, min(self.max_age, max_age))
+        if ttl <= 0: return
+        with self._lock:
+            if (self._match_epoch, self._generations.get(key[:2], 0)) != generation: return
+            self._entries[key] = (page, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _drop_locked(self, keys):
+        for key in keys:
+            del self._entries[key]
+            self._invalidations += 1
+
+    def invalidate(self, sport, status):
+        """ Drops every page of one list (its membership changed), and the sport's combined feeds. """
+        list_keys = {(sport, status), (sport, ALL_STATUSES)}
+        with self._lock:
+            for list_key in list_keys:
+                self._generations[list_key] = self._generations.get(list_key, 0) + 1
+            self._drop_locked([key for key in self._entries if key[:2] in list_keys])
+
+    def invalidate_match(self, match_id):
+        """ Drops every page that shows this match (its score or status changed). """
+        with self._lock:
+            self._match_epoch += 1
+            self._drop_locked([key for key, (page, _) in self._entries.items() if match_id in page.match_ids])
+
+    def clear(self):
+        with self._lock:
+            self._match_epoch += 1
+            self._invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self._invalidations,
+            }
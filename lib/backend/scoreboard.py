@@ -0,0 +1,229 @@
+""" Pure formatting helpers that turn cricket_match_livescore rows into the
+    payloads the Flutter screens expect. No Flask or DB access in here. """
+from datetime import datetime, timezone
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Columns read by get_live_score, in the order they are selected
+LIVE_SCORE_COLUMNS = [
+    "team1_name", "team2_name", "team1_runs", "team1_wickets", "team1_balls",
+    "team2_runs", "team2_wickets", "team2_balls", "summary_text",
+    "striker_id", "non_striker_id", "bowler_id", "is_first_innings",
+    "toss_winner", "toss_decision", "current_status",
+    "team1_batting_stats", "team2_bowling_stats",
+    "team2_batting_stats", "team1_bowling_stats",
+    "live_result", "team1_extras", "team2_extras",
+    "team1_timeline", "team2_timeline", "last_updated",
+]
+
+
+# Columns every variant reads: version (ETag / cache) and finished flag
+_ALWAYS_COLUMNS = ("last_updated", "current_status")
+_TEAM_SIDES = ("team1_name", "team2_name", "toss_winner", "toss_decision", "is_first_innings")
+
+# get_live_score payload key -> livescore columns needed to build it
+PAYLOAD_FIELD_COLUMNS = {
+    "match_id": (),
+    "team_a_name": ("team1_name",),
+    "team_b_name": ("team2_name",),
+    "team_a_score": ("team1_runs", "team1_wickets"),
+    "team_a_overs": ("team1_balls",),
+    "team_b_score": ("team2_runs", "team2_wickets"),
+    "team_b_overs": ("team2_balls",),
+    "match_status_text": (),
+    "summary_text": ("summary_text", "live_result"),
+    "batting_team_name": _TEAM_SIDES,
+    "bowling_team_name": _TEAM_SIDES,
+    "batsman_on_strike_name": _TEAM_SIDES + ("team1_batting_stats", "team2_batting_stats", "striker_id"),
+    "batsman_on_strike_score": _TEAM_SIDES + ("team1_batting_stats", "team2_batting_stats", "striker_id"),
+    "batsman_off_strike_name": _TEAM_SIDES + ("team1_batting_stats", "team2_batting_stats", "non_striker_id"),
+    "batsman_off_strike_score": _TEAM_SIDES + ("team1_batting_stats", "team2_batting_stats", "non_striker_id"),
+    "bowler_on_strike_name": _TEAM_SIDES + ("team1_bowling_stats", "team2_bowling_stats", "bowler_id"),
+    "bowler_on_strike_figures": _TEAM_SIDES + ("team1_bowling_stats", "team2_bowling_stats", "bowler_id"),
+    "bowler_off_strike_name": (),
+    "bowler_off_strike_figures": (),
+    "team1_batting": ("team1_batting_stats",),
+    "team2_bowling": ("team2_bowling_stats",),
+    "team2_batting": ("team2_batting_stats",),
+    "team1_bowling": ("team1_bowling_stats",),
+    "team1_extras": ("team1_extras",),
+    "team2_extras": ("team2_extras",),
+    "is_first_innings": ("is_first_innings",),
+    "team1_timeline": ("team1_timeline",),
+    "team2_timeline": ("team2_timeline",),
+}
+
+# view=summary: what the home/summary cards show - no JSONB stats, no timelines
+SUMMARY_FIELDS = frozenset([
+    "match_id", "team_a_name", "team_b_name", "team_a_score", "team_a_overs",
+    "team_b_score", "team_b_overs", "match_status_text", "summary_text",
+    "batting_team_name", "bowling_team_name", "is_first_innings",
+])
+
+
+def parse_field_selection(view=None, fields=None):
+    """ ?view= / ?fields= -> frozenset of payload keys, or None for the full payload.
+        Raises ValueError for unknown views or field names. """
+    if view not in (None, "", "full", "summary"):
+        raise ValueError("'view' must be 'summary' or 'full'")
+    if view == "full" or (not view and not fields):
+        return None
+    selected = set(SUMMARY_FIELDS) if view == "summary" else {"match_id"}
+    for name in (fields or "").split(","):
+        name = name.strip()
+        if not name: continue
+        if name not in PAYLOAD_FIELD_COLUMNS:
+            raise ValueError(f"Unknown field '{name}'")
+        selected.add(name)
+    return frozenset(selected)
+
+
+def columns_for_fields(fields):
+    """ LIVE_SCORE_COLUMNS subset (in table order) needed for a field selection; all of them for None. """
+    if fields is None:
+        return list(LIVE_SCORE_COLUMNS)
+    needed = set(_ALWAYS_COLUMNS)
+    for name in fields:
+        needed.update(PAYLOAD_FIELD_COLUMNS[name])
+    return [col for col in LIVE_SCORE_COLUMNS if col in needed]
+
+
+def select_fields(payload, fields):
+    """ Trims a full payload down to the selected keys (None keeps everything). """
+    if fields is None:
+        return payload
+    return {key: value for key, value in payload.items() if key in fields}
+
+def livescore_version(last_updated):
+    """ Exact integer version (microseconds since epoch) from a row's last_updated.
+        Matches (EXTRACT(EPOCH FROM last_updated) * 1000000)::bigint in SQL. """
+    if last_updated is None:
+        return None
+    if last_updated.tzinfo is None:
+        last_updated = last_updated.replace(tzinfo=timezone.utc)
+    delta = last_updated - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def is_finished_status(status):
+    return (status or "").lower() == "finished"
+
+
+def format_overs(balls):
+    """ 0-based ball count -> "overs.balls" string, e.g. 14 -> "2.2". """
+    balls = balls or 0
+    return f"{balls // 6}.{balls % 6}"
+
+
+def format_match_score(runs, wickets, balls):
+    """ Score line used in match lists, e.g. "145/6 (20.0)". """
+    if runs is None or wickets is None or balls is None:
+        return "0/0 (0.0)" # Default if no score data
+    return f"{runs}/{wickets} ({format_overs(balls)})"
+
+
+def batting_and_bowling_teams(t1_name, t2_name, toss_winner, toss_decision, is_first):
+    """ Works out (batting_team_name, bowling_team_name) from toss data. """
+    if is_first is None or not toss_winner or not toss_decision:
+        return None, None
+    team_a_bats_first = (toss_winner == t1_name and toss_decision.lower() == 'bat') or \
+                        (toss_winner == t2_name and toss_decision.lower() == 'bowl')
+    if is_first:
+        return (t1_name, t2_name) if team_a_bats_first else (t2_name, t1_name)
+    return (t2_name, t1_name) if team_a_bats_first else (t1_name, t2_name)
+
+
+def get_player_stats_from_json(stats_list, player_id, is_batsman):
+    """ Finds a player in a JSONB stats list and returns (name, score/figures). """
+    if player_id is None: return "N/A", "-"
+    player_stat = next((p for p in (stats_list or []) if p.get('id') == player_id), None)
+    if player_stat is None: return f"P{player_id}", "-"
+    name = player_stat.get('name', f"P{player_id}")
+    if is_batsman:
+        runs = player_stat.get('runs', 0); balls = player_stat.get('ballsFaced', 0)
+        return name, f"{runs}({balls})"
+    wickets = player_stat.get('wicketsTaken', 0); runs_conceded = player_stat.get('runsConceded', 0)
+    return name, f"{wickets}/{runs_conceded} ({format_overs(player_stat.get('ballsBowled', 0))})"
+
+
+def build_live_score_payload(match_id, row):
+    """ Builds the get_live_score response from a livescore row dict (column -> value). """
+    t1_name = row.get("team1_name"); t2_name = row.get("team2_name")
+    is_first = row.get("is_first_innings")
+
+    batting_team_name, bowling_team_name = batting_and_bowling_teams(
+        t1_name, t2_name, row.get("toss_winner"), row.get("toss_decision"), is_first)
+    striker_name, striker_score = "N/A", "-"
+    non_striker_name, non_striker_score = "N/A", "-"
+    bowler_name, bowler_figures = "N/A", "-"
+
+    if batting_team_name is not None:
+        batting_stats = row.get("team1_batting_stats") if batting_team_name == t1_name else row.get("team2_batting_stats")
+        bowling_stats = row.get("team1_bowling_stats") if bowling_team_name == t1_name else row.get("team2_bowling_stats")
+        striker_name, striker_score = get_player_stats_from_json(batting_stats, row.get("striker_id"), True)
+        non_striker_name, non_striker_score = get_player_stats_from_json(batting_stats, row.get("non_striker_id"), True)
+        bowler_name, bowler_figures = get_player_stats_from_json(bowling_stats, row.get("bowler_id"), False)
+
+    db_current_status = row.get("current_status") or "upcoming"
+    live_result = row.get("live_result")
+    display_summary = live_result if is_finished_status(db_current_status) and live_result else row.get("summary_text")
+
+    return {
+        "match_id": match_id,
+        "team_a_name": t1_name, "team_b_name": t2_name,
+        "team_a_score": f"{row.get('team1_runs') or 0}/{row.get('team1_wickets') or 0}",
+        "team_a_overs": f"({format_overs(row.get('team1_balls'))})",
+        "team_b_score": f"{row.get('team2_runs') or 0}/{row.get('team2_wickets') or 0}",
+        "team_b_overs": f"({format_overs(row.get('team2_balls'))})",
+        "match_status_text": db_current_status,
+        "summary_text": display_summary or "Match in progress.",
+        "batting_team_name": batting_team_name,
+        "bowling_team_name": bowling_team_name,
+        "batsman_on_strike_name": striker_name or "N/A",
+        "batsman_on_strike_score": striker_score or "-",
+        "batsman_off_strike_name": non_striker_name or "N/A",
+        "batsman_off_strike_score": non_striker_score or "-",
+        "bowler_on_strike_name": bowler_name or "N/A",
+        "bowler_on_strike_figures": bowler_figures or "-",
+        "bowler_off_strike_name": "N/A", # Only current bowler needed for summary
+        "bowler_off_strike_figures": "-",
+        # Include the detailed stats lists
+        "team1_batting": row.get("team1_batting_stats") or [],
+        "team2_bowling": row.get("team2_bowling_stats") or [],
+        "team2_batting": row.get("team2_batting_stats") or [],
+        "team1_bowling": row.get("team1_bowling_stats") or [],
+        "team1_extras": row.get("team1_extras") or 0,
+        "team2_extras": row.get("team2_extras") or 0,
+        "is_first_innings": is_first,
+        "team1_timeline": row.get("team1_timeline") or [],
+        "team2_timeline": row.get("team2_timeline") or [],
+    }
+
+
+def build_fallback_live_score(match_id, t1_name, t2_name, match_status, live_result=None):
+    """ Minimal get_live_score payload for matches without a livescore row yet. """
+    summary = "Match hasn't started yet."
+    status_text = "Upcoming"
+    if match_status == 'live':
+        summary = "Toss will happen soon."
+        status_text = "Live"
+    elif match_status == 'finished':
+        summary = live_result or "Match Finished"
+        status_text = "Finished"
+
+    return {
+        "match_id": match_id, "team_a_name": t1_name, "team_b_name": t2_name,
+        "team_a_score": "0/0", "team_a_overs": "(0.0)",
+        "team_b_score": "0/0", "team_b_overs": "(0.0)",
+        "match_status_text": status_text, "summary_text": summary,
+        "batting_team_name": None, "bowling_team_name": None,
+        "batsman_on_strike_name": "N/A", "batsman_on_strike_score": "-",
+        "batsman_off_strike_name": "N/A", "batsman_off_strike_score": "-",
+        "bowler_on_strike_name": "N/A", "bowler_on_strike_figures": "-",
+        "bowler_off_strike_name": "N/A", "bowler_off_strike_figures": "-",
+        "team1_batting": [], "team2_bowling": [],
+        "team2_batting": [], "team1_bowling": [],
+        "team1_extras": 0, "team2_extras": 0,
+        "is_first_innings": True, # Assume first innings if upcoming/toss
+        "team1_timeline": [], "team2_timeline": [],
+    }
@@ -0,0 +1,214 @@
+""" ReportLab scorecard rendering.
+
+Kept free of Flask and DB access so the render service (pdf_render.py) can run
+it in worker processes: the input is the plain livescore row dict, the output
+is the PDF as bytes.
+"""
+import io
+
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import inch
+from reportlab.lib import colors
+
+
+def create_scorecard_pdf(data):
+    """ Helper function to generate the PDF from match data with improved table styling. """
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=0.5*inch, bottomMargin=0.5*inch, leftMargin=0.5*inch, rightMargin=0.5*inch)
+    story = []
+    styles = getSampleStyleSheet()
+    
+    # --- Custom Styles ---
+    # Header style for tables
+    header_style = ParagraphStyle(name='TableHeader', parent=styles['Normal'], fontName='Helvetica-Bold', alignment=1) # Center alignment=1
+    # Right-aligned style for numbers in tables
+    right_align_style = ParagraphStyle(name='RightAlign', parent=styles['Normal'], alignment=2) # Right alignment=2
+    # --- End Custom Styles ---
+
+    # --- Title & Result ---
+    story.append(Paragraph("Official Match Scorecard", styles['h1']))
+    story.append(Paragraph(f"{data.get('team1_name', 'Team A')} vs {data.get('team2_name', 'Team B')}", styles['h2']))
+    story.append(Paragraph(data.get('live_result') or "Match in Progress", styles['h3']))
+    
+    # --- Match Info ---
+    toss_winner = data.get('toss_winner')
+    toss_decision = data.get('toss_decision')
+    toss_text = f"Toss: {toss_winner} won the toss and chose to {toss_decision}." if toss_winner else "Toss not yet decided."
+    story.append(Paragraph(toss_text, styles['Normal']))
+    
+    # --- Determine who batted first ---
+    # ... (same logic as before to determine batting order) ...
+    team1_name = data.get('team1_name')
+    team2_name = data.get('team2_name')
+    team1_batted_first = True 
+    if toss_winner and toss_decision:
+        if (toss_winner == team1_name and toss_decision.lower() == 'bowl') or \
+           (toss_winner == team2_name and toss_decision.lower() == 'bat'):
+            team1_batted_first = False
+            
+    first_batting_team_name = team1_name if team1_batted_first else team2_name
+    second_batting_team_name = team2_name if team1_batted_first else team1_name
+    
+    first_batting_stats = data.get('team1_batting') if team1_batted_first else data.get('team2_batting')
+    first_bowling_stats = data.get('team2_bowling') if team1_batted_first else data.get('team1_bowling')
+    first_innings_runs = data.get('team1_runs') if team1_batted_first else data.get('team2_runs')
+    first_innings_wickets = data.get('team1_wickets') if team1_batted_first else data.get('team2_wickets')
+    first_innings_balls = data.get('team1_balls') if team1_batted_first else data.get('team2_balls')
+    first_innings_extras = data.get('team1_extras') if team1_batted_first else data.get('team2_extras')
+    first_innings_timeline = data.get('team1_timeline') if team1_batted_first else data.get('team2_timeline')
+    
+    second_batting_stats = data.get('team2_batting') if team1_batted_first else data.get('team1_batting')
+    second_bowling_stats = data.get('team1_bowling') if team1_batted_first else data.get('team2_bowling')
+    second_innings_runs = data.get('team2_runs') if team1_batted_first else data.get('team1_runs')
+    second_innings_wickets = data.get('team2_wickets') if team1_batted_first else data.get('team1_wickets')
+    second_innings_balls = data.get('team2_balls') if team1_batted_first else data.get('team1_balls')
+    second_innings_extras = data.get('team2_extras') if team1_batted_first else data.get('team1_extras')
+    second_innings_timeline = data.get('team2_timeline') if team1_batted_first else data.get('team1_timeline')
+    
+
+    # --- Define Table Styles ---
+    batting_table_style = TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), colors.grey),
+        ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
+        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+        ('ALIGN', (0,1), (0,-1), 'LEFT'), # Left align Batsman name
+        ('ALIGN', (1,1), (1,-1), 'LEFT'), # Left align Status
+        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+        ('BOTTOMPADDING', (0,0), (-1,0), 10),
+        ('BACKGROUND', (0,1), (-1,-1), colors.beige),
+        ('GRID', (0,0), (-1,-1), 1, colors.black),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('LEFTPADDING', (0,0), (-1,-1), 5),
+        ('RIGHTPADDING', (0,0), (-1,-1), 5),
+    ])
+
+    bowling_table_style = TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), colors.darkslategray), # Different header color
+        ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
+        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+        ('ALIGN', (0,1), (0,-1), 'LEFT'), # Left align Bowler name
+        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+        ('BOTTOMPADDING', (0,0), (-1,0), 10),
+        ('BACKGROUND', (0,1), (-1,-1), colors.lightgrey), # Different row color
+        ('GRID', (0,0), (-1,-1), 1, colors.black),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('LEFTPADDING', (0,0), (-1,-1), 5),
+        ('RIGHTPADDING', (0,0), (-1,-1), 5),
+    ])
+    # --- End Define Table Styles ---
+
+
+    # --- Innings 1 ---
+    story.append(Spacer(1, 0.2 * inch))
+    story.append(Paragraph(f"<b>Innings 1: {first_batting_team_name} Batting</b>", styles['h4'])) # Make bold
+    story.append(Spacer(1, 0.05 * inch)) # Less space before table
+
+    # Batting Table 1
+    # Wrap headers in Paragraphs for styling
+    batting_header = [Paragraph('Batsman', header_style), Paragraph('Status', header_style), Paragraph('R', header_style), Paragraph('B', header_style)]
+    batting_data = [batting_header]
+    for p in (first_batting_stats or []):
+        if p.get('ballsFaced', 0) > 0 or p.get('status') not in ['Yet to bat', 'Not Out']:
+            # Wrap numbers in Paragraphs for right alignment
+            batting_data.append([
+                Paragraph(p.get('name', ''), styles['Normal']), # Name left-aligned by default
+                Paragraph(p.get('status', ''), styles['Normal']), # Status left-aligned
+                Paragraph(str(p.get('runs', 0)), right_align_style), # Runs right-aligned
+                Paragraph(str(p.get('ballsFaced', 0)), right_align_style) # Balls right-aligned
+            ])
+    
+    batting_table_1 = Table(batting_data, colWidths=[2.5*inch, 2.5*inch, 0.5*inch, 0.5*inch])
+    batting_table_1.setStyle(batting_table_style)
+    story.append(batting_table_1)
+    
+    story.append(Spacer(1, 0.05 * inch))
+    story.append(Paragraph(f"Extras: {first_innings_extras}", styles['Normal']))
+    first_overs = f"{(first_innings_balls or 0) // 6}.{(first_innings_balls or 0) % 6}"
+    story.append(Paragraph(f"<b>Total: {first_innings_runs}/{first_innings_wickets} ({first_overs} Overs)</b>", styles['h4'])) # Make bold
+
+    # Bowling Table 1
+    story.append(Spacer(1, 0.1 * inch))
+    story.append(Paragraph(f"<b>{second_batting_team_name} Bowling</b>", styles['h4'])) # Make bold
+    story.append(Spacer(1, 0.05 * inch))
+    
+    bowling_header = [Paragraph('Bowler', header_style), Paragraph('O', header_style), Paragraph('R', header_style), Paragraph('W', header_style)]
+    bowling_data = [bowling_header]
+    for p in (first_bowling_stats or []):
+        if p.get('ballsBowled', 0) > 0:
+            overs = f"{(p.get('ballsBowled', 0) // 6)}.{(p.get('ballsBowled', 0) % 6)}"
+            bowling_data.append([
+                Paragraph(p.get('name', ''), styles['Normal']),
+                Paragraph(overs, right_align_style),
+                Paragraph(str(p.get('runsConceded', 0)), right_align_style),
+                Paragraph(str(p.get('wicketsTaken', 0)), right_align_style)
+            ])
+            
+    bowling_table_1 = Table(bowling_data, colWidths=[3.5*inch, 0.7*inch, 0.7*inch, 0.7*inch])
+    bowling_table_1.setStyle(bowling_table_style)
+    story.append(bowling_table_1)
+
+
+    # --- Innings 2 ---
+    story.append(Spacer(1, 0.2 * inch))
+    story.append(Paragraph(f"<b>Innings 2: {second_batting_team_name} Batting</b>", styles['h4'])) # Make bold
+    story.append(Spacer(1, 0.05 * inch))
+
+    # Batting Table 2 (Apply same style)
+    batting_data_2 = [batting_header] # Reuse header
+    for p in (second_batting_stats or []):
+        if p.get('ballsFaced', 0) > 0 or p.get('status') not in ['Yet to bat']:
+             batting_data_2.append([
+                Paragraph(p.get('name', ''), styles['Normal']),
+                Paragraph(p.get('status', ''), styles['Normal']),
+                Paragraph(str(p.get('runs', 0)), right_align_style),
+                Paragraph(str(p.get('ballsFaced', 0)), right_align_style)
+             ])
+             
+    batting_table_2 = Table(batting_data_2, colWidths=[2.5*inch, 2.5*inch, 0.5*inch, 0.5*inch])
+    batting_table_2.setStyle(batting_table_style) # Apply the style
+    story.append(batting_table_2)
+    
+    story.append(Spacer(1, 0.05 * inch))
+    story.append(Paragraph(f"Extras: {second_innings_extras}", styles['Normal']))
+    second_overs = f"{(second_innings_balls or 0) // 6}.{(second_innings_balls or 0) % 6}"
+    story.append(Paragraph(f"<b>Total: {second_innings_runs}/{second_innings_wickets} ({second_overs} Overs)</b>", styles['h4'])) # Make bold
+    
+    # Bowling Table 2 (Apply same style)
+    story.append(Spacer(1, 0.1 * inch))
+    story.append(Paragraph(f"<b>{first_batting_team_name} Bowling</b>", styles['h4'])) # Make bold
+    story.append(Spacer(1, 0.05 * inch))
+    
+    bowling_data_2 = [bowling_header] # Reuse header
+    for p in (second_bowling_stats or []):
+        if p.get('ballsBowled', 0) > 0:
+            overs = f"{(p.get('ballsBowled', 0) // 6)}.{(p.get('ballsBowled', 0) % 6)}"
+            bowling_data_2.append([
+                Paragraph(p.get('name', ''), styles['Normal']),
+                Paragraph(overs, right_align_style),
+                Paragraph(str(p.get('runsConceded', 0)), right_align_style),
+                Paragraph(str(p.get('wicketsTaken', 0)), right_align_style)
+            ])
+            
+    bowling_table_2 = Table(bowling_data_2, colWidths=[3.5*inch, 0.7*inch, 0.7*inch, 0.7*inch])
+    bowling_table_2.setStyle(bowling_table_style) # Apply the style
+    story.append(bowling_table_2)
+
+
+    # --- Timelines ---
+    story.append(Spacer(1, 0.2 * inch))
+    story.append(Paragraph("<b>Innings 1 Timeline</b>", styles['h4']))
+    story.append(Paragraph(", ".join(first_innings_timeline or []), styles['Normal']))
+    story.append(Spacer(1, 0.1 * inch))
+    story.append(Paragraph("<b>Innings 2 Timeline</b>", styles['h4']))
+    story.append(Paragraph(", ".join(second_innings_timeline or []), styles['Normal']))
+
+    doc.build(story)
+    buffer.seek(0)
+    return buffer
+
+
+def render_scorecard_pdf(data):
+    """ Process-pool entry point: renders the scorecard and returns the PDF bytes. """
+    return create_scorecard_pdf(data).getvalue()
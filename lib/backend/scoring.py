@@ -0,0 +1,180 @@
+""" Ball-by-ball scoring rules shared by the incremental write API.
+
+The rules mirror the admin scoring screen (admin_update_score_screen.dart,
+_handleBallCompletion / _recordExtra / _recordWicket) so scorecards built
+ball by ball on the server look exactly like the ones the app builds itself.
+"""
+
+EXTRA_TYPES = ("wide", "no_ball", "bye", "leg_bye")
+MAX_WICKETS = 10
+
+
+def _as_int(value, field, allow_none=False):
+    if value is None and allow_none:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f"'{field}' must be an integer")
+    return value
+
+
+def parse_ball(data):
+    """ Validates a record_ball request body and returns a normalised ball dict. """
+    if not isinstance(data, dict):
+        raise ValueError("Ball must be a JSON object")
+    runs = _as_int(data.get("runs", 0), "runs")
+    extra_runs = _as_int(data.get("extra_runs", 0), "extra_runs")
+    extra_type = data.get("extra_type")
+    if extra_type is not None and extra_type not in EXTRA_TYPES:
+        raise ValueError(f"'extra_type' must be one of {', '.join(EXTRA_TYPES)}")
+    if runs < 0 or runs > 7 or extra_runs < 0 or extra_runs > 7:
+        raise ValueError("Runs on a single ball must be between 0 and 7")
+    if extra_type in ("wide", "bye", "leg_bye") and runs:
+        raise ValueError(f"Runs off the bat are not allowed on a {extra_type.replace('_', ' ')}")
+    if extra_type in ("bye", "leg_bye") and extra_runs == 0:
+        raise ValueError("Byes and leg byes need at least one run")
+
+    wicket = data.get("wicket") or None
+    if wicket is True:
+        wicket = {}
+    if wicket is not None and not isinstance(wicket, dict):
+        raise ValueError("'wicket' must be true or an object")
+    if wicket is not None:
+        wicket = {
+            "player_out_id": _as_int(wicket.get("player_out_id"), "wicket.player_out_id", allow_none=True),
+            "kind": str(wicket.get("kind") or "Wicket"),
+            "bowler_credited": bool(wicket.get("bowler_credited", True)),
+        }
+
+    return {
+        "runs": runs,
+        "extra_type": extra_type,
+        "extra_runs": extra_runs,
+        "wicket": wicket,
+        "batter_id": _as_int(data.get("batter_id"), "batter_id", allow_none=True),
+        "bowler_id": _as_int(data.get("bowler_id"), "bowler_id", allow_none=True),
+        "next_batter_id": _as_int(data.get("next_batter_id"), "next_batter_id", allow_none=True),
+    }
+
+
+def timeline_label(ball):
+    """ Same outcome strings the admin screen appends to team*_timeline. """
+    extra_type = ball["extra_type"]
+    if ball["wicket"] is not None:
+        return "W"
+    if extra_type == "wide":
+        total = 1 + ball["extra_runs"]
+        return f"{total}Wd" if total > 1 else "Wd"
+    if extra_type == "no_ball":
+        total = 1 + ball["extra_runs"] + ball["runs"]
+        return f"{total}Nb" if total > 1 else "Nb"
+    if extra_type == "leg_bye":
+        return f"{ball['extra_runs']}Lb"
+    if extra_type == "bye":
+        return f"{ball['extra_runs']}B"
+    return str(ball["runs"])
+
+
+def compute_ball_delta(ball):
+    """ Turns one delivery into counter increments for team, batter and bowler. """
+    extra_type = ball["extra_type"]
+    legal = extra_type not in ("wide", "no_ball")
+    base_extra = 1 if extra_type in ("wide", "no_ball") else 0
+    extras = base_extra + ball["extra_runs"]
+    bat_runs = ball["runs"]
+    wicket = ball["wicket"]
+
+    # Runs physically run between the wickets decide whether the batters cross
+    runs_run = ball["extra_runs"] if extra_type is not None else bat_runs
+
+    return {
+        "legal": legal,
+        "team_runs": bat_runs + extras,
+        "team_balls": 1 if legal else 0,
+        "team_wickets": 1 if wicket is not None else 0,
+        "team_extras": extras,
+        # The admin screen only credits the striker for runs off the bat on non-extra balls
+        "batter_runs": bat_runs if extra_type is None else 0,
+        "batter_balls": 1 if legal else 0,
+        "bowler_runs": bat_runs + extras,
+        "bowler_balls": 1 if legal else 0,
+        "bowler_wickets": 1 if wicket is not None and wicket["bowler_credited"] else 0,
+        "dismissal": wicket["kind"] if wicket is not None else None,
+        "label": timeline_label(ball),
+        "swap_strike": runs_run % 2 == 1,
+    }
+
+
+def next_batters(striker_id, non_striker_id, ball, delta, balls_after):
+    """ Striker/non-striker after the ball: crossing on odd runs, change of ends at
+        the end of the over and the incoming batter taking the dismissed one's end.
+        Odd runs off the last ball of an over cross and then change ends, so the
+        striker keeps strike for the next over. """
+    out_id = out_player_id(ball, striker_id)
+    if out_id is not None:
+        if out_id == striker_id:
+            striker_id = ball["next_batter_id"]
+        elif out_id == non_striker_id:
+            non_striker_id = ball["next_batter_id"]
+    if delta["swap_strike"]:
+        striker_id, non_striker_id = non_striker_id, striker_id
+    if delta["legal"] and balls_after % 6 == 0:
+        striker_id, non_striker_id = non_striker_id, striker_id
+    return striker_id, non_striker_id
+
+
+def new_player_stats(player_id):
+    return {"id": player_id, "name": f"P{player_id}", "runs": 0, "ballsFaced": 0, "status": "Yet to bat",
+            "ballsBowled": 0, "runsConceded": 0, "wicketsTaken": 0}
+
+
+def apply_batter(player, delta, dismissed):
+    player = dict(player)
+    player["runs"] = (player.get("runs") or 0) + delta["batter_runs"]
+    player["ballsFaced"] = (player.get("ballsFaced") or 0) + delta["batter_balls"]
+    if dismissed:
+        player["status"] = delta["dismissal"]
+    elif player.get("status") in (None, "", "Yet to bat"):
+        player["status"] = "Not Out"
+    return player
+
+
+def apply_bowler(player, delta):
+    player = dict(player)
+    player["runsConceded"] = (player.get("runsConceded") or 0) + delta["bowler_runs"]
+    player["ballsBowled"] = (player.get("ballsBowled") or 0) + delta["bowler_balls"]
+    player["wicketsTaken"] = (player.get("wicketsTaken") or 0) + delta["bowler_wickets"]
+    return player
+
+
+def dismiss(player, delta):
+    player = dict(player)
+    player["status"] = delta["dismissal"]
+    return player
+
+
+def bring_in(player):
+    player = dict(player)
+    if player.get("status") in (None, "", "Yet to bat"):
+        player["status"] = "Not Out"
+    return player
+
+
+def out_player_id(ball, striker_id):
+    """ Who was dismissed on this ball (defaults to the striker), or None. """
+    if ball["wicket"] is None:
+        return None
+    return ball["wicket"]["player_out_id"] if ball["wicket"]["player_out_id"] is not None else striker_id
+
+
+def player_changes(ball, delta, striker_id, bowler_id):
+    """ [(kind, player_id, update_fn)] for every player element one ball touches,
+        where kind is 'bat' (batting side's list) or 'bowl' (bowling side's list). """
+    out_id = out_player_id(ball, striker_id)
+    changes = [('bat', striker_id, lambda p: apply_batter(p, delta, out_id == striker_id))]
+    if out_id is not None and out_id != striker_id:
+        changes.append(('bat', out_id, lambda p: dismiss(p, delta)))
+    next_id = ball["next_batter_id"]
+    if out_id is not None and next_id is not None and next_id not in (striker_id, out_id):
+        changes.append(('bat', next_id, bring_in))
+    changes.append(('bowl', bowler_id, lambda p: apply_bowler(p, delta)))
+    return changes
@@ -0,0 +1,200 @@
+""" Slow query log fed by db_pool's query observers.
+
+Statements slower than the threshold are logged with their normalised text
+(literals replaced by ?, whitespace collapsed), the shape of their parameters
+(types and list lengths, never the values) and duration, kept in a ring buffer
+and aggregated per normalised statement.
+
+A sample of slow SELECTs is re-run as EXPLAIN (ANALYZE, BUFFERS) on a
+separate pooled connection by a background thread, inside a READ ONLY
+transaction that is always rolled back, so plans (seq scans, JSONB detoast
+buffers) are captured without slowing down or touching the request's own
+transaction. Slow INSERT/UPDATE/DELETEs get a plain EXPLAIN (plan and
+estimates only, nothing is executed) in the same kind of transaction.
+"""
+import queue
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$%])-?\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+_COMMENT = re.compile(r"--[^\n]*")
+_WRITE_COMMANDS = ("INSERT", "UPDATE", "DELETE")
+# Never re-executed for EXPLAIN ANALYZE: row locks, advisory locks, sequences, notifications
+_UNSAFE_TO_EXPLAIN = re.compile(r"\bFOR\s+(?:UPDATE|SHARE|NO\s+KEY\s+UPDATE|KEY\s+SHARE)\b|pg_advisory|nextval|setval|pg_notify", re.IGNORECASE)
+
+
+def normalize_sql(query):
+    if isinstance(query, bytes):
+        query = query.decode("utf-8", "replace")
+    query = _COMMENT.sub(" ", str(query))
+    query = _STRING_LITERAL.sub("?", query)
+    query = _NUMBER_LITERAL.sub("?", query)
+    return _WHITESPACE.sub(" ", query).strip()
+
+
+def params_shape(vars):
+    """ Types (and list/dict sizes) of the bound parameters - no values. """
+    def shape(value):
+        if isinstance(value, (list, tuple)): return f"{type(value).__name__}[{len(value)}]"
+        if isinstance(value, dict): return f"dict[{len(value)}]"
+        return type(value).__name__
+    if vars is None: return None
+    if isinstance(vars, dict):
+        return {key: shape(value) for key, value in vars.items()}
+    return [shape(value) for value in vars]
+
+
+def _explain_prefix(normalized):
+    """ The EXPLAIN to run for a statement, or None if it isn't explained. """
+    command = normalized.split(" ", 1)[0].upper()
+    if command == "SELECT" and not _UNSAFE_TO_EXPLAIN.search(normalized):
+        return "EXPLAIN (ANALYZE, BUFFERS) "
+    if command in _WRITE_COMMANDS:
+        return "EXPLAIN " # Not executed, so allowed in the READ ONLY transaction
+    return None
+
+
+class SlowQueryLog:
+
+    def __init__(self, connect, threshold_secs, explain_sample_rate=0.1, explain_min_interval_secs=300.0,
+                 explain_timeout_ms=5000, max_entries=200, context=None):
+        self.connect = connect # Returns a pooled connection (or None) for EXPLAIN runs
+        self.threshold_secs = threshold_secs
+        self.explain_sample_rate = explain_sample_rate
+        self.explain_min_interval_secs = explain_min_interval_secs
+        self.explain_timeout_ms = explain_timeout_ms
+        self.context = context # Optional callable naming what issued the query (e.g. the route)
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=max_entries)
+        self._statements = {} # normalised text -> aggregate dict
+        self._explain_queue = queue.Queue(maxsize=8) # Full -> sample dropped
+        self._explain_thread = None
+        self._explained = 0
+        self._explain_errors = 0
+
+    def observe(self, phase, seconds, query, vars):
+        """ db_pool query observer. """
+        if phase != "execute" or seconds < self.threshold_secs or query is None: return
+        normalized = normalize_sql(query)
+        if normalized.split(" ", 1)[0].upper() in ("EXPLAIN", "SET"): return # Includes our own EXPLAIN runs
+        now = time.time()
+        entry = {
+            "statement": normalized,
+            "params_shape": params_shape(vars),
+            "duration_ms": round(seconds * 1000, 3),
+            "context": self.context() if self.context else None,
+            "at": datetime.fromtimestamp(now, timezone.utc).isoformat(),
+        }
+        print(f"Slow query ({entry['duration_ms']:.1f} ms, {entry['context']}): {normalized} params={entry['params_shape']}")
+        with self._lock:
+            self._recent.append(entry)
+            agg = self._statements.get(normalized)
+            if agg is None:
+                agg = self._statements[normalized] = {
+                    "statement": normalized, "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                    "last_params_shape": None, "last_seen": None,
+                    "explain": None, "explained_at": None, "_last_explain_attempt": 0.0,
+                }
+            agg["count"] += 1
+            agg["total_ms"] += entry["duration_ms"]
+            agg["max_ms"] = max(agg["max_ms"], entry["duration_ms"])
+            agg["last_params_shape"] = entry["params_shape"]
+            agg["last_seen"] = entry["at"]
+            explain_prefix = _explain_prefix(normalized)
+            want_explain = (explain_prefix is not None
+                            and now - agg["_last_explain_attempt"] >= self.explain_min_interval_secs
+                            and random.random() < self.explain_sample_rate)
+            if want_explain: agg["_last_explain_attempt"] = now
+        if want_explain: self._queue_explain(normalized, explain_prefix, query, vars)
+
+    # --- EXPLAIN capture ---
+
+    def _queue_explain(self, normalized, explain_prefix, query, vars):
+        try:
+            self._explain_queue.put_nowait((normalized, explain_prefix, query, vars))
+        except queue.Full:
+            return
+        with self._lock:
+            if self._explain_thread is None:
+                self._explain_thread = threading.Thread(target=self._explain_worker, name="slow-query-explain", daemon=True)
+                self._explain_thread.start()
+
+    def _explain_worker(self):
+        while True:
+            try:
+                normalized, explain_prefix, query, vars = self._explain_queue.get(timeout=30)
+            except queue.Empty:
+                with self._lock:
+                    if self._explain_queue.empty():
+                        self._explain_thread = None # Idle; restarted on the next sample
+                        return
+                continue
+            plan = self._explain(explain_prefix, query, vars)
+            with self._lock:
+                agg = self._statements.get(normalized)
+                if plan is None:
+                    self._explain_errors += 1
+                elif agg is not None:
+                    agg["explain"] = plan
+                    agg["explained_at"] = datetime.now(timezone.utc).isoformat()
+                    self._explained += 1
+
+    def _explain(self, explain_prefix, query, vars):
+        conn = None; cur = None
+        try:
+            conn = self.connect()
+            if conn is None: return None
+            cur = conn.cursor()
+            cur.execute("SET TRANSACTION READ ONLY")
+            cur.execute("SET LOCAL statement_timeout = %s", (int(self.explain_timeout_ms),))
+            if isinstance(query, bytes): query = query.decode("utf-8")
+            cur.execute(explain_prefix + query, vars)
+            return "\n".join(row[0] for row in cur.fetchall())
+        except Exception as e:
+            print(f"Could not EXPLAIN slow query: {e}")
+            return None
+        finally:
+            try:
+                if conn and not conn.closed: conn.rollback()
+            except Exception:
+                pass
+            if cur and not cur.closed: cur.close()
+            if conn and not conn.closed: conn.close()
+
+    # --- Reporting ---
+
+    def recent(self):
+        """ Slow statements, newest first. """
+        with self._lock:
+            return list(reversed(self._recent))
+
+    def statements(self, limit=50):
+        """ Aggregates per normalised statement, by total time spent. """
+        with self._lock:
+            rows = [{k: v for k, v in agg.items() if not k.startswith("_")} for agg in self._statements.values()]
+        for row in rows:
+            row["total_ms"] = round(row["total_ms"], 3)
+            row["avg_ms"] = round(row["total_ms"] / row["count"], 3)
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows[:limit]
+
+    def clear(self):
+        with self._lock:
+            self._recent.clear()
+            self._statements.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "threshold_ms": self.threshold_secs * 1000,
+                "slow_queries": sum(agg["count"] for agg in self._statements.values()),
+                "distinct_statements": len(self._statements),
+                "explained": self._explained,
+                "explain_errors": self._explain_errors,
+            }
@@ -0,0 +1,77 @@
+import ball_events
+import scoring
+
+
+def initial_state():
+    state = {col: 0 for col in ball_events.STATE_COLUMNS}
+    state.update({
+        "team1_timeline": [], "team2_timeline": [],
+        "team1_batting_stats": [dict(scoring.new_player_stats(pid), name=f"Bat {pid}") for pid in (1, 2, 3)],
+        "team2_bowling_stats": [dict(scoring.new_player_stats(pid), name=f"Bowl {pid}") for pid in (10, 11)],
+        "team2_batting_stats": [], "team1_bowling_stats": [],
+        "striker_id": 1, "non_striker_id": 2, "bowler_id": 10,
+    })
+    return state
+
+
+def record(state, fields, bowler_id=10):
+    """ Builds the event for one ball from the current state, like record_ball does. """
+    b = scoring.parse_ball(fields)
+    _, _, _, payload = ball_events.build_event(b, 1, True, state["striker_id"], state["non_striker_id"],
+                                               bowler_id, state["team1_balls"])
+    return ball_events.apply_event(state, payload), payload
+
+
+def player(players, player_id):
+    return next(p for p in players if p["id"] == player_id)
+
+
+def test_build_event_numbers_overs_and_balls():
+    b = scoring.parse_ball({"runs": 1})
+    assert ball_events.build_event(b, 2, False, 1, 2, 10, 0)[:3] == (2, 1, 1)
+    assert ball_events.build_event(b, 1, True, 1, 2, 10, 5)[:3] == (1, 1, 6)
+    assert ball_events.build_event(b, 1, True, 1, 2, 10, 6)[:3] == (1, 2, 1)
+
+
+def test_apply_event_updates_counters_players_and_timeline():
+    state, _ = record(initial_state(), {"runs": 4})
+    state, _ = record(state, {"extra_type": "wide", "extra_runs": 1})
+    state, _ = record(state, {"wicket": {"kind": "Caught"}, "next_batter_id": 3})
+    assert (state["team1_runs"], state["team1_balls"], state["team1_wickets"], state["team1_extras"]) == (6, 2, 1, 2)
+    assert state["team1_timeline"] == ["4", "2Wd", "W"]
+    # The wide's extra run crossed the batters, so batter 2 faced the wicket ball
+    batting = state["team1_batting_stats"]
+    assert (player(batting, 1)["runs"], player(batting, 1)["status"]) == (4, "Not Out")
+    assert (player(batting, 2)["ballsFaced"], player(batting, 2)["status"]) == (1, "Caught")
+    assert player(batting, 3)["status"] == "Not Out"
+    bowler = player(state["team2_bowling_stats"], 10)
+    assert (bowler["runsConceded"], bowler["ballsBowled"], bowler["wicketsTaken"]) == (6, 2, 1)
+    assert (state["striker_id"], state["non_striker_id"]) == (3, 1)
+
+
+def test_apply_event_adds_unlisted_players():
+    state, _ = record(initial_state(), {"runs": 1}, bowler_id=12)
+    assert player(state["team2_bowling_stats"], 12)["runsConceded"] == 1
+
+
+def test_materialize_replays_events_without_touching_the_snapshot():
+    snapshot = initial_state()
+    live, payloads = initial_state(), []
+    for fields in ({"runs": 1}, {"runs": 0}, {"extra_type": "leg_bye", "extra_runs": 2}, {"runs": 6},
+                   {"extra_type": "no_ball", "runs": 1}, {"runs": 3}, {"runs": 1}):
+        live, payload = record(live, fields)
+        payloads.append(payload)
+
+    assert ball_events.materialize(snapshot, payloads) == live
+    assert snapshot == initial_state()
+    # Resuming from a mid-way snapshot gives the same result as replaying from the start
+    midway = ball_events.materialize(snapshot, payloads[:4])
+    assert ball_events.materialize(midway, payloads[4:]) == live
+
+
+def test_materialize_end_of_over_keeps_strike_after_odd_runs():
+    state, payloads = initial_state(), []
+    for fields in ({"runs": 0},) * 5 + ({"runs": 1},):
+        state, payload = record(state, fields)
+        payloads.append(payload)
+    assert ball_events.materialize(initial_state(), payloads)["striker_id"] == 1
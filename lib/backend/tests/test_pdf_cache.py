@@ -0,0 +1,22 @@
+import os
+
+import pdf_cache
+
+
+def test_write_disk_removes_temp_file_when_rename_fails(tmp_path, monkeypatch):
+    cache = pdf_cache.ScorecardPdfCache(1024, str(tmp_path))
+
+    def failing_replace(src, dst):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(pdf_cache.os, "replace", failing_replace)
+    cache.put(7, "v1", b"%PDF-1.4", finished=True)
+    assert os.listdir(tmp_path) == []
+    assert cache.stats()["disk_writes"] == 0
+
+
+def test_write_disk_keeps_only_the_latest_version(tmp_path):
+    cache = pdf_cache.ScorecardPdfCache(1024, str(tmp_path))
+    cache.put(7, "v1", b"%PDF-1.4 one", finished=True)
+    cache.put(7, "v2", b"%PDF-1.4 two", finished=True)
+    assert os.listdir(tmp_path) == ["scorecard_7_v2.pdf"]
@@ -0,0 +1,105 @@
+import pytest
+
+import scoring
+
+
+def ball(**fields):
+    return scoring.parse_ball(fields)
+
+
+# --- parse_ball ---
+
+def test_parse_ball_defaults():
+    assert ball() == {"runs": 0, "extra_type": None, "extra_runs": 0, "wicket": None,
+                      "batter_id": None, "bowler_id": None, "next_batter_id": None}
+
+
+def test_parse_ball_wicket_true_becomes_default_wicket():
+    assert ball(wicket=True)["wicket"] == {"player_out_id": None, "kind": "Wicket", "bowler_credited": True}
+
+
+@pytest.mark.parametrize("fields", [
+    {"runs": -1}, {"runs": 8}, {"runs": "1"}, {"runs": True},
+    {"extra_type": "penalty"},
+    {"extra_type": "wide", "runs": 1},
+    {"extra_type": "bye", "extra_runs": 0},
+    {"wicket": "bowled"},
+])
+def test_parse_ball_rejects_invalid(fields):
+    with pytest.raises(ValueError):
+        scoring.parse_ball(fields)
+
+
+# --- compute_ball_delta ---
+
+@pytest.mark.parametrize("fields, expected", [
+    ({"runs": 4}, {"legal": True, "team_runs": 4, "team_balls": 1, "team_extras": 0,
+                   "batter_runs": 4, "batter_balls": 1, "bowler_runs": 4, "label": "4", "swap_strike": False}),
+    ({"runs": 3}, {"legal": True, "team_runs": 3, "batter_runs": 3, "label": "3", "swap_strike": True}),
+    ({"extra_type": "wide"}, {"legal": False, "team_runs": 1, "team_balls": 0, "team_extras": 1,
+                              "batter_runs": 0, "batter_balls": 0, "bowler_balls": 0, "label": "Wd", "swap_strike": False}),
+    ({"extra_type": "wide", "extra_runs": 1}, {"team_runs": 2, "team_extras": 2, "label": "2Wd", "swap_strike": True}),
+    ({"extra_type": "no_ball", "runs": 4}, {"legal": False, "team_runs": 5, "team_extras": 1, "batter_runs": 0,
+                                            "bowler_runs": 5, "label": "5Nb", "swap_strike": False}),
+    ({"extra_type": "leg_bye", "extra_runs": 1}, {"legal": True, "team_runs": 1, "team_balls": 1, "team_extras": 1,
+                                                  "batter_runs": 0, "batter_balls": 1, "label": "1Lb", "swap_strike": True}),
+    ({"extra_type": "bye", "extra_runs": 2}, {"legal": True, "team_runs": 2, "label": "2B", "swap_strike": False}),
+])
+def test_compute_ball_delta(fields, expected):
+    delta = scoring.compute_ball_delta(ball(**fields))
+    assert {key: delta[key] for key in expected} == expected
+
+
+def test_compute_ball_delta_wicket_credit():
+    delta = scoring.compute_ball_delta(ball(wicket={"kind": "Caught"}))
+    assert (delta["team_wickets"], delta["bowler_wickets"], delta["dismissal"], delta["label"]) == (1, 1, "Caught", "W")
+    run_out = scoring.compute_ball_delta(ball(wicket={"kind": "Run Out", "bowler_credited": False}))
+    assert (run_out["team_wickets"], run_out["bowler_wickets"]) == (1, 0)
+
+
+# --- next_batters ---
+
+def batters_after(balls_before, **fields):
+    b = ball(**fields)
+    delta = scoring.compute_ball_delta(b)
+    return scoring.next_batters(1, 2, b, delta, balls_before + delta["team_balls"])
+
+
+@pytest.mark.parametrize("balls_before, fields, expected", [
+    (0, {"runs": 0}, (1, 2)),
+    (0, {"runs": 1}, (2, 1)),
+    (0, {"runs": 2}, (1, 2)),
+    (0, {"extra_type": "leg_bye", "extra_runs": 1}, (2, 1)),
+    (0, {"extra_type": "wide", "extra_runs": 1}, (2, 1)),
+    (0, {"extra_type": "no_ball", "runs": 1}, (1, 2)), # Only runs taken as extras count for crossing
+    # Last ball of the over: ends change after any crossing
+    (5, {"runs": 0}, (2, 1)),
+    (5, {"runs": 1}, (1, 2)),
+    (5, {"runs": 2}, (2, 1)),
+    (5, {"extra_type": "leg_bye", "extra_runs": 3}, (1, 2)),
+    # A wide on what would be the last ball doesn't complete the over
+    (5, {"extra_type": "wide"}, (1, 2)),
+])
+def test_next_batters_strike_rotation(balls_before, fields, expected):
+    assert batters_after(balls_before, **fields) == expected
+
+
+def test_next_batters_incoming_batter_takes_dismissed_end():
+    assert batters_after(0, wicket={"kind": "Bowled"}, next_batter_id=3) == (3, 2)
+    run_out_non_striker = {"kind": "Run Out", "player_out_id": 2, "bowler_credited": False}
+    assert batters_after(0, runs=1, wicket=run_out_non_striker, next_batter_id=3) == (3, 1)
+    assert batters_after(5, wicket={"kind": "Bowled"}, next_batter_id=3) == (2, 3)
+
+
+# --- player updates ---
+
+def test_player_changes_touch_striker_dismissed_incoming_and_bowler():
+    b = ball(runs=1, wicket={"kind": "Run Out", "player_out_id": 2, "bowler_credited": False}, next_batter_id=3)
+    delta = scoring.compute_ball_delta(b)
+    changes = scoring.player_changes(b, delta, 1, 10)
+    assert [(kind, player_id) for kind, player_id, _ in changes] == [('bat', 1), ('bat', 2), ('bat', 3), ('bowl', 10)]
+    striker, dismissed, incoming, bowler = (update(scoring.new_player_stats(pid)) for _, pid, update in changes)
+    assert (striker["runs"], striker["ballsFaced"], striker["status"]) == (1, 1, "Not Out")
+    assert dismissed["status"] == "Run Out"
+    assert incoming["status"] == "Not Out"
+    assert (bowler["runsConceded"], bowler["ballsBowled"], bowler["wicketsTaken"]) == (1, 1, 0)
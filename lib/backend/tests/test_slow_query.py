@@ -0,0 +1,52 @@
+import slow_query
+
+
+class FakeCursor:
+    closed = False
+
+    def __init__(self, executed):
+        self.executed = executed
+
+    def execute(self, query, vars=None):
+        self.executed.append(query)
+
+    def fetchall(self):
+        return [("Seq Scan on cricket_scorecard",)]
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    closed = False
+
+    def __init__(self):
+        self.executed = []
+        self.rolled_back = False
+
+    def cursor(self):
+        return FakeCursor(self.executed)
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        self.closed = True
+
+
+def test_explain_prefix_analyzes_selects_and_only_plans_writes():
+    assert slow_query._explain_prefix("SELECT * FROM t WHERE id = ?") == "EXPLAIN (ANALYZE, BUFFERS) "
+    assert slow_query._explain_prefix("SELECT * FROM t WHERE id = ? FOR UPDATE") is None
+    assert slow_query._explain_prefix("UPDATE t SET a = ? WHERE id = ?") == "EXPLAIN "
+    assert slow_query._explain_prefix("INSERT INTO t (a) VALUES (?)") == "EXPLAIN "
+    assert slow_query._explain_prefix("NOTIFY live_score") is None
+
+
+def test_write_is_explained_without_analyze_in_a_rolled_back_read_only_transaction():
+    conn = FakeConnection()
+    log = slow_query.SlowQueryLog(lambda: conn, 0.1)
+    plan = log._explain(slow_query._explain_prefix("UPDATE t SET a = ?"), "UPDATE t SET a = %s", (1,))
+    assert plan == "Seq Scan on cricket_scorecard"
+    assert conn.executed[0] == "SET TRANSACTION READ ONLY"
+    assert conn.executed[-1] == "EXPLAIN UPDATE t SET a = %s"
+    assert conn.rolled_back
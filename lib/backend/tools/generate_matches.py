@@ -0,0 +1,329 @@
+""" Deterministic generator of realistic cricket matches for scale testing.
+
+Simulates whole limited-overs matches ball by ball with the server's own
+scoring rules (scoring.parse_ball + ball_events.apply_event, the same path as
+record_ball), so the *_batting_stats / *_bowling_stats JSONB, timelines,
+extras, striker/bowler ids and result texts look exactly like matches scored
+in the app. A mix of finished, live and upcoming matches is produced, and the
+rows are bulk-loaded into cricket_match and cricket_match_livescore with COPY
+in batches (one transaction each), with score projections precomputed.
+
+Output depends only on --seed, --anchor and the size options: match N is
+simulated from its own seeded RNG, so batches can be simulated in parallel
+(--workers) and a larger --count extends a smaller run rather than changing it.
+
+    python tools/generate_matches.py --count 10000
+    python tools/generate_matches.py --count 100000 --workers 8 --anchor 2025-06-01
+    python tools/generate_matches.py --count 50 --dry-run   # simulate only, print a summary
+
+Connection settings come from --dsn plus the usual libpq environment variables
+(PGPASSWORD, ...). The schema is migrated first, like app startup; the
+cricket_match table itself must already exist. Row triggers fire as for any
+insert, so a running backend sees the new rows through its change feed.
+"""
+import argparse
+import copy
+import csv
+import io
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ball_events
+import migrations
+import scoring
+from scoreboard import build_live_score_payload, select_fields, SUMMARY_FIELDS, LIVE_SCORE_COLUMNS
+
+DEFAULT_DSN = "dbname=vpsports user=postgres host=localhost port=5432" # Same database as app.py
+LIVESCORE_CHANGE_CHANNEL = "cricket_livescore_changed" # Must match app.LIVESCORE_CHANGE_CHANNEL
+
+TEAMS = [
+    "Mumbai Mavericks", "Delhi Dynamos", "Chennai Chargers", "Kolkata Knights", "Punjab Panthers",
+    "Rajasthan Royals XI", "Hyderabad Hawks", "Bangalore Blasters", "Lucknow Lions", "Gujarat Giants",
+    "Pune Pythons", "Goa Gladiators", "Nagpur Ninjas", "Indore Invincibles", "Kochi Comets", "Jaipur Jaguars",
+]
+FIRST_NAMES = ["Arjun", "Rohit", "Virat", "Shubman", "Ishan", "Rahul", "Hardik", "Ravi", "Jasprit", "Kuldeep",
+               "Yuzvendra", "Axar", "Sanju", "Rishabh", "Shreyas", "Mohammed", "Umesh", "Deepak", "Suryakumar", "Ajinkya"]
+LAST_NAMES = ["Sharma", "Kohli", "Gill", "Kishan", "Dravid", "Pandya", "Jadeja", "Bumrah", "Yadav", "Chahal",
+              "Patel", "Samson", "Pant", "Iyer", "Siraj", "Chahar", "Rahane", "Ashwin", "Thakur", "Saini"]
+VENUES = ["Wankhede Stadium", "Eden Gardens", "M. Chinnaswamy Stadium", "Arun Jaitley Stadium", "Narendra Modi Stadium",
+          "MA Chidambaram Stadium", "Rajiv Gandhi Intl. Stadium", "Sawai Mansingh Stadium", "Ekana Stadium", "PCA Stadium"]
+UMPIRES = ["A. Nand Kishore", "N. Menon", "K. N. Ananthapadmanabhan", "J. Madanagopal", "V. Sharma", "U. Gandhe"]
+DISMISSALS = ["Bowled", "Caught", "Caught", "Caught", "LBW", "Run Out", "Stumped"]
+
+# (weight, record_ball body) per delivery; wickets get their kind / next batter filled in
+OUTCOMES = [
+    (33, {"runs": 0}), (30, {"runs": 1}), (8, {"runs": 2}), (1, {"runs": 3}), (11, {"runs": 4}), (5, {"runs": 6}),
+    (5, {"wicket": True}),
+    (3, {"extra_type": "wide", "extra_runs": 0}), (1, {"extra_type": "no_ball", "runs": 1}),
+    (2, {"extra_type": "leg_bye", "extra_runs": 1}), (1, {"extra_type": "bye", "extra_runs": 1}),
+]
+_OUTCOME_WEIGHTS = [w for w, _ in OUTCOMES]
+_OUTCOME_BODIES = [b for _, b in OUTCOMES]
+SECS_PER_BALL = 40 # Rough wall-clock pace, for start/last_updated times of finished matches
+
+CRICKET_MATCH_COLUMNS = ["match_id", "team_a_name", "team_b_name", "team_a_players", "team_b_players",
+                         "overs_per_innings", "start_time", "venue", "umpires", "match_status"]
+LIVESCORE_COLUMNS = [
+    "match_id", "toss_winner", "toss_decision", "current_status", "live_result", "break_status",
+    "team1_name", "team2_name", "team1_runs", "team1_wickets", "team1_balls",
+    "team2_runs", "team2_wickets", "team2_balls", "team1_extras", "team2_extras",
+    "summary_text", "striker_id", "non_striker_id", "bowler_id", "is_first_innings",
+    "target_score", "first_innings_balls",
+    "team1_batting_stats", "team2_bowling_stats", "team2_batting_stats", "team1_bowling_stats",
+    "team1_timeline", "team2_timeline", "last_updated", "score_projection", "score_summary",
+]
+_JSONB_COLUMNS = {"team1_batting_stats", "team2_bowling_stats", "team2_batting_stats", "team1_bowling_stats",
+                  "score_projection", "score_summary"}
+_ARRAY_COLUMNS = {"team_a_players", "team_b_players", "umpires", "team1_timeline", "team2_timeline"}
+
+
+def _squad(rng, first_id, players):
+    """ Player dicts as the admin screen sends them (ids 1000+i / 2000+i, like the app assigns). """
+    names = set()
+    while len(names) < players:
+        names.add(f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}")
+    order = sorted(names) # Set order varies between interpreter runs; the shuffle below must not
+    rng.shuffle(order)
+    return [dict(scoring.new_player_stats(first_id + i), name=name) for i, name in enumerate(order)]
+
+
+def _play_innings(rng, state, side, is_first, batters, bowlers, max_balls, target=None, stop_after=None):
+    """ Plays deliveries into `state` until the innings ends (or after `stop_after` deliveries).
+        Returns (innings over, deliveries played). """
+    striker, non_striker = batters[0]["id"], batters[1]["id"]
+    next_in = 2
+    bowling_ids = [p["id"] for p in bowlers[-5:]] # Five bowlers rotating overs: nobody bowls two in a row
+    for key, squad in ((f"team{side}_batting_stats", batters), (f"team{3 - side}_bowling_stats", bowlers)):
+        state[key] = [dict(p) for p in squad]
+    deliveries = 0
+    while True:
+        balls = state.get(f"team{side}_balls") or 0
+        wickets = state.get(f"team{side}_wickets") or 0
+        if balls >= max_balls or wickets >= len(batters) - 1: return True, deliveries
+        if target is not None and (state.get(f"team{side}_runs") or 0) >= target: return True, deliveries
+        if stop_after is not None and deliveries >= stop_after: return False, deliveries
+
+        body = dict(rng.choices(_OUTCOME_BODIES, weights=_OUTCOME_WEIGHTS)[0])
+        if body.get("wicket"):
+            kind = rng.choice(DISMISSALS)
+            body["wicket"] = {"kind": kind, "bowler_credited": kind != "Run Out"}
+            body["next_batter_id"] = batters[next_in]["id"] if next_in < len(batters) and wickets + 1 < len(batters) - 1 else None
+            next_in += 1
+        ball = scoring.parse_ball(body)
+        bowler_id = bowling_ids[(balls // 6) % len(bowling_ids)]
+        _, _, _, payload = ball_events.build_event(ball, side, is_first, striker, non_striker, bowler_id, balls)
+        ball_events.apply_event(state, payload)
+        striker, non_striker = state["striker_id"], state["non_striker_id"]
+        deliveries += 1
+
+
+def _live_stop_point(rng, state, innings_args):
+    """ Deliveries after which a live match's innings is left in progress. The innings is played
+        out on a copy first to count its deliveries, then the RNG is rewound so the real run
+        replays the same balls and is always cut off before the innings ends. """
+    fraction = rng.random()
+    saved = rng.getstate()
+    _, length = _play_innings(rng, copy.deepcopy(state), *innings_args)
+    rng.setstate(saved)
+    return int(fraction * length)
+
+
+def simulate_match(seed, index, anchor, overs, players, upcoming_share, live_share, days):
+    """ One match as (cricket_match row dict, livescore row dict). Deterministic per (seed, index, anchor). """
+    rng = random.Random(f"{seed}:{index}")
+    team_a, team_b = rng.sample(TEAMS, 2)
+    squad_a, squad_b = _squad(rng, 1000, players), _squad(rng, 2000, players)
+    max_balls = overs * 6
+    roll = rng.random()
+    status = "upcoming" if roll < upcoming_share else "live" if roll < upcoming_share + live_share else "finished"
+
+    if status == "upcoming":
+        start_time = anchor + timedelta(seconds=rng.randint(3600, days * 86400 // 4))
+    elif status == "live":
+        start_time = anchor - timedelta(seconds=rng.randint(0, max_balls * 2 * SECS_PER_BALL))
+    else:
+        start_time = anchor - timedelta(seconds=rng.randint(max_balls * 3 * SECS_PER_BALL, days * 86400))
+    match = {
+        "team_a_name": team_a, "team_b_name": team_b,
+        "team_a_players": [p["name"] for p in squad_a], "team_b_players": [p["name"] for p in squad_b],
+        "overs_per_innings": overs, "start_time": start_time, "venue": rng.choice(VENUES),
+        "umpires": rng.sample(UMPIRES, 2), "match_status": status,
+    }
+
+    state = {
+        "team1_name": team_a, "team2_name": team_b, "current_status": status, "live_result": None, "break_status": None,
+        "summary_text": "Match hasn't started yet.", "is_first_innings": True, "target_score": None, "first_innings_balls": None,
+        "toss_winner": None, "toss_decision": None, "striker_id": None, "non_striker_id": None, "bowler_id": None,
+        "team1_batting_stats": [], "team2_bowling_stats": [], "team2_batting_stats": [], "team1_bowling_stats": [],
+        "team1_timeline": [], "team2_timeline": [], "last_updated": start_time,
+    }
+    for side in (1, 2):
+        for key in ("runs", "wickets", "balls", "extras"): state[f"team{side}_{key}"] = 0
+    if status == "upcoming":
+        return match, state
+
+    state["toss_winner"] = rng.choice([team_a, team_b])
+    state["toss_decision"] = rng.choice(["Bat", "Bowl"])
+    first = 1 if (state["toss_winner"] == team_a) == (state["toss_decision"] == "Bat") else 2
+    second = 3 - first
+    squads = {1: squad_a, 2: squad_b}
+    names = {1: team_a, 2: team_b}
+    # Live matches stop somewhere in the first or second innings, never after it has ended
+    # (that would leave a 'live' cricket_match with a finished score)
+    first_args = (first, True, squads[first], squads[second], max_balls)
+    stop_first = _live_stop_point(rng, state, first_args) if status == "live" and rng.random() < 0.5 else None
+
+    if not _play_innings(rng, state, *first_args, stop_after=stop_first)[0]:
+        state["current_status"] = "Live"
+        state["summary_text"] = f"{names[first]} is batting."
+    else:
+        target = state[f"team{first}_runs"] + 1
+        state.update(is_first_innings=False, target_score=target, first_innings_balls=state[f"team{first}_balls"])
+        second_args = (second, False, squads[second], squads[first], max_balls, target)
+        stop_second = _live_stop_point(rng, state, second_args) if status == "live" else None
+        done, _ = _play_innings(rng, state, *second_args, stop_after=stop_second)
+        runs, balls = state[f"team{second}_runs"], state[f"team{second}_balls"]
+        if not done:
+            state["current_status"] = "Live"
+            state["summary_text"] = f"{names[second]} need {target - runs} runs from {max_balls - balls} balls."
+        else:
+            if runs >= target:
+                result = f"{names[second]} won by {players - 1 - state[f'team{second}_wickets']} wickets."
+            elif runs == target - 1:
+                result = "Match Tied."
+            else:
+                result = f"{names[first]} won by {target - 1 - runs} runs."
+            state.update(current_status="Finished", live_result=result, summary_text=result)
+            total_balls = state[f"team{first}_balls"] + balls
+            state["last_updated"] = start_time + timedelta(seconds=total_balls * SECS_PER_BALL)
+    if status == "live":
+        state["last_updated"] = anchor
+    return match, state
+
+
+def simulate_batch(task):
+    seed, first_index, count, anchor, options = task
+    rows = []
+    for index in range(first_index, first_index + count):
+        match, state = simulate_match(seed, index, anchor, **options)
+        payload = build_live_score_payload(None, {col: state.get(col) for col in LIVE_SCORE_COLUMNS})
+        rows.append((match, state, payload))
+    return rows
+
+
+# --- COPY loading ---
+
+def _pg_array(values):
+    return "{" + ",".join('"' + str(v).replace("\\", "\\\\").replace('"', '\\"') + '"' for v in values) + "}"
+
+
+def _csv_value(column, value):
+    if value is None: return None
+    if column in _JSONB_COLUMNS: return json.dumps(value, separators=(",", ":"))
+    if column in _ARRAY_COLUMNS: return _pg_array(value)
+    if isinstance(value, bool): return "t" if value else "f"
+    if isinstance(value, datetime): return value.isoformat()
+    return value
+
+
+def _copy(cur, table, columns, rows):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow(["" if v is None else v for v in (_csv_value(col, row.get(col)) for col in columns)])
+    buf.seek(0)
+    cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buf)
+
+
+def load_batch(conn, rows):
+    cur = conn.cursor()
+    try:
+        # Reserve ids up front so both tables can be COPYed with explicit match_ids
+        cur.execute("SELECT nextval(pg_get_serial_sequence('cricket_match', 'match_id')) FROM generate_series(1, %s)", (len(rows),))
+        match_ids = [r[0] for r in cur.fetchall()]
+        matches, livescores = [], []
+        for match_id, (match, state, payload) in zip(match_ids, rows):
+            payload = dict(payload, match_id=match_id)
+            matches.append(dict(match, match_id=match_id))
+            livescores.append(dict(state, match_id=match_id, score_projection=payload,
+                                   score_summary=select_fields(payload, SUMMARY_FIELDS)))
+        _copy(cur, "cricket_match", CRICKET_MATCH_COLUMNS, matches)
+        _copy(cur, "cricket_match_livescore", LIVESCORE_COLUMNS, livescores)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000, help="matches to generate (1 - 100000)")
+    parser.add_argument("--seed", type=int, default=2025)
+    parser.add_argument("--anchor", help="'now' for the generated timeline, ISO date/time (default: today 00:00 UTC)")
+    parser.add_argument("--overs", type=int, default=20)
+    parser.add_argument("--players", type=int, default=11)
+    parser.add_argument("--upcoming-share", type=float, default=0.1)
+    parser.add_argument("--live-share", type=float, default=0.02)
+    parser.add_argument("--days", type=int, default=730, help="history covered by finished matches")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=1, help="simulation processes")
+    parser.add_argument("--dsn", default=DEFAULT_DSN)
+    parser.add_argument("--dry-run", action="store_true", help="simulate only and print a summary")
+    args = parser.parse_args()
+    if not 1 <= args.count <= 100000: parser.error("--count must be between 1 and 100000")
+    if args.players < 3: parser.error("--players must be at least 3")
+
+    if args.anchor:
+        anchor = datetime.fromisoformat(args.anchor)
+        if anchor.tzinfo is None: anchor = anchor.replace(tzinfo=timezone.utc)
+    else:
+        anchor = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    options = {"overs": args.overs, "players": args.players, "upcoming_share": args.upcoming_share,
+               "live_share": args.live_share, "days": args.days}
+    tasks = [(args.seed, first, min(args.batch_size, args.count - first), anchor, options)
+             for first in range(0, args.count, args.batch_size)]
+
+    conn = None
+    if not args.dry_run:
+        import psycopg2
+        conn = psycopg2.connect(args.dsn)
+        migrations.migrate(conn, {"livescore_channel": LIVESCORE_CHANGE_CHANNEL})
+
+    started = time.perf_counter()
+    generated = 0
+    statuses = {}
+    pool = Pool(args.workers) if args.workers > 1 else None
+    try:
+        batches = pool.imap(simulate_batch, tasks) if pool else map(simulate_batch, tasks)
+        for rows in batches:
+            for match, _, _ in rows:
+                statuses[match["match_status"]] = statuses.get(match["match_status"], 0) + 1
+            if conn is not None: load_batch(conn, rows)
+            generated += len(rows)
+            print(f"{generated}/{args.count} matches ({generated / (time.perf_counter() - started):.0f}/s)", end="\r", flush=True)
+        print()
+        if conn is not None:
+            cur = conn.cursor()
+            cur.execute("ANALYZE cricket_match, cricket_match_livescore")
+            conn.commit()
+            cur.close()
+    finally:
+        if pool: pool.close()
+        if conn is not None: conn.close()
+
+    summary = ", ".join(f"{n} {status}" for status, n in sorted(statuses.items()))
+    action = "Simulated" if args.dry_run else "Loaded"
+    print(f"{action} {generated} matches ({summary}) in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+""" Incremental ZIP writer for streamed responses.
+
+zipfile can write to unseekable outputs (entries get data descriptors instead
+of back-patched headers), so each add() returns the bytes produced so far and
+nothing but the current entry is ever held in memory.
+"""
+import io
+import zipfile
+
+
+class _DrainableBuffer(io.RawIOBase):
+    """ Write-only, unseekable sink; tell()/seek() raise so zipfile uses streaming mode. """
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ZipStream:
+
+    def __init__(self, compression=zipfile.ZIP_DEFLATED):
+        self._buffer = _DrainableBuffer()
+        self._zip = zipfile.ZipFile(self._buffer, mode="w", compression=compression)
+
+    def add(self, name, data):
+        """ Adds one file and returns the ZIP bytes ready to send. """
+        self._zip.writestr(name, data)
+        return self._buffer.drain()
+
+    def close(self):
+        """ Writes the central directory and returns the final bytes. """
+        self._zip.close()
+        return self._buffer.drain()
@@ -0,0 +1,61 @@
+import 'dart:convert';
+import 'package:http/http.dart' as http;
+
+// Match list sections as named by /api/feed; each is also a get_matches ?status=.
+const List<String> matchFeedSections = ['live', 'recent', 'upcoming'];
+const int matchPageSize = 50;
+
+// One page of a match list plus the cursor of the next page (null on the last page).
+class MatchPage<T> {
+  final List<T> matches;
+  final String? nextCursor;
+
+  MatchPage(this.matches, this.nextCursor);
+}
+
+// Loads the first page of every section with one /api/feed call. Returns null
+// when the feed can't be used, so callers can fall back to get_matches.
+Future<Map<String, MatchPage<T>>?> fetchMatchFeed<T>(
+    String baseUrl, String sport, T Function(Map<String, dynamic>) parse,
+    {int limit = matchPageSize}) async {
+  try {
+    final response = await http.get(Uri.parse(
+        '$baseUrl/api/feed/$sport?upcoming_limit=$limit&live_limit=$limit&recent_limit=$limit'));
+    if (response.statusCode != 200) return null;
+    final Map<String, dynamic> data = json.decode(response.body);
+    final Map<String, dynamic> cursors = (data['next_cursors'] as Map<String, dynamic>?) ?? {};
+    return {
+      for (final section in matchFeedSections)
+        section: MatchPage<T>(
+          ((data[section] as List<dynamic>?) ?? [])
+              .map((jsonItem) => parse(jsonItem as Map<String, dynamic>))
+              .toList(),
+          cursors[section] as String?,
+        ),
+    };
+  } catch (e) {
+    print("Feed Error: $e");
+    return null;
+  }
+}
+
+// Loads the page of `status` that follows `cursor` (from the feed or the
+// previous page's X-Next-Cursor header). Throws on HTTP errors.
+Future<MatchPage<T>> fetchMatchPage<T>(String baseUrl, String sport, String status,
+    String cursor, T Function(Map<String, dynamic>) parse,
+    {int limit = matchPageSize}) async {
+  final uri = Uri.parse('$baseUrl/api/get_matches/$sport').replace(queryParameters: {
+    'status': status,
+    'limit': '$limit',
+    'cursor': cursor,
+  });
+  final response = await http.get(uri);
+  if (response.statusCode != 200) {
+    throw http.ClientException('Failed to load $status matches (${response.statusCode}).', uri);
+  }
+  final List<dynamic> data = json.decode(response.body);
+  return MatchPage<T>(
+    data.map((jsonItem) => parse(jsonItem as Map<String, dynamic>)).toList(),
+    response.headers['x-next-cursor'],
+  );
+}
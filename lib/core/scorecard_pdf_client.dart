@@ -0,0 +1,28 @@
+import 'dart:async';
+import 'dart:convert';
+import 'package:http/http.dart' as http;
+
+// Downloads a scorecard PDF. The backend answers 200 with the PDF when a
+// rendered copy is cached, otherwise 202 with a render job; in that case we
+// poll the job's status URL and fetch its download URL once it is done.
+Future<http.Response> fetchScorecardPdf(String baseUrl, int matchId,
+    {Duration timeout = const Duration(seconds: 60)}) async {
+  final deadline = DateTime.now().add(timeout);
+  http.Response response = await http.get(Uri.parse('$baseUrl/api/download_scorecard_pdf/$matchId'));
+
+  while (response.statusCode == 202) {
+    final job = json.decode(response.body)['job'] as Map<String, dynamic>;
+    if (DateTime.now().isAfter(deadline)) {
+      throw TimeoutException('Scorecard is still being generated, please try again.');
+    }
+    final retryAfter = int.tryParse(response.headers['retry-after'] ?? '') ?? 1;
+    await Future.delayed(Duration(seconds: retryAfter));
+
+    response = await http.get(Uri.parse('$baseUrl${job['status_url']}'));
+    if (response.statusCode == 200) {
+      final doneJob = json.decode(response.body)['job'] as Map<String, dynamic>;
+      response = await http.get(Uri.parse('$baseUrl${doneJob['download_url']}'));
+    }
+  }
+  return response;
+}
@@ -1,5 +1,6 @@
 import 'package:flutter/material.dart';
 import '../../../core/app_theme.dart';
+import '../../../core/scorecard_pdf_client.dart';
 // import 'dart:math'; // Removed unused import
 import 'dart:convert';
 import 'package:http/http.dart' as http;
@@ -519,7 +520,7 @@ class _AdminUpdateScoreScreenState extends State<AdminUpdateScoreScreen> {
       else if (extraType != null && (extraType == ExtraType.Wide || extraType == ExtraType.NoBall)) { int baseExtra = 1; runsRunAsExtrasCalc = (runsScored + extraRuns) - runsScored - baseExtra; runsRunAsExtrasCalc = runsRunAsExtrasCalc < 0 ? 0 : runsRunAsExtrasCalc; if (runsRunAsExtrasCalc % 2 != 0) shouldSwap = true; }
       bool isOverComplete = false; bool maxBallsReachedSecondInnings = false;
       if (countsAsBall) { if (_currentBallNumberInOver >= 6) { isOverComplete = true; } else { _currentBallNumberInOver++; } if (!_isFirstInnings && _firstInningsValidBallsBowled > 0) { if (currentBallsBowledSecondInnings >= _firstInningsValidBallsBowled) { maxBallsReachedSecondInnings = true; } } }
-      if (shouldSwap && !isOverComplete) _swapStrike();
+      if (shouldSwap) _swapStrike(); // Batters cross first; _handleOverComplete then changes ends
 
       // *** Refined End Condition Logic Order & Dead Code Fix ***
       bool matchEndedThisBall = false;
@@ -761,11 +762,11 @@ class _AdminUpdateScoreScreenState extends State<AdminUpdateScoreScreen> {
     );
 
     const String host = kIsWeb ? 'localhost' : '10.0.2.2';
-    final String apiUrl = 'http://$host:5000/api/download_scorecard_pdf/${widget.matchId}';
     final String downloadFileName = 'scorecard_match_${widget.matchId}.pdf';
 
     try {
-      final response = await http.get(Uri.parse(apiUrl));
+      // Polls the render job when the PDF isn't cached on the server yet
+      final response = await fetchScorecardPdf('http://$host:5000', widget.matchId);
 
       if (mounted) {
         if (response.statusCode == 200) {
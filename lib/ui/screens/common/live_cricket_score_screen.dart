@@ -4,6 +4,7 @@ import 'package:http/http.dart' as http;
 import 'package:flutter/foundation.dart' show kIsWeb;
 import 'dart:async';
 import '../../../core/app_theme.dart';
+import '../../../core/scorecard_pdf_client.dart';
 // --- MODIFICATION: Import AdminUpdateScoreScreen for navigation ---
 import 'admin_update_score_screen.dart';
 // --- END MODIFICATION ---
@@ -115,13 +116,22 @@ class _LiveCricketScoreScreenState extends State<LiveCricketScoreScreen> {
 
   bool _isDownloadingPdf = false; // Added for PDF download state
 
+  // --- Live push stream (Server-Sent Events) state ---
+  http.Client? _streamClient;
+  StreamSubscription<String>? _streamSubscription;
+  Timer? _streamReconnectTimer;
+  String? _lastEventId;
+  bool _isStreaming = false;
+  bool _streamEnded = false; // Server sent 'end' (match finished)
+
 
   @override
   void initState() {
     super.initState();
     _fetchLiveScore(); // Initial fetch
+    _connectLiveStream(); // Push updates; polling below is only the fallback
     _pollingTimer = Timer.periodic(const Duration(seconds: 15), (timer) { // Poll more frequently
-      if (mounted) {
+      if (mounted && !_isStreaming) {
         _fetchLiveScore(isRefresh: true);
       }
     });
@@ -130,9 +140,104 @@ class _LiveCricketScoreScreenState extends State<LiveCricketScoreScreen> {
   @override
   void dispose() {
     _pollingTimer?.cancel();
+    _streamReconnectTimer?.cancel();
+    _streamSubscription?.cancel();
+    _streamClient?.close();
     super.dispose();
   }
 
+  // --- Live push stream ---
+  Future<void> _connectLiveStream() async {
+    // The browser http client buffers whole responses, so web keeps polling
+    if (kIsWeb || !mounted || _streamEnded) return;
+    _streamClient?.close();
+    final client = http.Client();
+    _streamClient = client;
+    try {
+      const String host = '10.0.2.2';
+      final request = http.Request('GET', Uri.parse('http://$host:5000/api/stream_live_score/${widget.matchId}'));
+      request.headers['Accept'] = 'text/event-stream';
+      if (_lastEventId != null) request.headers['Last-Event-ID'] = _lastEventId!;
+      final response = await client.send(request);
+      if (response.statusCode != 200 || !mounted) {
+        client.close();
+        _scheduleStreamReconnect();
+        return;
+      }
+      _isStreaming = true;
+      String? eventId;
+      String eventName = 'message';
+      final dataLines = <String>[];
+      _streamSubscription = response.stream
+          .transform(utf8.decoder)
+          .transform(const LineSplitter())
+          .listen((line) {
+        if (line.isEmpty) { // Blank line dispatches the event
+          if (eventId != null) _lastEventId = eventId;
+          if (eventName == 'score' && dataLines.isNotEmpty && mounted) {
+            final fetchedData = json.decode(dataLines.join('\n'));
+            setState(() => _applyLiveScore(fetchedData));
+          } else if (eventName == 'end') {
+            _streamEnded = true;
+          }
+          eventId = null; eventName = 'message'; dataLines.clear();
+        } else if (line.startsWith(':')) {
+          // Heartbeat comment
+        } else if (line.startsWith('id:')) {
+          eventId = line.substring(3).trim();
+        } else if (line.startsWith('event:')) {
+          eventName = line.substring(6).trim();
+        } else if (line.startsWith('data:')) {
+          dataLines.add(line.substring(5).trimLeft());
+        }
+      }, onDone: _onLiveStreamClosed, onError: (e) => _onLiveStreamClosed(), cancelOnError: true);
+    } catch (e) {
+      print("Live Score Stream Error: $e");
+      client.close();
+      _scheduleStreamReconnect();
+    }
+  }
+
+  void _onLiveStreamClosed() {
+    _isStreaming = false;
+    _streamSubscription = null;
+    _scheduleStreamReconnect();
+  }
+
+  void _scheduleStreamReconnect() {
+    _isStreaming = false;
+    if (!mounted || _streamEnded) return;
+    _streamReconnectTimer?.cancel();
+    _streamReconnectTimer = Timer(const Duration(seconds: 3), _connectLiveStream);
+  }
+  // --- End live push stream ---
+
+  // Parses a get_live_score payload into screen state (call inside setState)
+  void _applyLiveScore(Map<String, dynamic> fetchedData) {
+    List<PlayerScore> parsePlayerList(List<dynamic>? data) {
+      if (data == null) return [];
+      // --- FIX: Ensure items are Maps before calling fromJson ---
+      return data
+          .whereType<Map<String, dynamic>>() // Filter out non-map items
+          .map((item) => PlayerScore.fromJson(item))
+          .toList();
+      // --- END FIX ---
+    }
+
+    _liveScoreData = fetchedData; // Store the raw map too
+    _teamABatting = parsePlayerList(fetchedData['team1_batting']);
+    _teamBBowling = parsePlayerList(fetchedData['team2_bowling']);
+    _teamBBatting = parsePlayerList(fetchedData['team2_batting']);
+    _teamABowling = parsePlayerList(fetchedData['team1_bowling']);
+    _teamAExtras = fetchedData['team1_extras'] ?? 0;
+    _teamBExtras = fetchedData['team2_extras'] ?? 0;
+    _isFirstInnings = fetchedData['is_first_innings'] ?? true;
+    _team1TimelineData = List<String>.from(fetchedData['team1_timeline'] ?? []); // Added
+    _team2TimelineData = List<String>.from(fetchedData['team2_timeline'] ?? []); // Added
+    _isLoading = false;
+    _errorMessage = ''; // Clear error on success
+  }
+
   Future<void> _fetchLiveScore({bool isRefresh = false}) async {
      if (!isRefresh && mounted) {
       setState(() {
@@ -152,31 +257,7 @@ class _LiveCricketScoreScreenState extends State<LiveCricketScoreScreen> {
           final fetchedData = json.decode(response.body);
 
           // --- Parse Detailed Data ---
-          List<PlayerScore> parsePlayerList(List<dynamic>? data) {
-            if (data == null) return [];
-            // --- FIX: Ensure items are Maps before calling fromJson ---
-            return data
-                .whereType<Map<String, dynamic>>() // Filter out non-map items
-                .map((item) => PlayerScore.fromJson(item))
-                .toList();
-            // --- END FIX ---
-          }
-
-          setState(() {
-            _liveScoreData = fetchedData; // Store the raw map too
-            _teamABatting = parsePlayerList(fetchedData['team1_batting']);
-            _teamBBowling = parsePlayerList(fetchedData['team2_bowling']);
-            _teamBBatting = parsePlayerList(fetchedData['team2_batting']);
-            _teamABowling = parsePlayerList(fetchedData['team1_bowling']);
-            _teamAExtras = fetchedData['team1_extras'] ?? 0;
-            _teamBExtras = fetchedData['team2_extras'] ?? 0;
-            _isFirstInnings = fetchedData['is_first_innings'] ?? true;
-            // _timelineData = List<String>.from(fetchedData['timeline'] ?? []); // Removed
-            _team1TimelineData = List<String>.from(fetchedData['team1_timeline'] ?? []); // Added
-            _team2TimelineData = List<String>.from(fetchedData['team2_timeline'] ?? []); // Added
-            _isLoading = false;
-            _errorMessage = ''; // Clear error on success
-          });
+          setState(() => _applyLiveScore(fetchedData));
           // --- End Parse Detailed Data ---
 
         } else {
@@ -214,11 +295,11 @@ class _LiveCricketScoreScreenState extends State<LiveCricketScoreScreen> {
     );
 
     const String host = kIsWeb ? 'localhost' : '10.0.2.2';
-    final String apiUrl = 'http://$host:5000/api/download_scorecard_pdf/${widget.matchId}';
     final String downloadFileName = 'scorecard_match_${widget.matchId}.pdf';
 
     try {
-      final response = await http.get(Uri.parse(apiUrl));
+      // Polls the render job when the PDF isn't cached on the server yet
+      final response = await fetchScorecardPdf('http://$host:5000', widget.matchId);
 
       if (mounted) {
         if (response.statusCode == 200) {
@@ -3,6 +3,7 @@ import 'dart:convert';
 import 'package:http/http.dart' as http;
 import 'package:flutter/foundation.dart' show kIsWeb;
 import '../../../core/app_theme.dart';
+import '../../../core/match_feed_client.dart';
 // Import the shared FetchedMatch model
 import '../admin/admin_sports_details.dart' show FetchedMatch;
 import 'match_details_screen.dart';
@@ -37,6 +38,10 @@ class _SportsDetailsScreenState extends State<SportsDetailsScreen>
   bool _isLoadingRecent = true;
   bool _isLoadingUpcoming = true;
   String _errorMessage = '';
+  // Next-page cursor per tab ('live', 'recent', 'upcoming'); null when the whole list is loaded
+  final Map<String, String?> _nextCursors = {};
+  final Set<String> _loadingMore = {};
+  final Set<String> _loadMoreFailed = {};
 
   @override
   void initState() {
@@ -87,6 +92,7 @@ class _SportsDetailsScreenState extends State<SportsDetailsScreen>
             if (status == 'live') _liveMatches = fetchedMatches;
             if (status == 'recent') _recentMatches = fetchedMatches;
             if (status == 'upcoming') _upcomingMatches = fetchedMatches;
+            _nextCursors[status] = null; // Without a limit get_matches returns the whole list
           });
         } else {
           // Set error message only if fetching failed
@@ -118,9 +124,82 @@ class _SportsDetailsScreenState extends State<SportsDetailsScreen>
   // --- End Updated fetch logic ---
 
 
+  // --- Loads the first page of all three lists with one /api/feed call; false if it didn't work ---
+  Future<bool> _fetchFeed() async {
+    final String host = kIsWeb ? 'localhost' : '10.0.2.2';
+    final feed = await fetchMatchFeed('http://$host:5000', widget.sportName.toLowerCase(), FetchedMatch.fromJson);
+    if (feed == null) return false;
+
+    if (mounted) {
+      setState(() {
+        _liveMatches = feed['live']!.matches;
+        _recentMatches = feed['recent']!.matches;
+        _upcomingMatches = feed['upcoming']!.matches;
+        for (final section in matchFeedSections) {
+          _nextCursors[section] = feed[section]!.nextCursor;
+        }
+        _loadMoreFailed.clear();
+        _isLoadingLive = false;
+        _isLoadingRecent = false;
+        _isLoadingUpcoming = false;
+        _errorMessage = '';
+      });
+    }
+    return true;
+  }
+
+  // --- Appends the next page of a tab once the end of its list comes into view ---
+  Future<void> _loadMoreMatches(String status) async {
+    final cursor = _nextCursors[status];
+    if (cursor == null || _loadingMore.contains(status) || _loadMoreFailed.contains(status)) return;
+    setState(() => _loadingMore.add(status));
+
+    try {
+      final String host = kIsWeb ? 'localhost' : '10.0.2.2';
+      final page = await fetchMatchPage('http://$host:5000', widget.sportName.toLowerCase(), status, cursor, FetchedMatch.fromJson);
+      // Drop the page if a refresh replaced the list while it was loading
+      if (mounted && _nextCursors[status] == cursor) {
+        setState(() {
+          if (status == 'live') _liveMatches = [..._liveMatches, ...page.matches];
+          if (status == 'recent') _recentMatches = [..._recentMatches, ...page.matches];
+          if (status == 'upcoming') _upcomingMatches = [..._upcomingMatches, ...page.matches];
+          _nextCursors[status] = page.nextCursor;
+        });
+      }
+    } catch (e) {
+      print("Load More Error ($status): $e");
+      if (mounted) setState(() => _loadMoreFailed.add(status)); // Retried from the list footer
+    } finally {
+      if (mounted) setState(() => _loadingMore.remove(status));
+    }
+  }
+
+  // --- Footer of a list with more pages: loads the next page as soon as it is built ---
+  Widget _buildLoadMoreFooter(String status) {
+    if (_loadMoreFailed.contains(status)) {
+      return Center(
+        child: TextButton(
+          onPressed: () {
+            setState(() => _loadMoreFailed.remove(status));
+            _loadMoreMatches(status);
+          },
+          child: const Text('Could not load more matches. Tap to retry.', style: TextStyle(color: Colors.white)),
+        ),
+      );
+    }
+    WidgetsBinding.instance.addPostFrameCallback((_) {
+      if (mounted) _loadMoreMatches(status);
+    });
+    return const Padding(
+      padding: EdgeInsets.symmetric(vertical: 16),
+      child: Center(child: CircularProgressIndicator(color: Colors.white)),
+    );
+  }
+
  // --- Refreshes all match lists ---
   Future<void> _refreshAllMatches() async {
-     // Fetch all categories simultaneously
+    // One round trip for all tabs; fall back to the per-status calls if the feed fails
+    if (await _fetchFeed()) return;
     await Future.wait([
       _fetchMatches('live'),
       _fetchMatches('recent'),
@@ -310,12 +389,15 @@ class _SportsDetailsScreenState extends State<SportsDetailsScreen>
       return _buildEmptyList(category); // Show standard empty message
     }
 
-    // Use ListView.builder when there are matches
+    // Use ListView.builder when there are matches; a footer row pulls in further pages
+    final status = category.toLowerCase();
+    final hasMore = _nextCursors[status] != null;
     return ListView.builder(
       physics: const AlwaysScrollableScrollPhysics(parent: BouncingScrollPhysics()),
       padding: const EdgeInsets.all(12),
-      itemCount: matches.length,
+      itemCount: matches.length + (hasMore ? 1 : 0),
       itemBuilder: (context, index) {
+        if (index == matches.length) return _buildLoadMoreFooter(status);
         final match = matches[index];
         return GestureDetector(
           onTap: () {